@@ -159,9 +159,99 @@ load_dotenv()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
+# One cache shared by the web workers and the background workers (job-creation
+# chat history, memoized generations, analytics, extracted PDF text): a
+# per-process LocMemCache would give each process its own copy, and signal-
+# driven invalidation would only reach the process that saved the row.
+# The table is created by a migration (jobs/0009) / `manage.py createcachetable`.
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "50000"))
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "django_cache",
+        "OPTIONS": {"MAX_ENTRIES": CACHE_MAX_ENTRIES},
+    }
+}
+
+# LLM provider for resume scoring / job extraction (jobs/llm.py): "gemini" or "local"
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")
+LLM_MODEL = os.getenv("LLM_MODEL", "gemini-2.5-flash")
+# Offline "local" provider knobs for load tests and CI
+LOCAL_LLM_LATENCY_MS = int(os.getenv("LOCAL_LLM_LATENCY_MS", "0"))
+LOCAL_LLM_FAILURE_RATE = float(os.getenv("LOCAL_LLM_FAILURE_RATE", "0"))
+LOCAL_LLM_SEED = int(os.getenv("LOCAL_LLM_SEED", "0"))
+# Shared LLM client limits (jobs/llm.py ResilientProvider): token-bucket rate,
+# adaptive (AIMD) concurrency, jittered retries and a circuit breaker
+LLM_RATE_PER_SEC = float(os.getenv("LLM_RATE_PER_SEC", "5"))  # 0 = unlimited
+LLM_BURST = int(os.getenv("LLM_BURST", "10"))
+LLM_MIN_CONCURRENCY = int(os.getenv("LLM_MIN_CONCURRENCY", "1"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "8"))
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+# Seconds generated skill suggestions / descriptions stay memoized per
+# normalized job title + experience level (jobs/job_generation.py)
+JOB_GENERATION_CACHE_TIMEOUT = int(os.getenv("JOB_GENERATION_CACHE_TIMEOUT", str(7 * 24 * 3600)))
+# Job-creation chat history per HR user (jobs/conversations.py)
+CHAT_HISTORY_MESSAGES = int(os.getenv("CHAT_HISTORY_MESSAGES", "10"))
+CHAT_MESSAGE_MAX_CHARS = int(os.getenv("CHAT_MESSAGE_MAX_CHARS", "2000"))
+CHAT_SESSION_IDLE_TIMEOUT = int(os.getenv("CHAT_SESSION_IDLE_TIMEOUT", "1800"))
+# Keyset page size for GET /api/jobs/<id>/candidates/ (?page_size= up to the max)
+CANDIDATES_PAGE_SIZE = int(os.getenv("CANDIDATES_PAGE_SIZE", "50"))
+CANDIDATES_MAX_PAGE_SIZE = int(os.getenv("CANDIDATES_MAX_PAGE_SIZE", "500"))
+# Upper bound on how long cached analytics (jobs/analytics.py) may be served;
+# candidate writes invalidate them immediately
+ANALYTICS_CACHE_TIMEOUT = int(os.getenv("ANALYTICS_CACHE_TIMEOUT", "3600"))
+
+# Max concurrent Gemini calls while evaluating one batch of uploaded resumes
+RESUME_EVAL_MAX_WORKERS = int(os.getenv("RESUME_EVAL_MAX_WORKERS", "8"))
+# Seconds a running ingestion batch may go without a heartbeat before
+# `run_ingestion_worker --requeue-stale` treats its worker as dead
+INGESTION_CLAIM_TIMEOUT = int(os.getenv("INGESTION_CLAIM_TIMEOUT", "600"))
+
+# PDF text extraction process pool (0 = parse in the calling thread)
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "2"))
+# Seconds extracted PDF text stays memoized (by file SHA-256) in the default cache
+PDF_TEXT_CACHE_TIMEOUT = int(os.getenv("PDF_TEXT_CACHE_TIMEOUT", str(7 * 24 * 3600)))
+# Sandbox limits for each PDF parsed in the pool (see jobs/pdf_extraction.py)
+PDF_PARSE_TIMEOUT = int(os.getenv("PDF_PARSE_TIMEOUT", "20"))
+PDF_PARSE_MEMORY_MB = int(os.getenv("PDF_PARSE_MEMORY_MB", "512"))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "60"))
+
+# Limits for ZIP / tar.gz resume imports (jobs/archive_import.py)
+ARCHIVE_MAX_MEMBERS = int(os.getenv("ARCHIVE_MAX_MEMBERS", "500"))
+ARCHIVE_MAX_TOTAL_MB = int(os.getenv("ARCHIVE_MAX_TOTAL_MB", "500"))
+ARCHIVE_MAX_MEMBER_MB = int(os.getenv("ARCHIVE_MAX_MEMBER_MB", "10"))
+
+# Local pre-scoring (jobs/prescoring.py): only the top K and/or resumes scoring
+# >= MIN_SCORE go to the LLM. Both 0 = every resume is LLM-evaluated.
+PRESCORE_TOP_K = int(os.getenv("PRESCORE_TOP_K", "0"))
+PRESCORE_MIN_SCORE = int(os.getenv("PRESCORE_MIN_SCORE", "0"))
+
+# Rescoring (jobs/rescoring.py): LLM-scored candidates go back to the model only
+# when their local pre-score moves by at least this much
+RESCORE_LLM_DELTA = int(os.getenv("RESCORE_LLM_DELTA", "15"))
+
+# Section-aware resume condensing ahead of the evaluation prompt (jobs/condenser.py).
+# Off by default: on typical one/two-page resumes it saves little over head/tail
+# truncation (check with `manage.py bench_condenser`) and needs the full PDF
+# parsed and stored instead of only the pages truncate() keeps.
+RESUME_CONDENSE = os.getenv("RESUME_CONDENSE", "0") == "1"
+RESUME_PROMPT_TOKEN_BUDGET = int(os.getenv("RESUME_PROMPT_TOKEN_BUDGET", "2500"))
+
+# Cached resume evaluations (jobs.EvaluationCacheEntry)
+EVAL_CACHE_MAX_ENTRIES = int(os.getenv("EVAL_CACHE_MAX_ENTRIES", "20000"))
+EVAL_CACHE_MAX_AGE_DAYS = int(os.getenv("EVAL_CACHE_MAX_AGE_DAYS", "30"))
+
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Spool every upload to a temp file once: resumes are parsed from that path
+# and moved (not copied) into MEDIA_ROOT when the candidate is saved.
+FILE_UPLOAD_HANDLERS = ["django.core.files.uploadhandler.TemporaryFileUploadHandler"]
+
 import os
 
 EMAIL_BACKEND = os.getenv("EMAIL_BACKEND")
@@ -172,6 +262,16 @@ EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL")
 
+# Outbound email queue (candidates/outbox.py, `manage.py run_email_worker`)
+EMAIL_RATE_PER_SEC = float(os.getenv("EMAIL_RATE_PER_SEC", "5"))  # provider send limit, 0 = unlimited
+EMAIL_BURST = int(os.getenv("EMAIL_BURST", "10"))
+EMAIL_WORKER_CONNECTIONS = int(os.getenv("EMAIL_WORKER_CONNECTIONS", "2"))
+EMAIL_WORKER_BATCH = int(os.getenv("EMAIL_WORKER_BATCH", "100"))
+EMAIL_CONNECTION_MAX_IDLE = int(os.getenv("EMAIL_CONNECTION_MAX_IDLE", "60"))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+EMAIL_RETRY_BASE_DELAY = int(os.getenv("EMAIL_RETRY_BASE_DELAY", "30"))
+EMAIL_CLAIM_TIMEOUT = int(os.getenv("EMAIL_CLAIM_TIMEOUT", "600"))
+
 STATIC_URL = "/static/"
 STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 
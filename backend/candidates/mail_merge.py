@@ -0,0 +1,114 @@
+# candidates/mail_merge.py
+"""
+Per-candidate personalized emails ("Hi {first_name}, your application for
+{job_title} ...").
+
+Everything shared by a send is prepared once (PreparedSend): the subject,
+text and HTML bodies are compiled into literal / field chunks, and the
+attachments are built into base64-encoded MIME parts that every message
+reuses. Each message then only joins its own field values into the chunks.
+
+Placeholders are the names in MERGE_FIELDS in braces; any other brace text
+is left as written. Values are HTML-escaped in the HTML part. Sends without
+`merge` are never compiled: their subject and bodies go out verbatim, as
+does the separate cc/bcc copy of a merge send (no candidate context).
+"""
+import re
+from email import encoders
+from email.mime.base import MIMEBase
+
+from django.core.mail import EmailMultiAlternatives
+from django.utils.html import escape
+
+MERGE_FIELDS = ("name", "first_name", "email", "job_title", "score")
+FIELD_RE = re.compile(r"\{(" + "|".join(MERGE_FIELDS) + r")\}")
+
+
+class MergeTemplate:
+    """Template text split once into literals and field names (kept whole unless `merge`)."""
+    def __init__(self, source, merge=True):
+        self.source = source or ""
+        parts = FIELD_RE.split(self.source) if merge else [self.source]
+        self.literals = parts[0::2]
+        self.fields = parts[1::2]
+
+    def render(self, context, quote=str):
+        if context is None:
+            return self.source
+        if not self.fields:
+            return self.literals[0]
+        out = [self.literals[0]]
+        for field, literal in zip(self.fields, self.literals[1:]):
+            out.append(quote(str(context.get(field, ""))))
+            out.append(literal)
+        return "".join(out)
+
+
+def _header_value(value):
+    return " ".join(value.split())
+
+def mime_attachment(filename, content, mimetype=None):
+    maintype, _, subtype = (mimetype or "application/octet-stream").partition("/")
+    part = MIMEBase(maintype, subtype or "octet-stream")
+    part.set_payload(content)
+    encoders.encode_base64(part)
+    part.add_header("Content-Disposition", "attachment", filename=filename)
+    return part
+
+
+class PreparedSend:
+    """Compiled templates and MIME attachment parts shared by all messages of a send."""
+    def __init__(self, send, attachments=()):
+        self.send = send
+        self.subject = MergeTemplate(send.subject, send.merge)
+        self.text = MergeTemplate(send.text_body, send.merge)
+        self.html = MergeTemplate(send.html_body, send.merge)
+        self.attachments = [mime_attachment(name, content, mime) for name, content, mime in attachments]
+
+    def message(self, recipient, connection=None):
+        # the cc/bcc-only copy of a merge send has no candidate: templates as written
+        context = recipient.context or ({} if recipient.email else None)
+        email = EmailMultiAlternatives(
+            subject=self.subject.render(context, _header_value),
+            body=self.text.render(context),
+            from_email=None,  # will use DEFAULT_FROM_EMAIL
+            to=[recipient.email] if recipient.email else [],
+            cc=self.send.cc if recipient.with_copies else [],
+            bcc=self.send.bcc if recipient.with_copies else [],
+            connection=connection,
+        )
+        email.attach_alternative(self.html.render(context, escape), "text/html")
+        for part in self.attachments:
+            email.attach(part)
+        return email
+
+
+def candidate_context(name, email, job_title, score):
+    name = (name or "").strip()
+    return {
+        "name": name or "there",
+        "first_name": name.split()[0] if name else "there",
+        "email": email,
+        "job_title": job_title or "",
+        "score": score,
+    }
+
+def candidate_recipients(hr, job_id, shortlisted_only=True, min_score=None):
+    """[(email, merge context)] for the HR user's candidates of a job, one per address."""
+    from .models import CandidateResume
+
+    qs = CandidateResume.objects.filter(job_id=job_id, job__hr=hr).exclude(candidate_email__isnull=True).exclude(candidate_email="")
+    if shortlisted_only:
+        qs = qs.filter(shortlisted=True)
+    if min_score is not None:
+        qs = qs.filter(ai_score__gte=min_score)
+    rows = qs.order_by("-ai_score", "-id").values_list("candidate_name", "candidate_email", "job__title", "ai_score")
+
+    recipients, seen = [], set()
+    for name, email, job_title, score in rows:
+        key = email.strip().lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        recipients.append((email.strip(), candidate_context(name, email.strip(), job_title, score)))
+    return recipients
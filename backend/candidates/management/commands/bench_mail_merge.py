@@ -0,0 +1,67 @@
+import os
+import time
+from types import SimpleNamespace
+
+from django.core.mail import EmailMultiAlternatives
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from candidates.mail_merge import PreparedSend, candidate_context
+
+SUBJECT = "Your application for {job_title}"
+MESSAGE = "Hi {first_name},<br>Thanks for applying for {job_title}. Your profile scored {score} and we would like to talk."
+
+
+class Command(BaseCommand):
+    help = "Measure mail-merge throughput (messages built and serialized per second, nothing is sent)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipients", type=int, default=2000)
+        parser.add_argument("--attachment-kb", type=int, default=200, help="Size of one shared attachment (0 = none).")
+        parser.add_argument("--from-email", default="hr@example.com")
+
+    def handle(self, *args, **options):
+        contexts = [
+            candidate_context(f"Candidate {i} Example", f"candidate{i}@example.com", "Full Stack Developer", 50 + i % 50)
+            for i in range(options["recipients"])
+        ]
+        attachments = []
+        if options["attachment_kb"]:
+            attachments.append(("offer.pdf", os.urandom(options["attachment_kb"] * 1024), "application/pdf"))
+        year = timezone.now().year
+        from_email = options["from_email"]
+
+        # naive: render the template and rebuild every MIME part for each recipient
+        started = time.perf_counter()
+        size = 0
+        for context in contexts:
+            message = MESSAGE.format(**context)
+            html_body = render_to_string("candidates/email_template.html", {"message": message, "year": year})
+            email = EmailMultiAlternatives(
+                subject=SUBJECT.format(**context), body=strip_tags(html_body) or message,
+                from_email=from_email, to=[context["email"]],
+            )
+            email.attach_alternative(html_body, "text/html")
+            for name, content, mime in attachments:
+                email.attach(name, content, mime)
+            size += len(email.message().as_bytes())
+        naive = time.perf_counter() - started
+
+        # compiled: template rendered once, attachments encoded once
+        started = time.perf_counter()
+        html_body = render_to_string("candidates/email_template.html", {"message": MESSAGE, "year": year})
+        send = SimpleNamespace(subject=SUBJECT, text_body=strip_tags(html_body), html_body=html_body, cc=[], bcc=[], merge=True)
+        prepared = PreparedSend(send, attachments)
+        merged_size = 0
+        for context in contexts:
+            email = prepared.message(SimpleNamespace(email=context["email"], with_copies=False, context=context))
+            email.from_email = from_email
+            merged_size += len(email.message().as_bytes())
+        compiled = time.perf_counter() - started
+
+        n = len(contexts)
+        self.stdout.write(f"naive    {n / naive:9.1f} msg/s  ({size / n / 1024:.1f} KB/msg)")
+        self.stdout.write(f"compiled {n / compiled:9.1f} msg/s  ({merged_size / n / 1024:.1f} KB/msg)")
+        self.stdout.write(self.style.SUCCESS(f"speedup x{naive / compiled:.1f} over {n} messages"))
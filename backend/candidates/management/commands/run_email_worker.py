@@ -0,0 +1,53 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from candidates.outbox import ConnectionPool, claim_due, deliver, prepare_send, record_results, requeue_stale
+from jobs.llm import TokenBucket
+
+
+class Command(BaseCommand):
+    help = "Deliver queued bulk emails over pooled SMTP connections (run alongside the web workers)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain due messages and exit instead of polling.")
+        parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds to sleep when nothing is due.")
+        parser.add_argument("--connections", type=int, default=None, help="SMTP connections / sending threads.")
+        parser.add_argument("--requeue-stale", action="store_true", help="Requeue messages left sending by a crashed worker first.")
+
+    def handle(self, *args, **options):
+        connections = options["connections"] or settings.EMAIL_WORKER_CONNECTIONS
+        pool = ConnectionPool(connections, settings.EMAIL_CONNECTION_MAX_IDLE)
+        limiter = TokenBucket(settings.EMAIL_RATE_PER_SEC, settings.EMAIL_BURST)
+
+        if options["requeue_stale"]:
+            n = requeue_stale()
+            self.stdout.write(f"Requeued {n} stale message(s).")
+
+        with ThreadPoolExecutor(max_workers=connections, thread_name_prefix="smtp") as executor:
+            try:
+                while True:
+                    claimed = claim_due(settings.EMAIL_WORKER_BATCH)
+                    if not claimed:
+                        pool.close_idle()
+                        if options["once"]:
+                            break
+                        time.sleep(options["poll_interval"])
+                        continue
+
+                    # templates / attachments are prepared once per send, not per message
+                    prepared = {}
+                    for r in claimed:
+                        if r.send_id not in prepared:
+                            prepared[r.send_id] = prepare_send(r.send)
+
+                    started = time.perf_counter()
+                    errors = list(executor.map(lambda r: deliver(r, prepared[r.send_id], pool, limiter), claimed))
+                    record_results(list(zip(claimed, errors)))
+                    elapsed = time.perf_counter() - started
+                    failed = sum(1 for e in errors if e is not None)
+                    self.stdout.write(f"Sent {len(claimed) - failed}/{len(claimed)} message(s) in {elapsed:.1f}s")
+            finally:
+                pool.close_all()
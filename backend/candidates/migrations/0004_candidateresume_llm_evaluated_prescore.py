@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0003_candidateresume_shortlisted'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidateresume',
+            name='llm_evaluated',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='candidateresume',
+            name='prescore',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0004_candidateresume_llm_evaluated_prescore'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidateresume',
+            name='resume_text',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='candidateresume',
+            name='evaluated_for',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
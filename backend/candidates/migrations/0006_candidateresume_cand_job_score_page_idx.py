@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0005_candidateresume_resume_text_evaluated_for'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='candidateresume',
+            index=models.Index(fields=['job', '-ai_score', '-created_at', '-id'], name='cand_job_score_page_idx'),
+        ),
+    ]
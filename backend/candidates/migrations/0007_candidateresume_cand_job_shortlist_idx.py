@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0006_candidateresume_cand_job_score_page_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='candidateresume',
+            index=models.Index(fields=['job', 'shortlisted', '-ai_score', '-id'], name='cand_job_shortlist_idx'),
+        ),
+    ]
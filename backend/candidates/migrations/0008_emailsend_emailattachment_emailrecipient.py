@@ -0,0 +1,62 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:30
+
+import candidates.models
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0007_candidateresume_cand_job_shortlist_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailSend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255)),
+                ('text_body', models.TextField()),
+                ('html_body', models.TextField()),
+                ('cc', models.JSONField(blank=True, default=list)),
+                ('bcc', models.JSONField(blank=True, default=list)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('done', 'Done')], default='queued', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('hr', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='email_sends', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='EmailAttachment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(upload_to=candidates.models.email_attachment_path)),
+                ('filename', models.CharField(max_length=255)),
+                ('mimetype', models.CharField(blank=True, max_length=100)),
+                ('send', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attachments', to='candidates.emailsend')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='EmailRecipient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.CharField(blank=True, max_length=254)),
+                ('with_copies', models.BooleanField(default=False)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('sending', 'Sending'), ('retry', 'Retry'), ('sent', 'Sent'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_error', models.CharField(blank=True, max_length=255)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('claim', models.CharField(blank=True, max_length=32)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('send', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipients', to='candidates.emailsend')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='email_rcpt_due_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0008_emailsend_emailattachment_emailrecipient'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailsend',
+            name='merge',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='emailrecipient',
+            name='context',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -2,6 +2,7 @@
 from django.db import models
 from django.utils import timezone
 from jobs.models import Job
+from accounts.models import HRUser
 
 def resume_upload_path(instance, filename):
     return f"candidates/job_{instance.job.id}/{filename}"
@@ -19,8 +20,90 @@ class CandidateResume(models.Model):
 
     shortlisted = models.BooleanField(default=False)   # ✅ New
 
+    # False when only the local pre-scorer ranked this resume (ai_score is provisional)
+    llm_evaluated = models.BooleanField(default=True)
+    prescore = models.IntegerField(blank=True, null=True)
+
+    # text sent to the evaluator and the job requirements it was scored against,
+    # so scores can be refreshed without re-uploading (jobs/rescoring.py)
+    resume_text = models.TextField(blank=True)
+    evaluated_for = models.JSONField(default=dict, blank=True)
+
     resume = models.FileField(upload_to=resume_upload_path, blank=True, null=True)
     created_at = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            # keyset pagination of a job's candidates (jobs/pagination.py)
+            models.Index(fields=["job", "-ai_score", "-created_at", "-id"], name="cand_job_score_page_idx"),
+            # shortlisted candidates of a job, best first (chat shortlist / intents)
+            models.Index(fields=["job", "shortlisted", "-ai_score", "-id"], name="cand_job_shortlist_idx"),
+        ]
+
     def __str__(self):
         return f"{self.candidate_name or 'Unknown'} - Job {self.job.id}"
+
+
+# -----------------------------
+# Outbound email queue (candidates/outbox.py)
+# -----------------------------
+class EmailSend(models.Model):
+    """One bulk email request; delivered per recipient by `manage.py run_email_worker`."""
+    QUEUED = "queued"
+    DONE = "done"
+    STATUS_CHOICES = [(QUEUED, "Queued"), (DONE, "Done")]
+
+    hr = models.ForeignKey(HRUser, on_delete=models.CASCADE, related_name="email_sends")
+    subject = models.CharField(max_length=255)
+    text_body = models.TextField()
+    html_body = models.TextField()
+    cc = models.JSONField(default=list, blank=True)
+    bcc = models.JSONField(default=list, blank=True)
+    merge = models.BooleanField(default=False)  # per-recipient placeholders (candidates/mail_merge.py)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"Send {self.id} ({self.status})"
+
+
+def email_attachment_path(instance, filename):
+    return f"outbox/send_{instance.send_id}/{filename}"
+
+class EmailAttachment(models.Model):
+    send = models.ForeignKey(EmailSend, on_delete=models.CASCADE, related_name="attachments")
+    file = models.FileField(upload_to=email_attachment_path)
+    filename = models.CharField(max_length=255)
+    mimetype = models.CharField(max_length=100, blank=True)
+
+    def __str__(self):
+        return self.filename
+
+
+class EmailRecipient(models.Model):
+    """One outgoing message of a send and its delivery state."""
+    QUEUED = "queued"
+    SENDING = "sending"
+    RETRY = "retry"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUS_CHOICES = [(QUEUED, "Queued"), (SENDING, "Sending"), (RETRY, "Retry"), (SENT, "Sent"), (FAILED, "Failed")]
+
+    send = models.ForeignKey(EmailSend, on_delete=models.CASCADE, related_name="recipients")
+    email = models.CharField(max_length=254, blank=True)  # blank: cc/bcc-only message
+    with_copies = models.BooleanField(default=False)       # carries the send's cc/bcc
+    context = models.JSONField(default=dict, blank=True)   # mail-merge field values
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.CharField(max_length=255, blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim = models.CharField(max_length=32, blank=True)
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "next_attempt_at"], name="email_rcpt_due_idx")]
+
+    def __str__(self):
+        return f"{self.email or '(cc/bcc)'} ({self.status})"
@@ -0,0 +1,242 @@
+# candidates/outbox.py
+"""
+Persistent outbound email queue.
+
+SendBulkEmailView only renders the body once, stores the send, its
+attachments and one EmailRecipient row per message, and returns a send id.
+`python manage.py run_email_worker` then:
+  - claims due recipients with a conditional UPDATE (safe with several workers)
+  - sends them over a pool of long-lived SMTP connections shared by every
+    send, throttled to EMAIL_RATE_PER_SEC
+  - builds messages from a PreparedSend per send (templates compiled and
+    attachments encoded once; candidates/mail_merge.py)
+  - marks each recipient sent, retries transient failures (4xx replies,
+    dropped connections) with exponential backoff up to EMAIL_MAX_ATTEMPTS,
+    and fails permanent ones (5xx) right away
+SMTP calls run on pool threads; all DB access stays on the worker thread.
+"""
+import queue
+import random
+import smtplib
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from .mail_merge import PreparedSend
+from .models import EmailAttachment, EmailRecipient, EmailSend
+
+PENDING = [EmailRecipient.QUEUED, EmailRecipient.RETRY]
+
+
+# -----------------------------
+# Enqueue / status
+# -----------------------------
+def enqueue_send(hr, subject, message, to, cc=(), bcc=(), files=(), contexts=None):
+    """
+    `contexts`, when given, holds one mail-merge context per `to` address
+    (candidates/mail_merge.py); placeholders are filled in per message.
+    """
+    html_body = render_to_string("candidates/email_template.html", {"message": message, "year": timezone.now().year})
+    text_body = strip_tags(html_body) or message
+
+    merge = contexts is not None
+    with transaction.atomic():
+        send = EmailSend.objects.create(
+            hr=hr, subject=subject, text_body=text_body, html_body=html_body, cc=list(cc), bcc=list(bcc),
+            merge=merge,
+        )
+        for f in files:
+            attachment = EmailAttachment(send=send, filename=f.name, mimetype=getattr(f, "content_type", "") or "")
+            attachment.file.save(f.name, f, save=False)
+            attachment.save()
+        # cc / bcc ride along with the first message only, so they get one copy;
+        # a merge send gives them their own unpersonalized message instead, so
+        # they never see a candidate's details (nor the candidate the cc list)
+        recipients = [
+            EmailRecipient(send=send, email=email, with_copies=(i == 0 and not merge), context=contexts[i] if merge else {})
+            for i, email in enumerate(to)
+        ]
+        if not recipients or (merge and (cc or bcc)):
+            recipients.append(EmailRecipient(send=send, email="", with_copies=True))
+        EmailRecipient.objects.bulk_create(recipients, batch_size=1000)
+    return send
+
+def send_status(send):
+    recipients = list(send.recipients.order_by("id").values("id", "email", "status", "attempts", "last_error", "sent_at"))
+    counts = {s: 0 for s, _ in EmailRecipient.STATUS_CHOICES}
+    for r in recipients:
+        counts[r["status"]] += 1
+    return {
+        "send": {
+            "id": send.id,
+            "subject": send.subject,
+            "status": send.status,
+            "total": len(recipients),
+            "counts": counts,
+            "created_at": send.created_at.isoformat(),
+            "finished_at": send.finished_at.isoformat() if send.finished_at else None,
+        },
+        "recipients": recipients,
+    }
+
+
+# -----------------------------
+# Claiming
+# -----------------------------
+def claim_due(limit):
+    """Move up to `limit` due recipients to "sending" and return them."""
+    now = timezone.now()
+    ids = list(
+        EmailRecipient.objects.filter(status__in=PENDING, next_attempt_at__lte=now)
+        .order_by("next_attempt_at", "id").values_list("id", flat=True)[:limit]
+    )
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    EmailRecipient.objects.filter(id__in=ids, status__in=PENDING).update(
+        status=EmailRecipient.SENDING, claim=token, claimed_at=now
+    )
+    return list(EmailRecipient.objects.filter(claim=token, status=EmailRecipient.SENDING).select_related("send"))
+
+def requeue_stale(older_than=None):
+    """Put recipients left "sending" by a crashed worker back in the queue."""
+    cutoff = timezone.now() - (older_than or timedelta(seconds=settings.EMAIL_CLAIM_TIMEOUT))
+    return EmailRecipient.objects.filter(status=EmailRecipient.SENDING, claimed_at__lt=cutoff).update(
+        status=EmailRecipient.RETRY, next_attempt_at=timezone.now()
+    )
+
+
+# -----------------------------
+# SMTP connection pool
+# -----------------------------
+class ConnectionPool:
+    """Open SMTP connections reused across messages and sends; idle ones are closed."""
+    def __init__(self, size, max_idle):
+        self.size = size
+        self.max_idle = max_idle
+        self._idle = queue.LifoQueue()
+
+    def acquire(self):
+        while True:
+            try:
+                connection, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                connection = get_connection(fail_silently=False)
+                connection.open()
+                return connection
+            if time.monotonic() - last_used <= self.max_idle:
+                return connection
+            _close(connection)
+
+    def release(self, connection, broken=False):
+        if broken or self._idle.qsize() >= self.size:
+            _close(connection)
+        else:
+            self._idle.put((connection, time.monotonic()))
+
+    def close_idle(self):
+        keep = []
+        while True:
+            try:
+                connection, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if time.monotonic() - last_used > self.max_idle:
+                _close(connection)
+            else:
+                keep.append((connection, last_used))
+        for item in keep:
+            self._idle.put(item)
+
+    def close_all(self):
+        while True:
+            try:
+                _close(self._idle.get_nowait()[0])
+            except queue.Empty:
+                return
+
+def _close(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+# -----------------------------
+# Delivery
+# -----------------------------
+def _is_transient(e):
+    if isinstance(e, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in e.recipients.values())
+    if isinstance(e, smtplib.SMTPResponseException):
+        return 400 <= e.smtp_code < 500
+    # dropped / refused connections and timeouts (SMTPServerDisconnected is an OSError)
+    return isinstance(e, OSError)
+
+def _breaks_connection(e):
+    return not isinstance(e, (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException))
+
+def prepare_send(send):
+    """Templates and attachment MIME parts of `send`, built once for all its messages."""
+    attachments = []
+    for a in send.attachments.all():
+        with a.file.open("rb") as fh:
+            attachments.append((a.filename, fh.read(), a.mimetype or None))
+    return PreparedSend(send, attachments)
+
+def deliver(recipient, prepared, pool, limiter):
+    """Send one message; returns None on success or the exception. No DB access."""
+    limiter.acquire()
+    try:
+        connection = pool.acquire()
+    except Exception as e:
+        return e
+    try:
+        prepared.message(recipient, connection).send()
+    except Exception as e:
+        pool.release(connection, broken=_breaks_connection(e))
+        return e
+    pool.release(connection)
+    return None
+
+def record_results(results):
+    """Apply [(recipient, error_or_None)] from deliver() and close finished sends."""
+    now = timezone.now()
+    for recipient, error in results:
+        recipient.attempts += 1
+        recipient.claim = ""
+        if error is None:
+            recipient.status = EmailRecipient.SENT
+            recipient.sent_at = now
+            recipient.last_error = ""
+            continue
+        recipient.last_error = str(error)[:255]
+        if _is_transient(error) and recipient.attempts < settings.EMAIL_MAX_ATTEMPTS:
+            delay = settings.EMAIL_RETRY_BASE_DELAY * (2 ** (recipient.attempts - 1))
+            recipient.status = EmailRecipient.RETRY
+            recipient.next_attempt_at = now + timedelta(seconds=random.uniform(delay / 2, delay))
+        else:
+            recipient.status = EmailRecipient.FAILED
+    EmailRecipient.objects.bulk_update(
+        [r for r, _ in results],
+        ["status", "attempts", "claim", "sent_at", "last_error", "next_attempt_at"],
+        batch_size=500,
+    )
+    finish_sends({r.send_id for r, _ in results})
+
+def finish_sends(send_ids):
+    open_ids = set(
+        EmailRecipient.objects.filter(send_id__in=send_ids)
+        .exclude(status__in=[EmailRecipient.SENT, EmailRecipient.FAILED])
+        .values_list("send_id", flat=True).distinct()
+    )
+    EmailSend.objects.filter(id__in=set(send_ids) - open_ids, status=EmailSend.QUEUED).update(
+        status=EmailSend.DONE, finished_at=timezone.now()
+    )
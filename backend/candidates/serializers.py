@@ -1,3 +1,4 @@
+from django.db.models import F
 from rest_framework import serializers
 from .models import CandidateResume
 
@@ -22,11 +23,62 @@ class CandidateResumeSerializer(serializers.ModelSerializer):
             "weaknesses",
             "experience_level",
             "shortlisted",
+            "llm_evaluated",
             "resume_url",
             "created_at",
         ]
 
 
+    # model columns behind each output field, for query projection (?fields=)
+    SOURCES = {
+        "id": "id",
+        "name": "candidate_name",
+        "email": "candidate_email",
+        "extracted_skills": "extracted_skills",
+        "projects_found": "projects_found",
+        "education": "education",
+        "score": "ai_score",
+        "strengths": "strengths",
+        "weaknesses": "weaknesses",
+        "experience_level": "job__experience_level",
+        "shortlisted": "shortlisted",
+        "llm_evaluated": "llm_evaluated",
+        "resume_url": "resume",
+        "created_at": "created_at",
+    }
+    # fields that need the serializer (no plain .values() equivalent)
+    COMPUTED = {"resume_url"}
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def parse_fields(cls, raw):
+        """'name,email' -> (["name", "email"], unknown_names); (None, []) when not given."""
+        if not raw:
+            return None, []
+        fields = list(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+        return fields, [f for f in fields if f not in cls.SOURCES]
+
+    @classmethod
+    def project(cls, qs, fields=None):
+        """Restrict `qs` to the columns `fields` read (all fields by default)."""
+        columns = [cls.SOURCES[f] for f in (fields or cls.Meta.fields)]
+        if any(c.startswith("job__") for c in columns):
+            qs = qs.select_related("job")
+        return qs.only(*columns)
+
+    @classmethod
+    def as_values(cls, qs, fields):
+        """Plain dict rows for `fields` straight from the DB (no computed fields)."""
+        columns = {f: cls.SOURCES[f] for f in fields}
+        plain = [f for f in fields if columns[f] == f]
+        aliased = {f: F(columns[f]) for f in fields if columns[f] != f}
+        return qs.values(*plain, **aliased)
+
     def get_resume_url(self, obj):
         request = self.context.get("request")
         if obj.resume:
@@ -0,0 +1,87 @@
+# candidates/shortlisting.py
+"""
+Bulk shortlisting scoped to one HR user's jobs.
+
+bulk_shortlist() flips `shortlisted` for the selected candidates in one
+UPDATE ... WHERE ... RETURNING statement (PostgreSQL, SQLite >= 3.35), so
+only rows that actually changed come back and drive the stats / analytics
+deltas. Other backends fall back to SELECT ... FOR UPDATE + UPDATE in one
+transaction.
+"""
+from collections import Counter
+
+from django.db import connection, transaction
+
+from jobs import analytics, hr_stats
+from jobs.models import Job, JobStats
+
+from .models import CandidateResume
+
+
+def _supports_update_returning():
+    return connection.vendor == "postgresql" or (
+        connection.vendor == "sqlite" and connection.features.can_return_columns_from_insert
+    )
+
+def _update_returning(hr_id, shortlisted, ids, job_id, min_score):
+    qn = connection.ops.quote_name
+    jobs_sql = f"SELECT {qn('id')} FROM {qn(Job._meta.db_table)} WHERE {qn('hr_id')} = %s"
+    params = [shortlisted, shortlisted, hr_id]
+    if job_id is not None:
+        jobs_sql += f" AND {qn('id')} = %s"
+        params.append(job_id)
+    where = [f"{qn('shortlisted')} <> %s", f"{qn('job_id')} IN ({jobs_sql})"]
+    if ids is not None:
+        where.append(f"{qn('id')} IN ({', '.join(['%s'] * len(ids))})")
+        params.extend(ids)
+    if min_score is not None:
+        where.append(f"{qn('ai_score')} >= %s")
+        params.append(min_score)
+    sql = (
+        f"UPDATE {qn(CandidateResume._meta.db_table)} SET {qn('shortlisted')} = %s "
+        f"WHERE {' AND '.join(where)} RETURNING {qn('id')}, {qn('job_id')}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+def _select_then_update(hr_id, shortlisted, ids, job_id, min_score):
+    qs = CandidateResume.objects.filter(job__hr_id=hr_id).exclude(shortlisted=shortlisted)
+    if job_id is not None:
+        qs = qs.filter(job_id=job_id)
+    if ids is not None:
+        qs = qs.filter(id__in=ids)
+    if min_score is not None:
+        qs = qs.filter(ai_score__gte=min_score)
+    rows = list(qs.select_for_update().values_list("id", "job_id"))
+    if rows:
+        CandidateResume.objects.filter(id__in=[pk for pk, _ in rows]).update(shortlisted=shortlisted)
+    return rows
+
+def bulk_shortlist(hr, shortlisted=True, ids=None, job_id=None, min_score=None):
+    """
+    Set `shortlisted` on the HR user's candidates matching `ids` and/or
+    (`job_id`, `min_score`). Returns (changed_ids, counts): the ids whose flag
+    actually changed and the refreshed {"jobs": {job_id: counters}, "totals": counters}.
+    """
+    if ids is not None and not ids:
+        return [], {"jobs": {}, "totals": hr_stats.get_hr_stats(hr)}
+
+    with transaction.atomic():
+        if _supports_update_returning():
+            rows = _update_returning(hr.pk, shortlisted, ids, job_id, min_score)
+        else:
+            rows = _select_then_update(hr.pk, shortlisted, ids, job_id, min_score)
+
+        per_job = Counter(job for _, job in rows)
+        sign = 1 if shortlisted else -1
+        hr_stats.apply_shortlist_deltas(hr.pk, {job: sign * n for job, n in per_job.items()})
+    if per_job:
+        analytics.invalidate_many(per_job, hr.pk)
+
+    touched = set(per_job) | ({job_id} if job_id is not None else set())
+    jobs = {
+        row["job_id"]: {"candidates": row["candidates"], "shortlisted": row["shortlisted"]}
+        for row in JobStats.objects.filter(job_id__in=touched, hr_id=hr.pk).values("job_id", "candidates", "shortlisted")
+    }
+    return sorted(pk for pk, _ in rows), {"jobs": jobs, "totals": hr_stats.get_hr_stats(hr)}
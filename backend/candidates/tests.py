@@ -1,3 +1,264 @@
-from django.test import TestCase
+import smtplib
+from datetime import timedelta
 
-# Create your tests here.
+from django.core import mail
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import HRUser
+from jobs.llm import TokenBucket
+from jobs.models import HRStats, Job, JobStats
+
+from . import outbox
+from .mail_merge import MergeTemplate, PreparedSend, candidate_context, candidate_recipients
+from .models import CandidateResume, EmailRecipient, EmailSend
+from .serializers import CandidateResumeSerializer
+
+
+class SparseFieldsetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.hr = HRUser.objects.create_user("fields@example.com", "Fields HR", "x")
+        cls.job = Job.objects.create(hr=cls.hr, title="QA Engineer", skills=["Selenium"], experience_level="Mid")
+        cls.candidate = CandidateResume.objects.create(
+            job=cls.job, candidate_name="Ada", candidate_email="ada@example.com", ai_score=71,
+            resume_text="long text " * 100,
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.hr)
+        self.url = f"/api/candidates/job/{self.job.id}/"
+
+    def test_parse_fields(self):
+        self.assertEqual(CandidateResumeSerializer.parse_fields(None), (None, []))
+        self.assertEqual(CandidateResumeSerializer.parse_fields(" name, ,email,name"), (["name", "email"], []))
+        self.assertEqual(CandidateResumeSerializer.parse_fields("name,bogus"), (["name", "bogus"], ["bogus"]))
+
+    def test_default_returns_every_field(self):
+        row = self.client.get(self.url).data["candidates"][0]
+        self.assertEqual(set(row), set(CandidateResumeSerializer.Meta.fields))
+        self.assertEqual(row["experience_level"], "Mid")
+
+    def test_plain_fields_skip_unused_columns(self):
+        with CaptureQueriesContext(connection) as ctx:
+            rows = self.client.get(self.url, {"fields": "name,score,experience_level"}).data["candidates"]
+        self.assertEqual(rows, [{"name": "Ada", "score": 71, "experience_level": "Mid"}])
+        sql = ctx.captured_queries[-1]["sql"]
+        self.assertNotIn("resume_text", sql)
+        self.assertNotIn("strengths", sql)
+
+    def test_computed_field_goes_through_serializer(self):
+        rows = self.client.get(self.url, {"fields": "id,resume_url"}).data["candidates"]
+        self.assertEqual(rows, [{"id": self.candidate.id, "resume_url": None}])
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get(self.url, {"fields": "name,salary"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["invalid"], ["salary"])
+        self.assertIn("name", response.data["allowed"])
+
+
+@override_settings(EMAIL_MAX_ATTEMPTS=3, EMAIL_RETRY_BASE_DELAY=30, EMAIL_CLAIM_TIMEOUT=600)
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.hr = HRUser.objects.create_user("outbox@example.com", "Outbox HR", "x")
+
+    def enqueue(self, to=("a@example.com", "b@example.com"), **kwargs):
+        return outbox.enqueue_send(self.hr, "Update", "Hello", list(to), **kwargs)
+
+    def test_enqueue_sends_copies_once(self):
+        send = self.enqueue(cc=["cc@example.com"], bcc=["bcc@example.com"])
+        rows = list(send.recipients.order_by("id").values_list("email", "with_copies", "status"))
+        self.assertEqual(rows, [("a@example.com", True, "queued"), ("b@example.com", False, "queued")])
+        self.assertFalse(send.merge)
+
+        copies_only = self.enqueue(to=(), cc=["cc@example.com"])
+        self.assertEqual(list(copies_only.recipients.values_list("email", "with_copies")), [("", True)])
+
+    def test_claim_due_claims_each_row_once(self):
+        send = self.enqueue()
+        later = send.recipients.order_by("id").last()
+        EmailRecipient.objects.filter(pk=later.pk).update(next_attempt_at=timezone.now() + timedelta(minutes=5))
+
+        claimed = outbox.claim_due(10)
+        self.assertEqual([r.email for r in claimed], ["a@example.com"])
+        self.assertEqual(claimed[0].status, EmailRecipient.SENDING)
+        self.assertTrue(claimed[0].claim)
+        self.assertEqual(outbox.claim_due(10), [])
+
+    def test_transient_errors_back_off_until_max_attempts(self):
+        send = self.enqueue(to=["a@example.com"])
+        errors = [
+            smtplib.SMTPResponseException(421, b"try later"),
+            smtplib.SMTPServerDisconnected("dropped"),
+            smtplib.SMTPResponseException(451, b"try later"),
+        ]
+        for attempt, error in enumerate(errors, 1):
+            EmailRecipient.objects.filter(send=send).update(next_attempt_at=timezone.now())
+            (recipient,) = outbox.claim_due(10)
+            before = timezone.now()
+            outbox.record_results([(recipient, error)])
+            recipient.refresh_from_db()
+            self.assertEqual(recipient.attempts, attempt)
+            if attempt < 3:
+                delay = 30 * 2 ** (attempt - 1)
+                self.assertEqual(recipient.status, EmailRecipient.RETRY)
+                wait = (recipient.next_attempt_at - before).total_seconds()
+                self.assertGreaterEqual(wait, delay / 2 - 1)
+                self.assertLessEqual(wait, delay + 1)
+        self.assertEqual(recipient.status, EmailRecipient.FAILED)
+        self.assertIn("try later", recipient.last_error)
+        send.refresh_from_db()
+        self.assertEqual(send.status, EmailSend.DONE)
+
+    def test_permanent_errors_fail_right_away(self):
+        send = self.enqueue()
+        first, second = outbox.claim_due(10)
+        outbox.record_results([
+            (first, smtplib.SMTPRecipientsRefused({"a@example.com": (550, b"no such user")})),
+            (second, None),
+        ])
+        statuses = dict(send.recipients.values_list("email", "status"))
+        self.assertEqual(statuses, {"a@example.com": "failed", "b@example.com": "sent"})
+        send.refresh_from_db()
+        self.assertEqual(send.status, EmailSend.DONE)
+        self.assertIsNotNone(send.finished_at)
+
+    def test_send_stays_open_while_a_recipient_is_pending(self):
+        send = self.enqueue()
+        (first,) = outbox.claim_due(1)
+        outbox.record_results([(first, None)])
+        send.refresh_from_db()
+        self.assertEqual(send.status, EmailSend.QUEUED)
+
+    def test_requeue_stale_claims(self):
+        send = self.enqueue(to=["a@example.com"])
+        outbox.claim_due(10)
+        self.assertEqual(outbox.requeue_stale(), 0)
+        EmailRecipient.objects.filter(send=send).update(claimed_at=timezone.now() - timedelta(seconds=601))
+        self.assertEqual(outbox.requeue_stale(), 1)
+        self.assertEqual([r.email for r in outbox.claim_due(10)], ["a@example.com"])
+
+    def test_deliver_over_pooled_connection(self):
+        send = self.enqueue(cc=["cc@example.com"])
+        pool = outbox.ConnectionPool(size=1, max_idle=60)
+        limiter = TokenBucket(0, 1)
+        prepared = outbox.prepare_send(send)
+        claimed = outbox.claim_due(10)
+        outbox.record_results([(r, outbox.deliver(r, prepared, pool, limiter)) for r in claimed])
+        pool.close_all()
+
+        self.assertEqual([m.to for m in mail.outbox], [["a@example.com"], ["b@example.com"]])
+        self.assertEqual([m.cc for m in mail.outbox], [["cc@example.com"], []])
+        self.assertEqual(set(send.recipients.values_list("status", flat=True)), {"sent"})
+
+
+class MailMergeTests(TestCase):
+    def setUp(self):
+        self.hr = HRUser.objects.create_user("merge@example.com", "Merge HR", "x")
+
+    def message(self, subject, body, contexts=None):
+        send = outbox.enqueue_send(self.hr, subject, body, ["a@example.com"], contexts=contexts)
+        recipient = send.recipients.get()
+        email = PreparedSend(send).message(recipient)
+        return email, email.alternatives[0][0]
+
+    def test_template_renders_fields_and_keeps_other_braces(self):
+        template = MergeTemplate("Hi {first_name}, {unknown} {score}/100 {}")
+        self.assertEqual(template.render({"first_name": "Ada", "score": 88}), "Hi Ada, {unknown} 88/100 {}")
+        self.assertEqual(template.render({}), "Hi , {unknown} /100 {}")
+        self.assertEqual(MergeTemplate("Hi {name}", merge=False).render({"name": "Ada"}), "Hi {name}")
+
+    def test_merge_send_is_personalized_and_escaped(self):
+        context = candidate_context("<Ada> Lovelace", "a@example.com", "Data\nAnalyst", 91)
+        email, html = self.message("Your {job_title} application", "Dear {first_name}, score {score}", [context])
+        self.assertEqual(email.subject, "Your Data Analyst application")
+        self.assertIn("Dear <Ada>, score 91", email.body)
+        self.assertIn("Dear &lt;Ada&gt;, score 91", html)
+        self.assertNotIn("<Ada>", html)
+
+    def test_plain_send_is_verbatim(self):
+        email, html = self.message("About {name}", "Use {name} and {score} as placeholders.")
+        self.assertEqual(email.subject, "About {name}")
+        self.assertIn("Use {name} and {score} as placeholders.", email.body)
+        self.assertIn("Use {name} and {score} as placeholders.", html)
+
+    def test_merge_send_gives_copies_their_own_unpersonalized_message(self):
+        contexts = [candidate_context(name, f"{name.lower()}@example.com", "Analyst", 90) for name in ("Ada", "Bob")]
+        send = outbox.enqueue_send(
+            self.hr, "Hi {first_name}", "Your score: {score}", ["ada@example.com", "bob@example.com"],
+            cc=["lead@example.com"], bcc=["audit@example.com"], contexts=contexts,
+        )
+        prepared = PreparedSend(send)
+        messages = [prepared.message(r) for r in send.recipients.order_by("id")]
+
+        self.assertEqual([(m.to, m.cc, m.bcc) for m in messages], [
+            (["ada@example.com"], [], []),
+            (["bob@example.com"], [], []),
+            ([], ["lead@example.com"], ["audit@example.com"]),
+        ])
+        self.assertEqual([m.subject for m in messages], ["Hi Ada", "Hi Bob", "Hi {first_name}"])
+        self.assertIn("Your score: {score}", messages[2].body)
+        self.assertNotIn("Ada", messages[2].body)
+
+    def test_merge_send_without_copies_has_no_extra_message(self):
+        context = candidate_context("Ada", "ada@example.com", "Analyst", 90)
+        send = outbox.enqueue_send(self.hr, "Hi", "Hello {name}", ["ada@example.com"], contexts=[context])
+        self.assertEqual(list(send.recipients.values_list("email", "with_copies")), [("ada@example.com", False)])
+
+    def test_candidate_recipients_dedupes_addresses(self):
+        job = Job.objects.create(hr=self.hr, title="Analyst", skills=["SQL"])
+        CandidateResume.objects.bulk_create([
+            CandidateResume(job=job, candidate_name="Ada Lovelace", candidate_email="ada@example.com", ai_score=90, shortlisted=True),
+            CandidateResume(job=job, candidate_name="Ada L", candidate_email=" ADA@example.com", ai_score=80, shortlisted=True),
+            CandidateResume(job=job, candidate_name="", candidate_email="anon@example.com", ai_score=70, shortlisted=True),
+            CandidateResume(job=job, candidate_name="Bob", candidate_email="bob@example.com", ai_score=95),
+        ])
+        recipients = candidate_recipients(self.hr, job.id)
+        self.assertEqual([email for email, _ in recipients], ["ada@example.com", "anon@example.com"])
+        self.assertEqual(recipients[0][1]["first_name"], "Ada")
+        self.assertEqual(recipients[1][1]["name"], "there")
+        self.assertEqual(len(candidate_recipients(self.hr, job.id, shortlisted_only=False, min_score=85)), 2)
+
+
+class ToggleShortlistTests(TestCase):
+    def setUp(self):
+        self.hr = HRUser.objects.create_user("toggle@example.com", "Toggle HR", "x")
+        self.job = Job.objects.create(hr=self.hr, title="PM", skills=["Roadmaps"])
+        self.candidate = CandidateResume.objects.create(job=self.job, candidate_name="Ada", ai_score=80)
+        self.client = APIClient()
+        self.client.force_authenticate(self.hr)
+        self.url = f"/api/candidates/shortlist/{self.candidate.id}/"
+
+    def counters(self):
+        return HRStats.objects.get(pk=self.hr.pk).shortlisted, JobStats.objects.get(pk=self.job.pk).shortlisted
+
+    def test_form_encoded_values_are_parsed_like_the_column(self):
+        response = self.client.post(self.url, {"shortlisted": "false"})
+        self.assertEqual(response.data["shortlisted"], False)
+        self.assertEqual(self.counters(), (0, 0))
+
+        self.client.post(self.url, {"shortlisted": "true"})
+        self.assertTrue(CandidateResume.objects.get(pk=self.candidate.pk).shortlisted)
+        self.assertEqual(self.counters(), (1, 1))
+
+        self.assertEqual(self.client.post(self.url, {"shortlisted": "maybe"}).status_code, 400)
+
+    def test_repeated_toggles_count_once(self):
+        for _ in range(3):
+            self.assertEqual(self.client.post(self.url, {"shortlisted": True}, format="json").status_code, 200)
+        self.assertEqual(self.counters(), (1, 1))
+        self.client.post(self.url, {"shortlisted": False}, format="json")
+        self.client.post(self.url, {"shortlisted": False}, format="json")
+        self.assertEqual(self.counters(), (0, 0))
+
+    def test_other_hr_cannot_toggle(self):
+        other = APIClient()
+        other.force_authenticate(HRUser.objects.create_user("other@example.com", "Other", "x"))
+        self.assertEqual(other.post(self.url, {"shortlisted": True}, format="json").status_code, 404)
+        self.assertEqual(self.client.post("/api/candidates/shortlist/999999/", {"shortlisted": True}, format="json").status_code, 404)
+        self.assertFalse(CandidateResume.objects.get(pk=self.candidate.pk).shortlisted)
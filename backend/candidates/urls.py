@@ -1,8 +1,10 @@
-from .views import ToggleShortlistView,CandidateListView,SendBulkEmailView
+from .views import ToggleShortlistView,CandidateListView,SendBulkEmailView,BulkShortlistView,EmailSendStatusView
 from django.urls import path
 urlpatterns = [
 path("shortlist/<int:id>/", ToggleShortlistView.as_view()),
+path("shortlist/bulk/", BulkShortlistView.as_view(), name="bulk-shortlist"),
 path('job/<int:job_id>/', CandidateListView.as_view(), name='candidate-list'),
 path("send-email/", SendBulkEmailView.as_view()),
+path("send-email/<int:send_id>/", EmailSendStatusView.as_view(), name="email-send-status"),
 
 ]
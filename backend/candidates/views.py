@@ -1,51 +1,106 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import serializers, status
 
 from .models import CandidateResume
+from .shortlisting import bulk_shortlist
 
 class ToggleShortlistView(APIView):
-
+    """
+    POST /api/candidates/shortlist/<id>/  {"shortlisted": true|false}
+    Goes through bulk_shortlist(): one conditional UPDATE scoped to the
+    current HR's candidates, so counters only move when the flag changed.
+    """
     def post(self, request, id):
         try:
-            candidate = CandidateResume.objects.get(id=id)
-            candidate.shortlisted = request.data.get("shortlisted", False)
-            candidate.save()
+            shortlisted = serializers.BooleanField().to_internal_value(request.data.get("shortlisted", False))
+        except serializers.ValidationError:
+            return Response({"error": "shortlisted must be a boolean"}, status=status.HTTP_400_BAD_REQUEST)
 
-            return Response(
-                {"success": True, "shortlisted": candidate.shortlisted},
-                status=status.HTTP_200_OK
-            )
-
-        except CandidateResume.DoesNotExist:
+        changed, _ = bulk_shortlist(request.user, shortlisted, ids=[id])
+        if not changed and not CandidateResume.objects.filter(id=id, job__hr=request.user).exists():
             return Response(
                 {"error": "Candidate not found"},
                 status=status.HTTP_404_NOT_FOUND
             )
+        return Response(
+            {"success": True, "shortlisted": shortlisted},
+            status=status.HTTP_200_OK
+        )
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from .models import CandidateResume
 from .serializers import CandidateResumeSerializer
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
+from .shortlisting import bulk_shortlist
+
+class BulkShortlistView(APIView):
+    """
+    POST /api/candidates/shortlist/bulk/
+      {"ids": [1, 2, 3], "shortlisted": true}
+      {"job_id": 7, "min_score": 70}            (shortlisted defaults to true)
+    Applies to the current HR's candidates only, in a single UPDATE.
+    """
+    MAX_IDS = 5000
+
+    def post(self, request):
+        ids = request.data.get("ids")
+        job_id = request.data.get("job_id")
+        min_score = request.data.get("min_score")
+        shortlisted = request.data.get("shortlisted", True)
+        if isinstance(shortlisted, str):
+            shortlisted = shortlisted.lower() in ("1", "true", "yes")
+
+        try:
+            if ids is not None:
+                if not isinstance(ids, list) or len(ids) > self.MAX_IDS:
+                    raise ValueError
+                ids = [int(i) for i in ids]
+            job_id = int(job_id) if job_id not in (None, "") else None
+            min_score = int(min_score) if min_score not in (None, "") else None
+        except (TypeError, ValueError):
+            return Response(
+                {"error": f"ids must be a list of at most {self.MAX_IDS} integers; job_id and min_score integers"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if ids is None and job_id is None:
+            return Response({"error": "Provide ids or job_id"}, status=status.HTTP_400_BAD_REQUEST)
+
+        changed, counts = bulk_shortlist(request.user, bool(shortlisted), ids=ids, job_id=job_id, min_score=min_score)
+        return Response({"success": True, "shortlisted": bool(shortlisted), "updated": len(changed), "ids": changed, **counts})
+
 
 class CandidateListView(APIView):
+    """
+    GET /api/candidates/job/<job_id>/?fields=name,email,score,shortlisted
+    `fields` limits both the response and the columns read from the DB.
+    """
     def get(self, request, job_id):
+        fields, unknown = CandidateResumeSerializer.parse_fields(request.query_params.get("fields"))
+        if unknown:
+            return Response(
+                {"error": "Unknown fields", "invalid": unknown, "allowed": list(CandidateResumeSerializer.SOURCES)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         candidates = CandidateResume.objects.filter(job_id=job_id)
-        serializer = CandidateResumeSerializer(candidates, many=True, context={'request': request})
+        if fields and not set(fields) & CandidateResumeSerializer.COMPUTED:
+            # plain columns only: skip model instances and the serializer entirely
+            return Response({"candidates": list(CandidateResumeSerializer.as_values(candidates, fields))})
+
+        candidates = CandidateResumeSerializer.project(candidates, fields)
+        serializer = CandidateResumeSerializer(candidates, many=True, fields=fields, context={'request': request})
         return Response({"candidates": serializer.data})
 
 # views.py
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.core.mail import EmailMultiAlternatives, get_connection
-from django.template.loader import render_to_string
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
-import math
+from .models import EmailSend
+from .outbox import enqueue_send, send_status
+from .mail_merge import candidate_recipients
 
 class SendBulkEmailView(APIView):
     """
@@ -56,6 +111,11 @@ class SendBulkEmailView(APIView):
       - subject
       - message (plain-text)
       - attachments (multiple files)
+    Mail-merge mode: pass `job_id` instead of `to` to email that job's
+    candidates (`audience`: "shortlisted" (default) or "all", optional
+    `min_score`); subject / message may use {name}, {first_name}, {email},
+    {job_title} and {score}. cc / bcc then get one separate copy with the
+    placeholders as written, never a candidate's personalized message.
     """
 
     def _parse_emails(self, csv):
@@ -91,6 +151,28 @@ class SendBulkEmailView(APIView):
         cc_list, invalid_cc = self._parse_emails(cc_raw)
         bcc_list, invalid_bcc = self._parse_emails(bcc_raw)
 
+        contexts = None
+        skipped = []
+        if request.data.get("job_id"):
+            try:
+                job_id = int(request.data.get("job_id"))
+                min_score = request.data.get("min_score")
+                min_score = int(min_score) if min_score not in (None, "") else None
+            except (TypeError, ValueError):
+                return Response({"error": "job_id and min_score must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+            shortlisted_only = request.data.get("audience", "shortlisted") != "all"
+            to_list, contexts = [], []
+            for email, context in candidate_recipients(request.user, job_id, shortlisted_only, min_score):
+                valid, _ = self._parse_emails(email)
+                if valid:
+                    to_list.append(email)
+                    contexts.append(context)
+                else:
+                    skipped.append(email)
+            invalid_to = []
+            if not to_list:
+                return Response({"error": "No candidates with a valid email address match", "skipped": skipped}, status=status.HTTP_400_BAD_REQUEST)
+
         invalid_all = invalid_to + invalid_cc + invalid_bcc
         if invalid_all:
             return Response(
@@ -98,58 +180,30 @@ class SendBulkEmailView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # render html body
-        html_body = render_to_string("candidates/email_template.html", {"message": message})
-        # Optional: strip tags for plain text
-        from django.utils.html import strip_tags
-        text_body = strip_tags(html_body) or message
-
-        # Determine recipients for direct 'To' sending. 
-        recipients = to_list[:]  # copy
+        if not to_list and not cc_list and not bcc_list:
+            return Response({"error": "At least one recipient is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # If sending to very many recipients, send in batches so SMTP servers don't choke
-        BATCH_SIZE = 50  # tweak for your provider; smaller for free providers
-        all_recipients = recipients.copy()
+        # rendered once and delivered per recipient by `manage.py run_email_worker`
+        send = enqueue_send(
+            request.user, subject, message, to_list, cc_list, bcc_list,
+            request.FILES.getlist("attachments"), contexts=contexts,
+        )
+        return Response({
+            "success": True,
+            "send_id": send.id,
+            "merge": send.merge,
+            "queued": send.recipients.count(),
+            "skipped": skipped,
+            "status_url": f"/api/candidates/send-email/{send.id}/",
+        }, status=status.HTTP_202_ACCEPTED)
 
-        # We use a single connection to send multiple messages efficiently
-        connection = get_connection(fail_silently=False)
 
-        sent_count = 0
-        errors = []
+class EmailSendStatusView(APIView):
+    """GET /api/candidates/send-email/<send_id>/ - per-recipient delivery status."""
 
+    def get(self, request, send_id):
         try:
-            # Create attachments list from uploaded files
-            attachments = []
-            for f in request.FILES.getlist("attachments"):
-                attachments.append((f.name, f.read(), f.content_type))
-
-            # send in batches
-            for i in range(0, len(all_recipients), BATCH_SIZE):
-                batch = all_recipients[i:i+BATCH_SIZE] or []
-                if not batch:
-                    # if no 'to' recipients, still allow cc/bcc-only case
-                    batch_recipients = cc_list + bcc_list
-                else:
-                    batch_recipients = batch
-
-                email = EmailMultiAlternatives(
-                    subject=subject,
-                    body=text_body,
-                    from_email=None,  # will use DEFAULT_FROM_EMAIL
-                    to=batch_recipients,
-                    cc=cc_list if batch else cc_list,
-                    bcc=bcc_list if batch else bcc_list,
-                    connection=connection
-                )
-                email.attach_alternative(html_body, "text/html")
-                for name, content, mime in attachments:
-                    email.attach(name, content, mime)
-                email.send()
-                sent_count += len(batch_recipients)
-        except Exception as e:
-            errors.append(str(e))
-
-        if errors:
-            return Response({"success": False, "sent": sent_count, "errors": errors}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-        return Response({"success": True, "sent": sent_count})
+            send = EmailSend.objects.get(id=send_id, hr=request.user)
+        except EmailSend.DoesNotExist:
+            return Response({"error": "Send not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(send_status(send))
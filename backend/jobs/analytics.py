@@ -0,0 +1,106 @@
+# jobs/analytics.py
+"""
+Score distribution / skill frequency analytics for one job or all of an HR
+user's jobs.
+
+Counts, average, histogram and percentiles all come from one NumPy pass over
+a flat (ai_score, shortlisted, llm_evaluated) projection, so they always
+describe the same rows; top skills from the extracted_skills column alone. Results are cached per job / per HR user in
+the default cache (the shared database cache, so an invalidation in one
+process is seen by every web and worker process) and dropped on every
+candidate write (signals wired in JobsConfig.ready(), plus
+explicit invalidate() calls next to QuerySet.update()/bulk_update() writes).
+ANALYTICS_CACHE_TIMEOUT only bounds staleness if an invalidation is missed.
+"""
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Job
+
+HISTOGRAM_EDGES = np.arange(0, 101, 10)  # 0-9, 10-19, ..., 90-100
+PERCENTILES = (25, 50, 75, 90)
+TOP_SKILLS = 15
+ROW_DTYPE = [("ai_score", np.int32), ("shortlisted", bool), ("llm_evaluated", bool)]
+
+
+def _key(scope, pk):
+    return f"analytics:{scope}:{pk}"
+
+def invalidate(job_id, hr_id=None):
+    if hr_id is None:
+        hr_id = Job.objects.filter(id=job_id).values_list("hr_id", flat=True).first()
+    cache.delete_many([_key("job", job_id), _key("hr", hr_id)])
+
+def invalidate_many(job_ids, hr_id):
+    cache.delete_many([_key("job", job_id) for job_id in job_ids] + [_key("hr", hr_id)])
+
+def compute(qs):
+    """Analytics dict for a CandidateResume queryset."""
+    rows = np.fromiter(
+        qs.values_list("ai_score", "shortlisted", "llm_evaluated").iterator(chunk_size=5000),
+        dtype=ROW_DTYPE,
+    )
+    scores = rows["ai_score"]
+    n = len(rows)
+    shortlisted = int(rows["shortlisted"].sum())
+
+    counts, _ = np.histogram(np.clip(scores, 0, 100), bins=HISTOGRAM_EDGES)
+    histogram = [
+        {"from": int(lo), "to": int(hi) - 1 if hi < 100 else 100, "count": int(c)}
+        for lo, hi, c in zip(HISTOGRAM_EDGES[:-1], HISTOGRAM_EDGES[1:], counts)
+    ]
+    percentiles = (
+        {f"p{p}": float(v) for p, v in zip(PERCENTILES, np.percentile(scores, PERCENTILES))}
+        if n else {f"p{p}": None for p in PERCENTILES}
+    )
+
+    skills = Counter()
+    display = {}
+    for row in qs.values_list("extracted_skills", flat=True).iterator(chunk_size=5000):
+        # count each skill once per candidate, case-insensitively
+        seen = set()
+        for skill in row or []:
+            name = " ".join(str(skill).split())
+            key = name.lower()
+            if key and key not in seen:
+                seen.add(key)
+                display.setdefault(key, name)
+        skills.update(seen)
+
+    return {
+        "count": n,
+        "shortlisted": shortlisted,
+        "shortlist_rate": round(shortlisted / n, 4) if n else 0.0,
+        "llm_evaluated": int(rows["llm_evaluated"].sum()),
+        "average": round(float(scores.mean()), 1) if n else None,
+        "histogram": histogram,
+        "percentiles": percentiles,
+        "top_skills": [{"skill": display[k], "count": c} for k, c in skills.most_common(TOP_SKILLS)],
+    }
+
+def job_analytics(job):
+    from candidates.models import CandidateResume
+
+    key = _key("job", job.id)
+    data = cache.get(key)
+    if data is None:
+        data = compute(CandidateResume.objects.filter(job_id=job.id))
+        cache.set(key, data, settings.ANALYTICS_CACHE_TIMEOUT)
+    return data
+
+def hr_analytics(hr):
+    from candidates.models import CandidateResume
+
+    key = _key("hr", hr.pk)
+    data = cache.get(key)
+    if data is None:
+        data = compute(CandidateResume.objects.filter(job__hr_id=hr.pk))
+        cache.set(key, data, settings.ANALYTICS_CACHE_TIMEOUT)
+    return data
+
+def _candidate_changed(sender, instance, **kwargs):
+    if not kwargs.get("raw"):
+        invalidate(instance.job_id)
@@ -1,6 +1,21 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class JobsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'jobs'
+
+    def ready(self):
+        from . import analytics, hr_stats
+        from .job_search import _job_saved
+
+        Job = self.get_model("Job")
+        CandidateResume = self.apps.get_model("candidates", "CandidateResume")
+        post_save.connect(_job_saved, sender=Job, dispatch_uid="jobs.index_job")
+        post_save.connect(hr_stats._job_saved, sender=Job, dispatch_uid="jobs.stats_job_saved")
+        post_delete.connect(hr_stats._job_deleted, sender=Job, dispatch_uid="jobs.stats_job_deleted")
+        post_save.connect(hr_stats._candidate_saved, sender=CandidateResume, dispatch_uid="jobs.stats_candidate_saved")
+        post_delete.connect(hr_stats._candidate_deleted, sender=CandidateResume, dispatch_uid="jobs.stats_candidate_deleted")
+        post_save.connect(analytics._candidate_changed, sender=CandidateResume, dispatch_uid="jobs.analytics_candidate_saved")
+        post_delete.connect(analytics._candidate_changed, sender=CandidateResume, dispatch_uid="jobs.analytics_candidate_deleted")
@@ -0,0 +1,256 @@
+# jobs/archive_import.py
+"""
+Bulk resume import from a ZIP or tar.gz archive.
+
+Members are streamed one at a time: each supported member is decompressed
+into its own temp file (never the whole archive), evaluated in windows of
+RESUME_EVAL_MAX_WORKERS files through the regular evaluation pipeline (or
+queued on an ingestion batch), and its temp file is dropped right after.
+
+With pre-scoring enabled the archive is streamed twice: the first pass only
+parses and ranks every member, so PRESCORE_TOP_K / PRESCORE_MIN_SCORE apply
+to the whole archive rather than to each window; the second pass evaluates
+the windows with that selection (PDF text comes from the text cache).
+"""
+import os
+import tarfile
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+
+from . import prescoring
+from .evaluation import EvaluationError, evaluate_resumes, lookup_resume_text, read_resume, resume_text
+from .pdf_extraction import store_pdf_text
+from .ingestion import add_item
+
+SUPPORTED_EXTENSIONS = (".pdf", ".txt")
+CHUNK_SIZE = 64 * 1024
+
+
+class ArchiveError(Exception):
+    """Archive-level failure (unreadable archive or an archive limit hit)."""
+
+
+class _MemberTooLarge(Exception):
+    pass
+
+
+def _skip(name):
+    base = os.path.basename(name)
+    # macOS resource forks and hidden files show up in most exported ZIPs
+    return not base or base.startswith(".") or name.startswith("__MACOSX/")
+
+def _spool(stream, name, budget):
+    """Copy one member into a temp file, enforcing per-member and total size limits."""
+    member_limit = settings.ARCHIVE_MAX_MEMBER_MB * 1024 * 1024
+    tmp = TemporaryUploadedFile(name, "application/octet-stream", 0, None)
+    size = 0
+    try:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > budget:
+                raise ArchiveError(f"Archive exceeds {settings.ARCHIVE_MAX_TOTAL_MB} MB uncompressed.")
+            if size > member_limit:
+                raise _MemberTooLarge()
+            tmp.write(chunk)
+    except BaseException:
+        tmp.close()
+        raise
+    tmp.size = size
+    tmp.seek(0)
+    return tmp
+
+def _zip_members(f):
+    try:
+        zf = zipfile.ZipFile(f)
+    except zipfile.BadZipFile:
+        raise ArchiveError("Not a valid ZIP archive.")
+    with zf:
+        infos = [i for i in zf.infolist() if not i.is_dir() and not _skip(i.filename)]
+        # the central directory lets us reject oversized archives up front;
+        # actual bytes are still counted while streaming since sizes can lie
+        if len(infos) > settings.ARCHIVE_MAX_MEMBERS:
+            raise ArchiveError(f"Archive has {len(infos)} files (limit {settings.ARCHIVE_MAX_MEMBERS}).")
+        if sum(i.file_size for i in infos) > settings.ARCHIVE_MAX_TOTAL_MB * 1024 * 1024:
+            raise ArchiveError(f"Archive exceeds {settings.ARCHIVE_MAX_TOTAL_MB} MB uncompressed.")
+        for info in infos:
+            with zf.open(info) as stream:
+                yield info.filename, stream
+
+def _tar_members(f):
+    try:
+        # "r|*" is tarfile's streaming mode: members are read strictly in order
+        tf = tarfile.open(fileobj=f, mode="r|*")
+    except tarfile.TarError:
+        raise ArchiveError("Not a valid tar archive.")
+    with tf:
+        count = 0
+        for member in tf:
+            if not member.isfile() or _skip(member.name):
+                continue
+            count += 1
+            if count > settings.ARCHIVE_MAX_MEMBERS:
+                raise ArchiveError(f"Archive has more than {settings.ARCHIVE_MAX_MEMBERS} files.")
+            yield member.name, tf.extractfile(member)
+
+def iter_members(f):
+    """
+    Yield (member_name, temp_file, error) for every file in the archive;
+    temp_file is None when the member was rejected. Raises ArchiveError.
+    """
+    name = (f.name or "").lower()
+    f.seek(0)
+    if zipfile.is_zipfile(f):
+        f.seek(0)
+        members = _zip_members(f)
+    elif name.endswith((".tar.gz", ".tgz", ".tar")):
+        f.seek(0)
+        members = _tar_members(f)
+    else:
+        raise ArchiveError("Unsupported archive type (use .zip or .tar.gz).")
+
+    remaining = settings.ARCHIVE_MAX_TOTAL_MB * 1024 * 1024
+    try:
+        for member_name, stream in members:
+            if not member_name.lower().endswith(SUPPORTED_EXTENSIONS):
+                yield member_name, None, "Unsupported file type"
+                continue
+            try:
+                tmp = _spool(stream, member_name, remaining)
+            except _MemberTooLarge:
+                yield member_name, None, f"File larger than {settings.ARCHIVE_MAX_MEMBER_MB} MB"
+                continue
+            remaining -= tmp.size
+            yield member_name, tmp, None
+    except (tarfile.TarError, zipfile.BadZipFile, EOFError, zlib.error):
+        raise ArchiveError("Archive is corrupt or truncated.")
+
+def _parse_member(tmp, pdf_text):
+    # pool thread: no cache / DB access (see evaluation.read_resume)
+    try:
+        return read_resume(tmp, pdf_text)
+    except EvaluationError:
+        return None
+    except Exception as e:
+        print("Pre-scoring parse failed for", tmp.name, e)
+        return None
+    finally:
+        tmp.close()
+
+def _lookup_member(tmp):
+    try:
+        return lookup_resume_text(tmp)
+    except Exception as e:
+        print("PDF text cache lookup failed for", tmp.name, e)
+        return None, None
+
+def prescore_archive(job, f):
+    """
+    First pass: {member index: (score, matched_skills, selected)} ranked over
+    every readable member of the archive. Members missing from the result
+    (unreadable, or pre-scoring failed) are evaluated normally.
+    """
+    texts = {}
+    window = []  # (member index, temp file)
+
+    def parse_window(pool):
+        # cache lookups and stores stay on this thread; only parsing goes to the pool
+        lookups = [_lookup_member(tmp) for _, tmp in window]
+        raws = pool.map(_parse_member, [tmp for _, tmp in window], [pdf_text for _, pdf_text in lookups])
+        for (idx, _), (key, pdf_text), raw in zip(window, lookups, raws):
+            if raw is None:
+                continue
+            if key is not None and pdf_text is None:
+                # the second pass (evaluate_resumes) then hits the cache
+                store_pdf_text(key, raw)
+            try:
+                texts[idx] = resume_text(raw)
+            except EvaluationError:
+                pass
+        window.clear()
+
+    with ThreadPoolExecutor(max_workers=settings.RESUME_EVAL_MAX_WORKERS, thread_name_prefix="archive-prescore") as pool:
+        try:
+            try:
+                for idx, (_, tmp, _) in enumerate(iter_members(f)):
+                    if tmp is not None:
+                        window.append((idx, tmp))
+                        if len(window) >= settings.RESUME_EVAL_MAX_WORKERS:
+                            parse_window(pool)
+            except ArchiveError:
+                # the second pass reports it; rank what was readable
+                pass
+            parse_window(pool)
+        finally:
+            for _, tmp in window:
+                tmp.close()
+
+    if not texts:
+        return {}
+    order = sorted(texts)
+    try:
+        scores, matched = prescoring.score_batch(job, [texts[i] for i in order])
+        selected = prescoring.select_for_llm(scores)
+    except Exception as e:
+        # pre-scoring is an optimization: fall back to evaluating everything
+        print("Pre-scoring failed, sending whole archive to the LLM:", e)
+        return {}
+    return {idx: (int(scores[pos]), matched[pos], bool(selected[pos])) for pos, idx in enumerate(order)}
+
+def import_archive(job, f, provider=None, batch=None):
+    """
+    Evaluate (or, with `batch`, enqueue) every resume in archive `f`.
+    Returns (results, error): one entry per member in archive order, and the
+    archive-level error that stopped the import early, if any.
+    """
+    results = []
+    window = []  # (results index, temp file)
+    # queued batches are ranked as a whole by the ingestion worker
+    prescored = prescore_archive(job, f) if batch is None and prescoring.enabled() else None
+
+    def flush():
+        try:
+            if window:
+                entries = evaluate_resumes(
+                    job, [tmp for _, tmp in window], provider,
+                    prescored=[prescored.get(idx) for idx, _ in window] if prescored is not None else None,
+                )
+                for (idx, _), entry in zip(window, entries):
+                    results[idx].update(entry)
+        finally:
+            for _, tmp in window:
+                tmp.close()
+            window.clear()
+
+    error = None
+    try:
+        try:
+            for member_name, tmp, member_error in iter_members(f):
+                entry = {"member": member_name, "filename": os.path.basename(member_name)}
+                results.append(entry)
+                if member_error:
+                    entry["error"] = member_error
+                elif batch is not None:
+                    try:
+                        item = add_item(batch, tmp)
+                    finally:
+                        tmp.close()
+                    entry.update({"status": item.status, "item_id": item.id})
+                else:
+                    window.append((len(results) - 1, tmp))
+                    if len(window) >= settings.RESUME_EVAL_MAX_WORKERS:
+                        flush()
+        except ArchiveError as e:
+            # members already spooled are still evaluated
+            error = str(e)
+        flush()
+    finally:
+        for _, tmp in window:
+            tmp.close()
+    return results, error
@@ -0,0 +1,103 @@
+# jobs/condenser.py
+"""
+Section-aware resume condenser used in place of truncate() ahead of the
+evaluation prompt.
+
+  1. normalize whitespace and drop repeated lines (page headers / footers)
+  2. split into sections: contact (everything before the first heading),
+     skills, experience, projects, education, other
+  3. keep the most job-relevant sections that fit RESUME_PROMPT_TOKEN_BUDGET,
+     cutting the last one short if needed, and emit them in document order
+
+Tokens are estimated as chars / CHARS_PER_TOKEN, which is close enough for
+Gemini on English resumes and needs no tokenizer dependency.
+"""
+import re
+
+from django.conf import settings
+
+CHARS_PER_TOKEN = 4
+
+SECTION_HEADINGS = [
+    ("skills", r"(technical\s+|key\s+|core\s+)?skills?(\s+&\s+tools)?|technologies|tech\s+stack|competencies"),
+    ("experience", r"(work\s+|professional\s+)?experience|employment(\s+history)?|work\s+history|internships?"),
+    ("projects", r"(academic\s+|personal\s+|key\s+)?projects?"),
+    ("education", r"education(al\s+qualifications?)?|academics?|qualifications?"),
+    ("other", r"summary|profile|objective|about\s+me|certifications?|achievements?|awards|"
+              r"publications|languages|interests|hobbies|activities|declaration|references"),
+]
+HEADING_RE = [
+    (name, re.compile(rf"^\s*({pattern})\s*:?\s*$", re.IGNORECASE))
+    for name, pattern in SECTION_HEADINGS
+]
+# sections kept first when they are equally relevant
+BASE_PRIORITY = {"contact": 5, "skills": 4, "experience": 3, "projects": 3, "education": 2, "other": 0}
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+
+def normalize_lines(text):
+    """Collapse whitespace, drop blank lines and lines already seen."""
+    seen = set()
+    lines = []
+    for raw in (text or "").splitlines():
+        line = " ".join(raw.split())
+        if not line:
+            continue
+        key = line.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return lines
+
+def split_sections(lines):
+    """Return [(section_name, [lines])] in document order."""
+    sections = [("contact", [])]
+    for line in lines:
+        name = next((n for n, rx in HEADING_RE if len(line) <= 40 and rx.match(line)), None)
+        if name:
+            sections.append((name, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(name, body) for name, body in sections if body]
+
+def _relevance(name, body, job_terms):
+    terms = set(TOKEN_RE.findall(" ".join(body).lower()))
+    return BASE_PRIORITY.get(name, 0) + 2 * len(terms & job_terms)
+
+def condense(text, job, token_budget=None):
+    """Condensed resume text fitting `token_budget` (default RESUME_PROMPT_TOKEN_BUDGET)."""
+    budget = (token_budget or settings.RESUME_PROMPT_TOKEN_BUDGET) * CHARS_PER_TOKEN
+    sections = split_sections(normalize_lines(text))
+    job_terms = set(TOKEN_RE.findall(f"{job.title} {' '.join(str(s) for s in job.skills or [])}".lower()))
+
+    ranked = sorted(
+        range(len(sections)),
+        key=lambda i: (-_relevance(sections[i][0], sections[i][1], job_terms), i),
+    )
+    kept = {}
+    used = 0
+    for i in ranked:
+        if used >= budget:
+            break
+        body = sections[i][1]
+        size = sum(len(line) + 1 for line in body)
+        if used + size <= budget:
+            kept[i] = body
+            used += size
+            continue
+        # partially keep the section: whole lines from its start, and never
+        # a heading on its own
+        partial, partial_size = [], 0
+        for line in body:
+            if used + partial_size + len(line) + 1 > budget:
+                break
+            partial.append(line)
+            partial_size += len(line) + 1
+        if len(partial) >= (1 if sections[i][0] == "contact" else 2):
+            kept[i] = partial
+            used += partial_size
+    return "\n".join("\n".join(kept[i]) for i in sorted(kept))
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
@@ -0,0 +1,35 @@
+# jobs/conversations.py
+"""
+Per-user chat history for the job-creation flow in JobChatAPIView.
+
+Each HR user has one session in Django's cache, the database cache from
+settings.CACHES, so consecutive requests keep their context even when they
+land on different worker processes. Only the last CHAT_HISTORY_MESSAGES
+messages are kept, each capped at
+CHAT_MESSAGE_MAX_CHARS, so the extraction prompt has a constant upper size.
+Sessions idle for CHAT_SESSION_IDLE_TIMEOUT seconds expire with the cache key.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+
+def _key(user):
+    return f"chat:conversation:{user.pk}"
+
+def history(user):
+    return cache.get(_key(user)) or []
+
+def append(user, role, content):
+    """Add a message to the user's window and return the updated history."""
+    messages = history(user)
+    messages.append({"role": role, "content": (content or "")[:settings.CHAT_MESSAGE_MAX_CHARS]})
+    messages = messages[-settings.CHAT_HISTORY_MESSAGES:]
+    cache.set(_key(user), messages, settings.CHAT_SESSION_IDLE_TIMEOUT)
+    return messages
+
+def clear(user):
+    cache.delete(_key(user))
+
+def render(messages):
+    """Plain 'role: content' lines for the prompt."""
+    return "\n".join(f"{m['role']}: {m['content']}" for m in messages)
@@ -0,0 +1,339 @@
+# jobs/evaluation.py
+"""
+Resume evaluation pipeline used by JobChatAPIView.
+
+Every uploaded file goes through four stages:
+  parse  -> plain text from the PDF / TXT upload
+  prompt -> evaluator prompt + model call
+  score  -> model JSON normalized into CandidateResume fields
+  save   -> CandidateResume row + stored resume file
+
+parse and prompt/score run in a bounded thread pool (the model call is network
+bound, so threads are enough). Cache lookups and stores (the evaluation cache
+and the PDF-text cache) and save always run on the calling thread so all DB
+access stays on the request's connection.
+"""
+import re
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+
+from . import evaluation_cache, prescoring
+from .condenser import condense
+from .helpers import extract_json, truncate
+from .llm import CircuitOpenError
+from .pdf_extraction import PdfLimitError, lookup_pdf_text, parse_pdf, store_pdf_text
+
+# Bump whenever build_prompt / score_evaluation change meaning, so cached
+# evaluations produced by the old prompt are no longer reused.
+PROMPT_VERSION = "1"
+
+
+class EvaluationError(Exception):
+    """Per-file failure; the message is returned to the client in `results`."""
+
+
+# -----------------------------
+# Stages
+# -----------------------------
+def lookup_resume_text(f):
+    """
+    Calling-thread half of parsing: (cache key, memoized PDF text or None) for
+    a PDF upload, (None, None) for anything else. A miss is parsed on a pool
+    thread by read_resume() and stored with store_pdf_text() back here.
+    """
+    if not f.name.lower().endswith(".pdf"):
+        return None, None
+    return lookup_pdf_text(f, budgeted=not settings.RESUME_CONDENSE)
+
+def read_resume(f, pdf_text=None):
+    """
+    Raw text of upload `f`; `pdf_text` is a cache hit from lookup_resume_text()
+    and skips extraction. No cache or DB access, so it is safe on pool threads.
+    Without RESUME_CONDENSE only the pages truncate() keeps are parsed.
+    """
+    fname = f.name.lower()
+    if fname.endswith(".pdf"):
+        if pdf_text is not None:
+            return pdf_text
+        try:
+            return parse_pdf(f, budgeted=not settings.RESUME_CONDENSE)
+        except PdfLimitError as e:
+            raise EvaluationError(str(e))
+    if fname.endswith(".txt"):
+        return f.read().decode("utf-8", errors="ignore")
+    raise EvaluationError("Unsupported file type")
+
+def resume_text(raw):
+    """
+    Resume text as stored on the candidate (resume_text). With RESUME_CONDENSE
+    this is the full text, condensed per job only when the prompt is built
+    (resume_for_prompt), so rescoring ranks sections against the current
+    requirements; otherwise it is truncate()'d.
+    """
+    if not raw.strip():
+        raise EvaluationError("No readable text (scanned PDF maybe).")
+    if settings.RESUME_CONDENSE:
+        return raw
+    return truncate(raw)
+
+def resume_for_prompt(job, text):
+    """The part of a stored resume text that goes into `job`'s evaluation prompt."""
+    if settings.RESUME_CONDENSE:
+        return condense(text, job)
+    return truncate(text)
+
+def job_requirements(job):
+    """Snapshot of the job fields a score depends on (stored on each candidate)."""
+    return {
+        "title": job.title,
+        "skills": list(job.skills or []),
+        "experience_level": job.experience_level,
+        "description": job.description or "",
+        "prompt_version": PROMPT_VERSION,
+    }
+
+def build_prompt(job, text):
+    return f"""
+You are an expert HR evaluator. Compare the resume with this job and return ONLY JSON.
+
+Job:
+Title: {job.title}
+Skills: {job.skills}
+Experience: {job.experience_level}
+
+Resume:
+{text}
+
+Return strictly this JSON:
+{{
+  "name": "",
+  "email": "",
+  "skills_found": [],
+  "projects_found": [],
+  "education": "",
+  "score": 0,
+  "strengths": [],
+  "weaknesses": []
+}}
+"""
+
+def call_model(provider, prompt, fname=""):
+    try:
+        return provider.generate(prompt, kind="resume_evaluation")
+    except CircuitOpenError:
+        raise EvaluationError("AI service temporarily unavailable")
+    except Exception as e:
+        print("LLM call error for", fname, e)
+        raise EvaluationError("AI service error")
+
+def score_evaluation(ai_text):
+    """Turn raw model output into CandidateResume field values."""
+    data = extract_json(ai_text)
+    if not data:
+        raise EvaluationError("Invalid AI JSON")
+
+    # normalize score
+    score = data.get("score", 0)
+    try:
+        score = int(float(score))
+    except Exception:
+        score = 0
+    score = max(0, min(100, score))
+
+    strengths = data.get("strengths", [])
+    weaknesses = data.get("weaknesses", [])
+    if isinstance(strengths, str):
+        strengths = [s.strip() for s in re.split(r"\n|;|\.", strengths) if s.strip()]
+    if isinstance(weaknesses, str):
+        weaknesses = [s.strip() for s in re.split(r"\n|;|\.", weaknesses) if s.strip()]
+
+    return {
+        "candidate_name": data.get("name") or "Unknown",
+        "candidate_email": data.get("email") or "",
+        "extracted_skills": data.get("skills_found", []),
+        "projects_found": data.get("projects_found", []),
+        "education": data.get("education", "") or "",
+        "ai_score": score,
+        "strengths": strengths,
+        "weaknesses": weaknesses,
+    }
+
+def save_candidate(job, f, fields):
+    # import here to avoid circular imports at module top
+    from candidates.models import CandidateResume
+
+    candidate = CandidateResume(job=job, **fields)
+
+    # Store the upload as-is: a spooled TemporaryUploadedFile is moved into
+    # place by FileSystemStorage, anything else is streamed in chunks, and
+    # save=False defers the row to the single INSERT below.
+    f.seek(0)
+    candidate.resume.save(f"{uuid.uuid4()}_{f.name}", f, save=False)
+    candidate.save()
+    return candidate
+
+
+# -----------------------------
+# Pool
+# -----------------------------
+def _parse_one(f, started, idx, pdf_text=None):
+    # latency is measured from when a worker picks the file up, not from submit
+    started[idx] = time.perf_counter()
+    raw = read_resume(f, pdf_text)
+    return raw, round((time.perf_counter() - started[idx]) * 1000, 1)
+
+def evaluate_text(job, text, provider, fname=""):
+    """prompt -> score for resume_for_prompt() text."""
+    ai_text = call_model(provider, build_prompt(job, text), fname)
+    return score_evaluation(ai_text)
+
+def evaluate_resumes(job, files, provider, max_workers=None, on_result=None, prescored=None):
+    """
+    Evaluate `files` for `job` with at most `max_workers` pool tasks in flight.
+    Returns one result dict per file, in upload order, each with `latency_ms`,
+    `parse_ms` (when parsing succeeded), `cached` (True when the evaluation
+    came from the evaluation cache) and `llm_evaluated`.
+    `on_result(idx, entry, candidate)` is called on the calling thread as each
+    file finishes (candidate is None for failed files).
+
+    Parsed texts come back to the calling thread, which checks the cache and
+    only submits a model call on a miss; cache reads/writes and saving all
+    stay on the request's DB connection. With pre-scoring enabled the whole
+    batch is parsed first and ranked locally (jobs/prescoring.py); resumes
+    that don't make the cut are saved with their provisional score instead.
+    Callers that rank a larger set themselves (archive imports) pass
+    `prescored`: one (score, matched_skills, selected) per file, or None to
+    evaluate that file normally.
+    """
+    if max_workers is None:
+        max_workers = settings.RESUME_EVAL_MAX_WORKERS
+    max_workers = max(1, min(max_workers, len(files) or 1))
+
+    results = [None] * len(files)
+    started = {}
+    parse_ms = {}
+    text_hashes = {}
+    prescores = {}
+    texts = {}
+    signature = evaluation_cache.job_signature(job, PROMPT_VERSION)
+    requirements = job_requirements(job)
+    use_prescoring = prescored is None and prescoring.enabled()
+    parsed = {}  # idx -> text, held back for batch pre-scoring
+    parses_left = len(files)
+
+    def finish(idx, fields=None, error=None, cached=False):
+        f = files[idx]
+        entry = {"filename": f.name}
+        candidate = None
+        if error is None:
+            try:
+                fields = {**fields, "resume_text": texts.get(idx, ""), "evaluated_for": requirements}
+                if idx in prescores:
+                    fields["prescore"] = prescores[idx]
+                candidate = save_candidate(job, f, fields)
+                entry.update({
+                    "name": candidate.candidate_name,
+                    "email": candidate.candidate_email,
+                    "score": candidate.ai_score,
+                    "llm_evaluated": candidate.llm_evaluated,
+                })
+            except Exception as e:
+                print("Unexpected error processing", f.name, e)
+                error = "Server error processing file."
+        if error is not None:
+            entry["error"] = error
+        entry["cached"] = cached
+        if idx in prescores:
+            entry["prescore"] = prescores[idx]
+        if idx in parse_ms:
+            entry["parse_ms"] = parse_ms[idx]
+        entry["latency_ms"] = round((time.perf_counter() - started[idx]) * 1000, 1)
+        results[idx] = entry
+        if on_result:
+            on_result(idx, entry, candidate)
+
+    def dispatch(pool, pending, idx, text, provisional=None):
+        texts[idx] = text
+        prompt_text = resume_for_prompt(job, text)
+        text_hashes[idx] = evaluation_cache.resume_hash(prompt_text)
+        fields = evaluation_cache.get(text_hashes[idx], signature)
+        if fields is not None:
+            finish(idx, fields, cached=True)
+        elif provisional is not None:
+            finish(idx, provisional)
+        else:
+            pending[pool.submit(evaluate_text, job, prompt_text, provider, files[idx].name)] = ("score", idx)
+
+    def dispatch_prescored(pool, pending, idx, text, choice):
+        provisional = None
+        if choice is not None:
+            score, matched, selected = choice
+            prescores[idx] = int(score)
+            if not selected:
+                provisional = prescoring.provisional_fields(text, score, matched)
+        dispatch(pool, pending, idx, text, provisional)
+
+    def prescore_and_dispatch(pool, pending):
+        order = sorted(parsed)
+        try:
+            scores, matched = prescoring.score_batch(job, [parsed[i] for i in order])
+            selected = prescoring.select_for_llm(scores)
+        except Exception as e:
+            # pre-scoring is an optimization: fall back to evaluating everything
+            print("Pre-scoring failed, sending whole batch to the LLM:", e)
+            scores = None
+        for pos, idx in enumerate(order):
+            choice = (scores[pos], matched[pos], selected[pos]) if scores is not None else None
+            try:
+                dispatch_prescored(pool, pending, idx, parsed.pop(idx), choice)
+            except Exception as e:
+                print("Unexpected error processing", files[idx].name, e)
+                finish(idx, error="Server error processing file.")
+
+    pdf_keys = {}  # idx -> PDF-text cache key, for misses stored after parsing
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="resume-eval") as pool:
+        pending = {}
+        for idx, f in enumerate(files):
+            try:
+                key, pdf_text = lookup_resume_text(f)
+            except Exception as e:
+                print("PDF text cache lookup failed for", f.name, e)
+                key, pdf_text = None, None
+            if key is not None and pdf_text is None:
+                pdf_keys[idx] = key
+            pending[pool.submit(_parse_one, f, started, idx, pdf_text)] = ("parse", idx)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, idx = pending.pop(future)
+                try:
+                    if stage == "parse":
+                        parses_left -= 1
+                        raw, parse_ms[idx] = future.result()
+                        if idx in pdf_keys:
+                            store_pdf_text(pdf_keys.pop(idx), raw)
+                        text = resume_text(raw)
+                        if use_prescoring:
+                            parsed[idx] = text
+                        elif prescored is not None:
+                            dispatch_prescored(pool, pending, idx, text, prescored[idx])
+                        else:
+                            dispatch(pool, pending, idx, text)
+                    else:
+                        fields = future.result()
+                        evaluation_cache.put(text_hashes[idx], signature, fields)
+                        finish(idx, fields)
+                except EvaluationError as e:
+                    finish(idx, error=str(e))
+                except Exception as e:
+                    print("Unexpected error processing", files[idx].name, e)
+                    finish(idx, error="Server error processing file.")
+                if use_prescoring and stage == "parse" and parses_left == 0:
+                    prescore_and_dispatch(pool, pending)
+
+    return results
@@ -0,0 +1,98 @@
+# jobs/evaluation_cache.py
+"""
+Content-addressed cache of resume evaluations.
+
+Entries are keyed by the hash of the resume text actually sent to the model
+plus a signature of the job fields the prompt uses, so the same PDF uploaded
+to the same job (or a sibling job with identical requirements) skips the
+model call. Stored in the DB so every worker shares it.
+"""
+import hashlib
+import json
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .models import EvaluationCacheEntry
+
+# process-wide counters (per worker); entries also keep their own hit count
+_stats_lock = threading.Lock()
+STATS = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+# prune at most once every N stores to keep writes cheap
+PRUNE_EVERY = 100
+
+
+def _bump(key, n=1):
+    with _stats_lock:
+        STATS[key] += n
+        return STATS[key]
+
+def resume_hash(text):
+    return hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()
+
+def job_signature(job, prompt_version):
+    payload = json.dumps(
+        [job.title, job.skills, job.experience_level, prompt_version],
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _cutoff():
+    return timezone.now() - timedelta(days=settings.EVAL_CACHE_MAX_AGE_DAYS)
+
+def get(text_hash, signature):
+    """Return cached CandidateResume fields or None."""
+    entry = (
+        EvaluationCacheEntry.objects
+        .filter(resume_hash=text_hash, job_signature=signature, created_at__gte=_cutoff())
+        .only("id", "fields")
+        .first()
+    )
+    if entry is None:
+        _bump("misses")
+        return None
+    EvaluationCacheEntry.objects.filter(id=entry.id).update(hits=F("hits") + 1, last_used_at=timezone.now())
+    _bump("hits")
+    return entry.fields
+
+def put(text_hash, signature, fields):
+    now = timezone.now()
+    try:
+        # a fresh evaluation restarts the entry's age, even over an expired row
+        EvaluationCacheEntry.objects.update_or_create(
+            resume_hash=text_hash, job_signature=signature,
+            defaults={"fields": fields, "created_at": now, "last_used_at": now},
+        )
+    except IntegrityError:
+        # another worker stored the same evaluation first
+        return
+    if _bump("stores") % PRUNE_EVERY == 0:
+        prune()
+
+def prune():
+    """Drop expired entries, then least-recently-used ones above the size cap."""
+    removed, _ = EvaluationCacheEntry.objects.filter(created_at__lt=_cutoff()).delete()
+    overflow = EvaluationCacheEntry.objects.count() - settings.EVAL_CACHE_MAX_ENTRIES
+    if overflow > 0:
+        stale_ids = list(
+            EvaluationCacheEntry.objects.order_by("last_used_at").values_list("id", flat=True)[:overflow]
+        )
+        n, _ = EvaluationCacheEntry.objects.filter(id__in=stale_ids).delete()
+        removed += n
+    if removed:
+        _bump("evictions", removed)
+    return removed
+
+def stats():
+    with _stats_lock:
+        return dict(STATS)
+
+def summary():
+    """This process's counters plus the shared table's size and lifetime hits."""
+    table = EvaluationCacheEntry.objects.aggregate(entries=Count("id"), entry_hits=Sum("hits"))
+    return {**stats(), "entries": table["entries"], "entry_hits": table["entry_hits"] or 0}
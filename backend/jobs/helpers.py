@@ -0,0 +1,85 @@
+# jobs/helpers.py
+import json
+import re
+import PyPDF2
+
+# truncate() keeps the first TRUNCATE_HEAD and last TRUNCATE_TAIL chars of
+# texts longer than TRUNCATE_MAX_CHARS
+TRUNCATE_MAX_CHARS = 15000
+TRUNCATE_HEAD = 7000
+TRUNCATE_TAIL = 6000
+
+def extract_json(text):
+    """Safely extract a JSON object from model output."""
+    if not text:
+        return None
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    if not match:
+        cleaned = text.replace("```json", "").replace("```", "").strip()
+        match = re.search(r"\{.*\}", cleaned, re.DOTALL)
+    try:
+        return json.loads(match.group()) if match else None
+    except Exception:
+        return None
+
+def extract_array(text):
+    match = re.search(r"\[.*\]", text, re.DOTALL)
+    if not match:
+        return []
+    try:
+        return json.loads(match.group())
+    except Exception:
+        return []
+
+def pdf_to_text(file):
+    parts = []
+    try:
+        reader = PyPDF2.PdfReader(file)
+        for page in reader.pages:
+            parts.append(page.extract_text() or "")
+    except MemoryError:
+        raise
+    except Exception:
+        pass
+    return "".join(parts)
+
+def pdf_to_text_budgeted(file, max_chars=TRUNCATE_MAX_CHARS, head=TRUNCATE_HEAD, tail=TRUNCATE_TAIL):
+    """
+    Same result as truncate(pdf_to_text(file)) but only extracts the pages
+    truncate() keeps: pages are read from the front until `head` chars are
+    collected and from the back until `tail` chars are, and the middle pages
+    are skipped once the document is known to exceed `max_chars`.
+    """
+    try:
+        reader = PyPDF2.PdfReader(file)
+        pages = reader.pages
+        lo, hi = 0, len(pages) - 1
+        front, back = [], []
+        front_len = back_len = 0
+        while lo <= hi:
+            if front_len >= head and back_len >= tail and front_len + back_len > max_chars:
+                # unread middle pages can only make the document longer
+                return "".join(front)[:head] + "\n...\n" + "".join(reversed(back))[-tail:]
+            if front_len < head or back_len >= tail:
+                page_text = pages[lo].extract_text() or ""
+                front.append(page_text)
+                front_len += len(page_text)
+                lo += 1
+            else:
+                page_text = pages[hi].extract_text() or ""
+                back.append(page_text)
+                back_len += len(page_text)
+                hi -= 1
+        # every page was read
+        return truncate("".join(front) + "".join(reversed(back)), max_chars)
+    except MemoryError:
+        raise
+    except Exception:
+        # keep pdf_to_text's partial-text-on-error behaviour exactly
+        file.seek(0)
+        return truncate(pdf_to_text(file), max_chars)
+
+def truncate(text, max_chars=TRUNCATE_MAX_CHARS):
+    if len(text) <= max_chars:
+        return text
+    return text[:TRUNCATE_HEAD] + "\n...\n" + text[-TRUNCATE_TAIL:]
@@ -0,0 +1,132 @@
+# jobs/hr_stats.py
+"""
+Materialized dashboard counters (HRStats per HR user, JobStats per job).
+
+Rows are adjusted with F() increments whenever a job or candidate is created
+or deleted (signals wired in JobsConfig.ready()) and whenever shortlisting
+changes (apply_shortlist_deltas(), fed by candidates.shortlisting with the
+rows its conditional UPDATE changed, since QuerySet.update() sends no
+signals). A missing row is rebuilt from the source tables on first use,
+and `manage.py rebuild_stats` recomputes everything from scratch.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+
+from .models import HRStats, Job, JobStats
+
+
+# -----------------------------
+# Rebuild
+# -----------------------------
+def rebuild(hr_ids=None):
+    """Recompute counters for `hr_ids` (default: every HR user); returns rows written."""
+    from candidates.models import CandidateResume
+
+    jobs = Job.objects.all() if hr_ids is None else Job.objects.filter(hr_id__in=hr_ids)
+    job_counts = {
+        row["job_id"]: row
+        for row in CandidateResume.objects.filter(job__in=jobs).values("job_id").annotate(
+            candidates=Count("id"), shortlisted=Count("id", filter=Q(shortlisted=True))
+        )
+    }
+    job_rows, hr_rows = [], {}
+    for job_id, hr_id in jobs.values_list("id", "hr_id"):
+        counts = job_counts.get(job_id, {})
+        row = JobStats(job_id=job_id, hr_id=hr_id, candidates=counts.get("candidates", 0), shortlisted=counts.get("shortlisted", 0))
+        job_rows.append(row)
+        hr = hr_rows.setdefault(hr_id, HRStats(hr_id=hr_id))
+        hr.jobs += 1
+        hr.candidates += row.candidates
+        hr.shortlisted += row.shortlisted
+    for hr_id in hr_ids or []:
+        hr_rows.setdefault(hr_id, HRStats(hr_id=hr_id))
+
+    with transaction.atomic():
+        JobStats.objects.filter(job__in=jobs).delete()
+        if hr_ids is None:
+            HRStats.objects.all().delete()
+        else:
+            HRStats.objects.filter(hr_id__in=hr_ids).delete()
+        JobStats.objects.bulk_create(job_rows, batch_size=1000)
+        HRStats.objects.bulk_create(hr_rows.values(), batch_size=1000)
+    return len(job_rows) + len(hr_rows)
+
+def get_hr_stats(hr):
+    """{"jobs", "candidates", "shortlisted"} for `hr` from a single primary-key read."""
+    fields = ("jobs", "candidates", "shortlisted")
+    row = HRStats.objects.filter(pk=hr.pk).values(*fields).first()
+    if row is None:
+        rebuild([hr.pk])
+        row = HRStats.objects.filter(pk=hr.pk).values(*fields).first()
+    return row
+
+
+# -----------------------------
+# Incremental updates
+# -----------------------------
+def _bump(model, pk, hr_id, **deltas):
+    """
+    Apply `deltas` to one row. Returns True when the row was missing and all of
+    `hr_id`'s rows were rebuilt instead; they already include this change, so
+    callers must not apply it to the other rows again.
+    """
+    updates = {name: F(name) + delta for name, delta in deltas.items() if delta}
+    if not updates or model.objects.filter(pk=pk).update(**updates):
+        return False
+    # no row yet: build it from the source tables, which already include this change
+    try:
+        rebuild([hr_id])
+    except IntegrityError:
+        # a concurrent request created it first
+        model.objects.filter(pk=pk).update(**updates)
+        return False
+    return True
+
+def job_created(job):
+    _bump(HRStats, job.hr_id, job.hr_id, jobs=1)
+    JobStats.objects.get_or_create(job_id=job.id, defaults={"hr_id": job.hr_id})
+
+def job_deleted(job):
+    # candidates were already decremented one by one by the cascade
+    HRStats.objects.filter(pk=job.hr_id).update(jobs=F("jobs") - 1)
+
+def candidates_changed(job, added=0, shortlisted=0):
+    """Apply candidate / shortlisted deltas (may be negative) for one job."""
+    if not added and not shortlisted:
+        return
+    if _bump(JobStats, job.id, job.hr_id, candidates=added, shortlisted=shortlisted):
+        return
+    _bump(HRStats, job.hr_id, job.hr_id, candidates=added, shortlisted=shortlisted)
+
+def apply_shortlist_deltas(hr_id, per_job):
+    """{job_id: shortlisted delta} for several jobs of one HR user."""
+    for job_id, delta in per_job.items():
+        if delta and _bump(JobStats, job_id, hr_id, shortlisted=delta):
+            return  # rebuilt from the source tables, which include every delta
+    _bump(HRStats, hr_id, hr_id, shortlisted=sum(per_job.values()))
+
+
+# -----------------------------
+# Signal receivers
+# -----------------------------
+def _job_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        job_created(instance)
+
+def _job_deleted(sender, instance, **kwargs):
+    job_deleted(instance)
+
+def _candidate_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        candidates_changed(instance.job, added=1, shortlisted=int(bool(instance.shortlisted)))
+
+def _candidate_deleted(sender, instance, **kwargs):
+    hr_id = Job.objects.filter(id=instance.job_id).values_list("hr_id", flat=True).first()
+    if hr_id is None:
+        return
+    deltas = {"candidates": F("candidates") - 1}
+    if instance.shortlisted:
+        deltas["shortlisted"] = F("shortlisted") - 1
+    # plain updates: never recreate rows while a job is being deleted
+    JobStats.objects.filter(pk=instance.job_id).update(**deltas)
+    HRStats.objects.filter(pk=hr_id).update(**deltas)
@@ -0,0 +1,141 @@
+# jobs/ingestion.py
+"""
+DB-backed resume ingestion queue.
+
+The upload request only stores the files and creates an IngestionBatch
+(status "pending"). `python manage.py run_ingestion_worker` claims pending
+batches and runs them through the regular evaluation pipeline, updating each
+IngestionItem as its file finishes so clients can poll progress.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .evaluation import evaluate_resumes
+from .models import IngestionBatch, IngestionItem
+
+
+def add_item(batch, f):
+    item = IngestionItem(batch=batch, filename=f.name)
+    item.upload.save(f.name, f, save=False)
+    item.save()
+    return item
+
+def enqueue_batch(hr, job, files):
+    with transaction.atomic():
+        batch = IngestionBatch.objects.create(hr=hr, job=job)
+        for f in files:
+            add_item(batch, f)
+    return batch
+
+def open_batch(hr, job):
+    """
+    Batch that is filled incrementally (e.g. while streaming an archive).
+    Workers ignore it until release_batch() marks it pending.
+    """
+    return IngestionBatch.objects.create(hr=hr, job=job, status=IngestionBatch.UPLOADING)
+
+def release_batch(batch):
+    batch.status = IngestionBatch.PENDING
+    batch.save(update_fields=["status"])
+
+def discard_batch(batch):
+    """Delete a batch that was never released, along with its spooled uploads."""
+    for item in batch.items.exclude(upload=""):
+        item.upload.delete(save=False)
+    batch.delete()
+
+def claim_next_batch():
+    """
+    Atomically move the oldest pending batch to "running".
+    The conditional UPDATE makes this safe with several workers on any backend.
+    """
+    while True:
+        batch = IngestionBatch.objects.filter(status=IngestionBatch.PENDING).order_by("id").first()
+        if batch is None:
+            return None
+        now = timezone.now()
+        claimed = IngestionBatch.objects.filter(id=batch.id, status=IngestionBatch.PENDING).update(
+            status=IngestionBatch.RUNNING, heartbeat_at=now
+        )
+        if claimed:
+            batch.status = IngestionBatch.RUNNING
+            batch.heartbeat_at = now
+            return batch
+
+def requeue_stale_batches(older_than=None):
+    """
+    Put batches left "running" by a crashed worker back in the queue. Only
+    batches without a heartbeat for INGESTION_CLAIM_TIMEOUT seconds count as
+    stale, so batches a live worker is still processing are left alone.
+    """
+    cutoff = timezone.now() - (older_than or timedelta(seconds=settings.INGESTION_CLAIM_TIMEOUT))
+    stale = Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True)
+    requeued = 0
+    for batch_id in IngestionBatch.objects.filter(stale, status=IngestionBatch.RUNNING).values_list("id", flat=True):
+        with transaction.atomic():
+            # re-check: the worker may have heartbeated since the SELECT
+            if not IngestionBatch.objects.filter(stale, id=batch_id, status=IngestionBatch.RUNNING).update(status=IngestionBatch.PENDING):
+                continue
+            IngestionItem.objects.filter(batch_id=batch_id, status=IngestionItem.PROCESSING).update(status=IngestionItem.QUEUED)
+        requeued += 1
+    return requeued
+
+def process_batch(batch, provider, max_workers=None):
+    items = list(batch.items.filter(status__in=[IngestionItem.QUEUED, IngestionItem.PROCESSING]).order_by("id"))
+    files = []
+    for item in items:
+        # keep the original filename: the pipeline uses it for type detection and storage
+        files.append(File(item.upload.open("rb"), name=item.filename))
+    IngestionItem.objects.filter(id__in=[i.id for i in items]).update(status=IngestionItem.PROCESSING)
+
+    def on_result(idx, entry, candidate):
+        item = items[idx]
+        item.latency_ms = entry.get("latency_ms")
+        if candidate is not None:
+            item.status = IngestionItem.DONE
+            item.score = candidate.ai_score
+            item.candidate = candidate
+        else:
+            item.status = IngestionItem.ERROR
+            item.error = entry.get("error", "")
+        files[idx].close()
+        # the candidate row keeps its own copy of the resume
+        item.upload.delete(save=False)
+        item.save(update_fields=["status", "score", "candidate", "error", "latency_ms", "upload", "updated_at"])
+        IngestionBatch.objects.filter(id=batch.id).update(heartbeat_at=timezone.now())
+
+    try:
+        evaluate_resumes(batch.job, files, provider, max_workers=max_workers, on_result=on_result)
+    finally:
+        for f in files:
+            f.close()
+
+    batch.status = IngestionBatch.DONE
+    batch.finished_at = timezone.now()
+    batch.save(update_fields=["status", "finished_at"])
+    return batch
+
+def batch_status(batch):
+    items = list(batch.items.order_by("id").values(
+        "id", "filename", "status", "score", "error", "latency_ms", "candidate_id"
+    ))
+    counts = {s: 0 for s, _ in IngestionItem.STATUS_CHOICES}
+    for item in items:
+        counts[item["status"]] += 1
+    return {
+        "batch": {
+            "id": batch.id,
+            "job_id": batch.job_id,
+            "status": batch.status,
+            "total": len(items),
+            "counts": counts,
+            "created_at": batch.created_at.isoformat(),
+            "finished_at": batch.finished_at.isoformat() if batch.finished_at else None,
+        },
+        "items": items,
+    }
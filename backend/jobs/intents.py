@@ -0,0 +1,158 @@
+# jobs/intents.py
+"""
+Chat questions and commands answered straight from the database instead
+of the LLM (top N, score summary, counts, shortlisting above a score).
+
+INTENTS is a table of (name, precompiled pattern, handler, params): the
+first pattern that matches wins, its named groups are converted with the
+`params` converters and passed to the handler together with the job. Each
+handler answers with a single aggregate / sliced ORM query and returns the
+response payload. Messages that match nothing fall through to the
+job-extraction prompt.
+
+To add a question, write a handler and append a row to INTENTS.
+"""
+import re
+from collections import namedtuple
+
+from django.db.models import Avg, Count, Max, Min, Q
+
+from candidates.shortlisting import bulk_shortlist
+
+Intent = namedtuple("Intent", ["name", "pattern", "handler", "params"])
+
+MAX_LISTED = 50
+
+
+def _bounded_int(default, low=1, high=MAX_LISTED):
+    def convert(value):
+        return default if value is None else max(low, min(high, int(value)))
+    return convert
+
+_score = _bounded_int(0, low=0, high=100)
+
+def _candidate_rows(qs, limit):
+    return list(qs.values("id", "candidate_name", "candidate_email", "ai_score", "shortlisted")[:limit])
+
+
+# -----------------------------
+# Handlers
+# -----------------------------
+def top_candidates(job, n):
+    rows = _candidate_rows(job.candidates.order_by("-ai_score", "-created_at", "-id"), n)
+    if not rows:
+        return {"reply": f"There are no candidates for '{job.title}' yet.", "candidates": []}
+    lines = "\n".join(f"{i}. {r['candidate_name'] or 'Unknown'} — {r['ai_score']}" for i, r in enumerate(rows, 1))
+    return {"reply": f"Top {len(rows)} candidate(s) for '{job.title}':\n{lines}", "candidates": rows}
+
+def score_summary(job):
+    stats = job.candidates.aggregate(count=Count("id"), average=Avg("ai_score"), highest=Max("ai_score"), lowest=Min("ai_score"))
+    if not stats["count"]:
+        return {"reply": f"There are no candidates for '{job.title}' yet.", **stats}
+    stats["average"] = round(stats["average"], 1)
+    return {
+        "reply": f"Average score for '{job.title}' is {stats['average']} over {stats['count']} candidate(s) "
+                 f"(highest {stats['highest']}, lowest {stats['lowest']}).",
+        **stats,
+    }
+
+def shortlisted_count(job):
+    stats = job.candidates.aggregate(total=Count("id"), shortlisted=Count("id", filter=Q(shortlisted=True)))
+    return {"reply": f"{stats['shortlisted']} of {stats['total']} candidate(s) are shortlisted for '{job.title}'.", **stats}
+
+def shortlisted_list(job):
+    rows = _candidate_rows(job.candidates.filter(shortlisted=True).order_by("-ai_score", "-id"), MAX_LISTED)
+    if not rows:
+        return {"reply": f"No candidates are shortlisted for '{job.title}' yet.", "candidates": []}
+    names = ", ".join(f"{r['candidate_name'] or 'Unknown'} ({r['ai_score']})" for r in rows)
+    return {"reply": f"Shortlisted for '{job.title}': {names}", "candidates": rows}
+
+def candidate_count(job):
+    total = job.candidates.count()
+    return {"reply": f"There are {total} candidate(s) for '{job.title}'.", "count": total}
+
+def candidates_above(job, threshold):
+    total = job.candidates.filter(ai_score__gte=threshold).count()
+    return {"reply": f"There are {total} candidate(s) with score ≥ {threshold} for '{job.title}'.", "count": total, "threshold": threshold}
+
+def _ids_above(job, threshold):
+    return list(job.candidates.filter(ai_score__gte=threshold).order_by("-ai_score", "-id").values_list("id", flat=True))
+
+def shortlist_preview(job, threshold):
+    ids = _ids_above(job, threshold)
+    return {
+        "reply": f"I found {len(ids)} candidate(s) with score ≥ {threshold} for job '{job.title}'. "
+                 f"If you want I can mark them shortlisted — say 'mark shortlist above {threshold}'.",
+        "shortlist_ids": ids,
+    }
+
+def shortlist_apply(job, threshold):
+    # one conditional UPDATE; changed_ids are the rows whose flag actually flipped
+    changed_ids, _ = bulk_shortlist(job.hr, True, job_id=job.id, min_score=threshold)
+    # every match, including candidates that were already shortlisted
+    ids = _ids_above(job, threshold)
+    return {
+        "reply": f"Marked {len(ids)} candidate(s) as shortlisted for job '{job.title}' (score ≥ {threshold}).",
+        "shortlist_ids": ids,
+        "changed_ids": changed_ids,
+    }
+
+
+SHORTLIST_ABOVE = r"shortlist(?:\s+all)?(?:\s+above|\s+>=|\s+>|\s+greater than|\s+over)?\s*(?P<threshold>\d{1,3})"
+
+INTENTS = [
+    Intent(
+        "shortlisted_count",
+        re.compile(r"\bhow\s+many\b.*\bshort-?listed\b", re.IGNORECASE),
+        shortlisted_count, {},
+    ),
+    Intent(
+        "shortlisted_list",
+        re.compile(r"\b(?:show|list|who|which)\b.*\bshort-?listed\b", re.IGNORECASE),
+        shortlisted_list, {},
+    ),
+    Intent(
+        "top_candidates",
+        re.compile(r"\b(?:top|best|highest[\s-]scor(?:ing|ed))\s+(?P<n>\d{1,3})?\s*(?:candidates?|resumes?|applicants?)\b", re.IGNORECASE),
+        top_candidates, {"n": _bounded_int(5)},
+    ),
+    Intent(
+        "score_summary",
+        re.compile(r"\b(?:average|avg|mean)\b.*\bscores?\b|\bscore\s+(?:summary|stats|statistics)\b", re.IGNORECASE),
+        score_summary, {},
+    ),
+    Intent(
+        "candidates_above",
+        re.compile(r"\bhow\s+many\b.*\babove\s*(?P<threshold>\d{1,3})", re.IGNORECASE),
+        candidates_above, {"threshold": _score},
+    ),
+    Intent(
+        "candidate_count",
+        re.compile(r"\bhow\s+many\s+(?:resumes|candidates|applications|applicants)\b", re.IGNORECASE),
+        candidate_count, {},
+    ),
+    Intent(
+        # verbs like mark / set / 'shortlist all' anywhere in the message apply the shortlist
+        "shortlist_apply",
+        re.compile(
+            r"^(?=.*\b(?:mark|set|apply|save|shortlist\s+all|please\s+shortlist|shortlist\s+and)\b).*?" + SHORTLIST_ABOVE,
+            re.IGNORECASE | re.DOTALL,
+        ),
+        shortlist_apply, {"threshold": _score},
+    ),
+    Intent(
+        "shortlist_preview",
+        re.compile(SHORTLIST_ABOVE, re.IGNORECASE),
+        shortlist_preview, {"threshold": _score},
+    ),
+]
+
+
+def route(message, intents=INTENTS):
+    """Return (intent, kwargs) for the first matching intent, or None."""
+    for intent in intents:
+        m = intent.pattern.search(message)
+        if m:
+            groups = m.groupdict()
+            return intent, {name: convert(groups.get(name)) for name, convert in intent.params.items()}
+    return None
@@ -0,0 +1,115 @@
+# jobs/job_generation.py
+"""
+Skill suggestions and descriptions generated while creating a job.
+
+HR keeps creating the same handful of titles, so both generations are
+memoized in Django's cache (the database cache in settings.CACHES, shared by
+all workers) for JOB_GENERATION_CACHE_TIMEOUT seconds, keyed by normalized
+job title + experience level. Beyond the TTL, entries are culled when the
+cache grows past CACHE_MAX_ENTRIES.
+
+Cache misses are generated concurrently, so a job needs at most one model
+round-trip after extraction, and none when both generations are cached.
+"""
+import hashlib
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+
+# bump when the prompts change so stale generations are not served
+GENERATION_VERSION = "1"
+MIN_SKILLS = 4
+
+
+def normalize_title(title):
+    """'  Full-Stack  Developer ' -> 'full stack developer'"""
+    return " ".join(re.sub(r"[^\w+#.]+", " ", (title or "").lower()).split())
+
+def _key(kind, title, experience_level):
+    raw = f"{normalize_title(title)}|{normalize_title(experience_level)}"
+    digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    return f"jobgen:{GENERATION_VERSION}:{kind}:{digest}"
+
+def _json_array(text):
+    match = re.search(r"\[.*?\]", text or "", re.DOTALL)
+    if match:
+        try:
+            return json.loads(match.group())
+        except Exception:
+            return []
+    return []
+
+def _suggest_skills(provider, title, experience_level):
+    prompt = f"Suggest 8 skills for the job title: \"{title}\" ({experience_level} level). Return only a JSON array."
+    return [str(s) for s in _json_array(provider.generate(prompt, kind="skill_suggestions")) if s]
+
+def _describe(provider, title, experience_level):
+    prompt = f"""
+Write a single natural 2–3 line description for: {title}.
+Experience level: {experience_level}.
+Do NOT include lists, options or numbering — only one short paragraph.
+"""
+    text = provider.generate(prompt, kind="job_description").strip().strip("```").strip()
+    return " ".join(p.strip() for p in text.splitlines() if p.strip())
+
+GENERATORS = {
+    "skills": (_suggest_skills, []),
+    "description": (_describe, ""),
+}
+
+
+def complete_job_fields(provider, data):
+    """
+    Fill data["skills"] (when fewer than MIN_SKILLS) and data["description"]
+    (when empty) from the cache or the model. Failed generations fall back to
+    []/"" and are not cached.
+    """
+    title = data.get("job_title", "")
+    level = data.get("experience_level", "")
+    wanted = []
+    if not data.get("skills") or len(data.get("skills", [])) < MIN_SKILLS:
+        wanted.append("skills")
+    if not data.get("description"):
+        wanted.append("description")
+    if not wanted:
+        return data
+
+    keys = {kind: _key(kind, title, level) for kind in wanted}
+    cached = cache.get_many(list(keys.values()))
+    missing = []
+    for kind in wanted:
+        if keys[kind] in cached:
+            data[kind] = cached[keys[kind]]
+        else:
+            missing.append(kind)
+    if not missing:
+        return data
+
+    def run(kind):
+        generate, fallback = GENERATORS[kind]
+        try:
+            return generate(provider, title, level) or fallback
+        except Exception as e:
+            print("LLM Error:", kind, e)
+            return None
+
+    if len(missing) == 1:
+        generated = {missing[0]: run(missing[0])}
+    else:
+        with ThreadPoolExecutor(max_workers=len(missing), thread_name_prefix="job-generation") as pool:
+            generated = dict(zip(missing, pool.map(run, missing)))
+
+    fresh = {}
+    for kind, value in generated.items():
+        if value is None:
+            data[kind] = GENERATORS[kind][1]
+            continue
+        data[kind] = value
+        if value:
+            fresh[keys[kind]] = value
+    if fresh:
+        cache.set_many(fresh, settings.JOB_GENERATION_CACHE_TIMEOUT)
+    return data
@@ -0,0 +1,92 @@
+# jobs/job_search.py
+"""
+Token index over job titles and skills, used to find "the job I created
+before" from a chat message.
+
+Each job's normalized title / skill tokens are stored in JobSearchToken
+(indexed on (hr, token)) and kept in sync by the post_save signal wired in
+JobsConfig.ready(). find_job() ranks the user's jobs with a single
+GROUP BY query: title tokens weigh TITLE_WEIGHT, skills SKILL_WEIGHT, at
+least one title token must match, and ties go to the newest job.
+
+Tokens are words of 3+ characters, lowercased, with a trailing plural "s"
+dropped ("developers" == "developer") and a few words that appear in most
+job-related messages ignored.
+"""
+import re
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from .models import Job, JobSearchToken
+
+TITLE_WEIGHT = 3
+SKILL_WEIGHT = 1
+STOPWORDS = {"job", "jobs", "role", "position", "the", "and", "for", "with", "created", "before"}
+WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+
+def tokenize(text):
+    tokens = []
+    for word in WORD_RE.findall((text or "").lower()):
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        if len(word) > 2 and word not in STOPWORDS:
+            tokens.append(word[:64])
+    return tokens
+
+def job_tokens(job):
+    """{(token, field): weight} for one job."""
+    weights = {}
+    for token in tokenize(job.title):
+        weights[(token, JobSearchToken.TITLE)] = TITLE_WEIGHT
+    for skill in job.skills or []:
+        for token in tokenize(str(skill)):
+            weights.setdefault((token, JobSearchToken.SKILL), SKILL_WEIGHT)
+    return weights
+
+def _rows(job):
+    return [
+        JobSearchToken(job_id=job.id, hr_id=job.hr_id, token=token, field=field, weight=weight)
+        for (token, field), weight in job_tokens(job).items()
+    ]
+
+def index_job(job):
+    with transaction.atomic():
+        JobSearchToken.objects.filter(job_id=job.id).delete()
+        JobSearchToken.objects.bulk_create(_rows(job))
+
+def rebuild(jobs=None, batch_size=1000):
+    """Re-index `jobs` (default: all jobs); returns the number of jobs indexed."""
+    jobs = Job.objects.all() if jobs is None else jobs
+    count = 0
+    pending = []
+    with transaction.atomic():
+        JobSearchToken.objects.filter(job__in=jobs).delete()
+        for job in jobs.only("id", "hr_id", "title", "skills").iterator(chunk_size=batch_size):
+            pending.extend(_rows(job))
+            count += 1
+            if len(pending) >= batch_size:
+                JobSearchToken.objects.bulk_create(pending, batch_size=batch_size)
+                pending = []
+        JobSearchToken.objects.bulk_create(pending, batch_size=batch_size)
+    return count
+
+def find_job(user, message):
+    """Best-matching job of `user` for `message`, or None."""
+    tokens = set(tokenize(message))
+    if not tokens:
+        return None
+    return (
+        Job.objects.filter(search_tokens__hr=user, search_tokens__token__in=tokens)
+        .annotate(
+            match_score=Sum("search_tokens__weight"),
+            title_hits=Count("search_tokens", filter=Q(search_tokens__field=JobSearchToken.TITLE)),
+        )
+        .filter(title_hits__gt=0)
+        .order_by("-match_score", "-id")
+        .first()
+    )
+
+def _job_saved(sender, instance, **kwargs):
+    index_job(instance)
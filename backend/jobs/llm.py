@@ -0,0 +1,394 @@
+# jobs/llm.py
+"""
+LLM provider layer used by resume scoring and job extraction.
+
+    provider = get_provider()
+    text = provider.generate(prompt, kind="resume_evaluation")
+
+`kind` tells the caller's intent (one of PROMPT_KINDS). Gemini ignores it;
+the local provider uses it to return output of the right shape.
+
+LLM_PROVIDER selects the implementation:
+  gemini -> GeminiProvider (google-generativeai, LLM_MODEL)
+  local  -> LocalProvider: offline, deterministic, schema-valid output with
+            LOCAL_LLM_LATENCY_MS latency and LOCAL_LLM_FAILURE_RATE injected
+            failures, for load tests / benchmarks / CI without network.
+
+get_provider() wraps it in ResilientProvider, shared by every request in the
+process: token-bucket rate limit, AIMD concurrency that halves on 429s and
+ramps back up on success, full-jitter exponential retries for transient
+errors, and a circuit breaker that raises CircuitOpenError while the provider
+is down. Counters are exposed via stats() (GET /jobs/llm-stats/).
+"""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+
+from django.conf import settings
+
+PROMPT_KINDS = ("resume_evaluation", "job_extraction", "skill_suggestions", "job_description")
+
+
+class LLMError(Exception):
+    """The provider could not produce a response."""
+
+
+class LLMTransientError(LLMError):
+    """Worth retrying: timeouts, 5xx, connection resets."""
+
+
+class LLMThrottled(LLMTransientError):
+    """The provider is rate limiting us (HTTP 429 / quota exhausted)."""
+
+
+class CircuitOpenError(LLMError):
+    """Failing fast: the circuit breaker is open after repeated failures."""
+
+
+class LLMProvider:
+    name = "base"
+
+    def generate(self, prompt, kind=None):
+        raise NotImplementedError
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+    _configure_lock = threading.Lock()
+    _configured = False
+
+    def __init__(self, model_name):
+        # imported here so the local provider works without the SDK installed
+        import google.generativeai as genai
+
+        with GeminiProvider._configure_lock:
+            if not GeminiProvider._configured:
+                genai.configure(api_key=settings.GEMINI_API_KEY)
+                GeminiProvider._configured = True
+        self.model = genai.GenerativeModel(model_name)
+
+    def generate(self, prompt, kind=None):
+        try:
+            response = self.model.generate_content(prompt)
+            return response.text if hasattr(response, "text") else str(response)
+        except Exception as e:
+            raise _classify_gemini_error(e) from e
+
+
+class LocalProvider(LLMProvider):
+    """Deterministic offline stand-in: same prompt -> same answer."""
+    name = "local"
+
+    def __init__(self, latency_ms=0, failure_rate=0.0, seed=0):
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def generate(self, prompt, kind=None):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        if self.failure_rate:
+            with self._rng_lock:
+                failed = self._rng.random() < self.failure_rate
+            if failed:
+                raise LLMTransientError("Injected local provider failure")
+
+        handler = getattr(self, f"_{kind}", None) if kind in PROMPT_KINDS else None
+        if handler is None:
+            return ""
+        return handler(prompt)
+
+    @staticmethod
+    def _section(prompt, start, end=None):
+        tail = prompt.split(start, 1)[1] if start in prompt else ""
+        return tail.split(end, 1)[0] if end and end in tail else tail
+
+    def _resume_evaluation(self, prompt):
+        job_skills = self._section(prompt, "Skills:", "\n")
+        resume = self._section(prompt, "Resume:", "Return strictly this JSON:")
+        resume_lower = resume.lower()
+        skills = [s.strip(" '\"") for s in job_skills.strip(" []").split(",") if s.strip(" '\"")]
+        found = [s for s in skills if s.lower() in resume_lower]
+
+        email = re.search(r"[\w.+-]+@[\w-]+\.[\w.-]+", resume)
+        name = next((line.strip() for line in resume.splitlines() if line.strip()), "")
+        digest = int(hashlib.sha256(prompt.encode("utf-8", errors="ignore")).hexdigest(), 16)
+        overlap = len(found) / len(skills) if skills else 0.0
+        score = min(100, int(overlap * 80) + digest % 21)
+
+        return json.dumps({
+            "name": name[:80],
+            "email": email.group() if email else "",
+            "skills_found": found,
+            "projects_found": [],
+            "education": "",
+            "score": score,
+            "strengths": [f"Has {s}" for s in found[:3]],
+            "weaknesses": [f"No evidence of {s}" for s in skills if s not in found][:3],
+        })
+
+    def _job_extraction(self, prompt):
+        conversation = self._section(prompt, "Conversation:")
+        m = re.search(r"(?:job|role|position)\s+(?:for|of|as)\s+(?:an?\s+)?([A-Za-z][\w +#./-]{2,40}?)(?=[,.'\"\n]|$)", conversation, re.IGNORECASE)
+        return json.dumps({
+            "job_title": m.group(1).strip() if m else "Local Test Role",
+            "salary_range": "6 LPA",
+            "experience_level": "Fresher",
+            "job_type": "Full-time",
+            "skills": [],
+            "description": "",
+        })
+
+    def _skill_suggestions(self, prompt):
+        return json.dumps(["Communication", "Teamwork", "Problem Solving", "Git",
+                           "SQL", "Python", "JavaScript", "Testing"])
+
+    def _job_description(self, prompt):
+        title = self._section(prompt, "description for:", "\n").strip(" .") or "this role"
+        return f"We are hiring a {title} to join our team and deliver high quality work."
+
+
+def _classify_gemini_error(e):
+    # google.api_core exception names; matched by name so the SDK stays optional
+    name = type(e).__name__
+    if name in ("ResourceExhausted", "TooManyRequests") or "429" in str(e):
+        return LLMThrottled(str(e))
+    if name in ("ServiceUnavailable", "InternalServerError", "DeadlineExceeded", "GatewayTimeout", "Aborted") \
+            or isinstance(e, (TimeoutError, ConnectionError)):
+        return LLMTransientError(str(e))
+    return LLMError(str(e))
+
+
+# -----------------------------
+# Resilience
+# -----------------------------
+class TokenBucket:
+    """`rate` requests/second with bursts of up to `burst`."""
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = max(1.0, float(burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_for = (1 - self.tokens) / self.rate
+            time.sleep(wait_for)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD limit on in-flight calls: halves on throttling, grows by ~1 per
+    `limit` successes, always within [minimum, maximum].
+    """
+    def __init__(self, minimum, maximum):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(self.maximum)
+        self.in_flight = 0
+        self.cond = threading.Condition()
+
+    def acquire(self):
+        with self.cond:
+            while self.in_flight >= int(self.limit):
+                self.cond.wait()
+            self.in_flight += 1
+
+    def release(self, throttled=False, succeeded=False):
+        with self.cond:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(self.minimum, self.limit / 2)
+            elif succeeded:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self.cond.notify_all()
+
+
+class CircuitBreaker:
+    """closed -> open after `threshold` consecutive failures -> half-open after `cooldown`s."""
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.cooldown or self.trial_in_flight:
+                return False
+            # half-open: let a single trial call through
+            self.trial_in_flight = True
+            return True
+
+    def release_trial(self):
+        """A call ended without telling us anything about the provider's health."""
+        with self.lock:
+            self.trial_in_flight = False
+
+    def record(self, ok):
+        """Returns seconds the circuit was open when it closes, else None; True when it (re)opens."""
+        with self.lock:
+            self.trial_in_flight = False
+            if ok:
+                self.failures = 0
+                if self.opened_at is not None:
+                    open_for = time.monotonic() - self.opened_at
+                    self.opened_at = None
+                    return open_for
+                return None
+            self.failures += 1
+            if self.opened_at is not None:
+                # failed half-open trial: stay open for another cooldown,
+                # counting the time already spent open
+                open_for = time.monotonic() - self.opened_at
+                self.opened_at = time.monotonic()
+                return open_for
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+                return True
+            return None
+
+
+class ResilientProvider(LLMProvider):
+    """
+    Shared wrapper around a provider: token-bucket rate limit, adaptive
+    concurrency, jittered exponential retries on transient errors and a
+    circuit breaker that fails fast while the provider is down.
+    """
+    def __init__(self, inner, rate, burst, min_concurrency, max_concurrency,
+                 max_retries, base_delay, max_delay, breaker_threshold, breaker_cooldown):
+        self.inner = inner
+        self.name = inner.name
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = AdaptiveConcurrency(min_concurrency, max_concurrency)
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_cooldown)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "calls": 0, "successes": 0, "failures": 0, "retries": 0,
+            "throttles": 0, "rejected_open": 0, "circuit_opens": 0, "open_seconds": 0.0,
+        }
+
+    def _count(self, key, n=1):
+        with self._stats_lock:
+            self._stats[key] += n
+
+    def _record(self, ok):
+        if ok is None:
+            self.breaker.release_trial()
+            return
+        outcome = self.breaker.record(ok)
+        if outcome is True:
+            self._count("circuit_opens")
+        elif outcome is not None:
+            self._count("open_seconds", outcome)
+
+    def stats(self):
+        with self._stats_lock:
+            data = dict(self._stats)
+        data["open_seconds"] = round(data["open_seconds"], 1)
+        data["concurrency_limit"] = round(self.concurrency.limit, 2)
+        data["circuit_open"] = self.breaker.opened_at is not None
+        return data
+
+    def generate(self, prompt, kind=None):
+        self._count("calls")
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self._count("rejected_open")
+                raise CircuitOpenError("AI service temporarily unavailable")
+
+            self.bucket.acquire()
+            self.concurrency.acquire()
+            # every path releases the slot and settles the breaker (incl. a
+            # half-open trial), whatever the inner provider raises
+            throttled = succeeded = False
+            outcome = None  # breaker: True ok, False failure, None not the provider's fault
+            try:
+                result = self.inner.generate(prompt, kind=kind)
+                succeeded = outcome = True
+            except LLMTransientError as e:
+                throttled = isinstance(e, LLMThrottled)
+                if throttled:
+                    self._count("throttles")
+                outcome = False
+                if attempt >= self.max_retries:
+                    self._count("failures")
+                    raise
+            except LLMError:
+                # non-retryable (bad request, blocked prompt): not an outage, but not a success either
+                self._count("failures")
+                raise
+            except Exception:
+                # SDK bugs / malformed responses: count as a provider failure
+                outcome = False
+                self._count("failures")
+                raise
+            finally:
+                self.concurrency.release(throttled=throttled, succeeded=succeeded)
+                self._record(outcome)
+            if succeeded:
+                self._count("successes")
+                return result
+
+            attempt += 1
+            self._count("retries")
+            # full jitter: uniform(0, min(max_delay, base * 2^attempt))
+            time.sleep(random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt))))
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def build_provider(name=None):
+    name = (name or settings.LLM_PROVIDER).lower()
+    if name == "gemini":
+        return GeminiProvider(settings.LLM_MODEL)
+    if name == "local":
+        return LocalProvider(
+            latency_ms=settings.LOCAL_LLM_LATENCY_MS,
+            failure_rate=settings.LOCAL_LLM_FAILURE_RATE,
+            seed=settings.LOCAL_LLM_SEED,
+        )
+    raise ValueError(f"Unknown LLM_PROVIDER: {name}")
+
+def get_provider():
+    """Process-wide provider selected by settings.LLM_PROVIDER, behind ResilientProvider."""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = ResilientProvider(
+                build_provider(),
+                rate=settings.LLM_RATE_PER_SEC,
+                burst=settings.LLM_BURST,
+                min_concurrency=settings.LLM_MIN_CONCURRENCY,
+                max_concurrency=settings.LLM_MAX_CONCURRENCY,
+                max_retries=settings.LLM_MAX_RETRIES,
+                base_delay=settings.LLM_RETRY_BASE_DELAY,
+                max_delay=settings.LLM_RETRY_MAX_DELAY,
+                breaker_threshold=settings.LLM_BREAKER_THRESHOLD,
+                breaker_cooldown=settings.LLM_BREAKER_COOLDOWN,
+            )
+        return _provider
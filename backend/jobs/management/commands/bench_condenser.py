@@ -0,0 +1,64 @@
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.condenser import condense, estimate_tokens
+from jobs.evaluation import build_prompt
+from jobs.helpers import pdf_to_text, truncate
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = "Compare evaluation prompt size: head/tail truncate() vs the section-aware condenser."
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+", help="PDF / TXT files or directories containing them.")
+        parser.add_argument("--job-id", type=int, help="Rank sections against this job.")
+        parser.add_argument("--title", default="Software Developer")
+        parser.add_argument("--skills", default="Python,Django,React,SQL", help="Comma separated.")
+        parser.add_argument("--budget", type=int, default=None, help="Token budget (default: settings).")
+
+    def handle(self, *args, **options):
+        if options["job_id"]:
+            try:
+                job = Job.objects.get(id=options["job_id"])
+            except Job.DoesNotExist:
+                raise CommandError(f"Job {options['job_id']} does not exist.")
+        else:
+            job = SimpleNamespace(
+                title=options["title"], experience_level="",
+                skills=[s.strip() for s in options["skills"].split(",") if s.strip()],
+            )
+
+        files = []
+        for p in map(Path, options["paths"]):
+            files.extend(sorted(list(p.glob("*.pdf")) + list(p.glob("*.txt"))) if p.is_dir() else [p])
+        if not files:
+            raise CommandError("No resume files found.")
+
+        total_before = total_after = 0
+        condense_ms = 0.0
+        for path in files:
+            if path.suffix.lower() == ".pdf":
+                with path.open("rb") as fh:
+                    text = pdf_to_text(fh)
+            else:
+                text = path.read_text(errors="ignore")
+
+            started = time.perf_counter()
+            condensed = condense(text, job, options["budget"])
+            condense_ms += (time.perf_counter() - started) * 1000
+
+            before = estimate_tokens(build_prompt(job, truncate(text)))
+            after = estimate_tokens(build_prompt(job, condensed))
+            total_before += before
+            total_after += after
+            self.stdout.write(f"{path.name:50.50} truncate ~{before:6d} tok  condensed ~{after:6d} tok")
+
+        saved = 100 * (1 - total_after / total_before) if total_before else 0
+        self.stdout.write(
+            f"TOTAL {len(files)} file(s): ~{total_before} -> ~{total_after} prompt tokens "
+            f"({saved:.0f}% fewer), condensing took {condense_ms:.1f} ms"
+        )
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.intents import INTENTS, route
+
+SAMPLE_MESSAGES = [
+    "top 5 candidates",
+    "show me the best 10 resumes",
+    "what is the average score?",
+    "score summary please",
+    "how many candidates are shortlisted",
+    "who is shortlisted",
+    "how many candidates above 75",
+    "shortlist above 70",
+    "mark shortlist above 70",
+    "Create a job for Full Stack Developer - Laravel, Fresher, 7 LPA, Full-time",
+    "We need a senior data engineer with Spark and Airflow experience, 25 LPA, remote",
+]
+
+
+class Command(BaseCommand):
+    help = "Measure intent routing cost per chat message (pattern matching only, no DB)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20000)
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        local = 0
+        for message in SAMPLE_MESSAGES:
+            routed = route(message)
+            local += routed is not None
+            self.stdout.write(f"{message[:60]:60.60} -> {routed[0].name if routed else 'LLM'}")
+        self.stdout.write(f"answered locally: {local}/{len(SAMPLE_MESSAGES)}")
+
+        started = time.perf_counter()
+        for _ in range(iterations):
+            for message in SAMPLE_MESSAGES:
+                route(message)
+        elapsed = time.perf_counter() - started
+        per_message_us = elapsed / (iterations * len(SAMPLE_MESSAGES)) * 1e6
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(INTENTS)} intents, {iterations * len(SAMPLE_MESSAGES)} messages routed: "
+            f"{per_message_us:.2f} µs/message"
+        ))
@@ -0,0 +1,77 @@
+import random
+import re
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.models import HRUser
+from jobs.job_search import find_job, rebuild
+from jobs.models import Job
+
+ROLES = ["Developer", "Engineer", "Designer", "Analyst", "Manager", "Trainee", "Consultant", "Architect", "Tester", "Recruiter"]
+AREAS = ["Full Stack", "Backend", "Frontend", "Data", "Mobile", "Cloud", "Security", "QA", "HR", "Sales", "Marketing", "DevOps"]
+STACKS = ["Laravel", "Django", "React", "Node", "Java", "Spark", "Flutter", "AWS", "Azure", "Kotlin", "Golang", "Salesforce"]
+
+
+class _Rollback(Exception):
+    pass
+
+
+def linear_scan(user, message):
+    """The previous implementation: tokenize every title in Python."""
+    message_lower = (message or "").lower()
+    for job in Job.objects.filter(hr=user).order_by("-id"):
+        title_tokens = [t for t in re.split(r"\W+", (job.title or "").lower()) if len(t) > 2]
+        if title_tokens and sum(1 for tk in title_tokens if tk in message_lower) >= 1:
+            return job
+    return None
+
+
+class Command(BaseCommand):
+    help = "Compare chat job lookup: linear title scan vs the token index (runs in a rolled-back transaction)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jobs", type=int, default=10000)
+        parser.add_argument("--queries", type=int, default=50)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        try:
+            with transaction.atomic():
+                self._run(rng, options["jobs"], options["queries"])
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+    def _run(self, rng, n_jobs, n_queries):
+        user = HRUser.objects.create_user(f"bench-{time.time_ns()}@example.com", "Bench HR", None)
+        Job.objects.bulk_create(
+            [
+                Job(
+                    hr=user,
+                    title=f"{rng.choice(AREAS)} {rng.choice(ROLES)} - {rng.choice(STACKS)} {i}",
+                    salary_range="6 LPA", experience_level="Fresher", job_type="Full-time",
+                    skills=rng.sample(STACKS, 3),
+                )
+                for i in range(n_jobs)
+            ],
+            batch_size=1000,
+        )
+        started = time.perf_counter()
+        rebuild(Job.objects.filter(hr=user))
+        self.stdout.write(f"Indexed {n_jobs} jobs in {time.perf_counter() - started:.2f}s")
+
+        # half the messages match nothing, which is the linear scan's worst case
+        messages = [
+            f"I created a job {rng.choice(AREAS).lower()} {rng.choice(ROLES).lower()} before"
+            if i % 2 else "I posted a pharmacist role before"
+            for i in range(n_queries)
+        ]
+        for name, lookup in (("linear scan", linear_scan), ("token index", find_job)):
+            started = time.perf_counter()
+            for message in messages:
+                lookup(user, message)
+            per_query_ms = (time.perf_counter() - started) / len(messages) * 1000
+            self.stdout.write(f"{name:12} {per_query_ms:8.2f} ms/query")
@@ -0,0 +1,44 @@
+import io
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.helpers import pdf_to_text, pdf_to_text_budgeted, truncate
+
+
+class Command(BaseCommand):
+    help = "Compare full extract-then-truncate against page-budgeted PDF extraction."
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+", help="PDF files or directories containing PDFs.")
+        parser.add_argument("--repeat", type=int, default=3, help="Timed runs per file (best is reported).")
+
+    def _best_of(self, fn, data, repeat):
+        best, out = None, None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            out = fn(io.BytesIO(data))
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return out, best * 1000
+
+    def handle(self, *args, **options):
+        files = []
+        for p in map(Path, options["paths"]):
+            files.extend(sorted(p.glob("*.pdf")) if p.is_dir() else [p])
+        if not files:
+            raise CommandError("No PDF files found.")
+
+        total_full = total_budget = 0.0
+        for path in files:
+            data = path.read_bytes()
+            full, full_ms = self._best_of(lambda f: truncate(pdf_to_text(f)), data, options["repeat"])
+            budget, budget_ms = self._best_of(pdf_to_text_budgeted, data, options["repeat"])
+            if full != budget:
+                raise CommandError(f"{path.name}: budgeted output differs from extract-then-truncate")
+            total_full += full_ms
+            total_budget += budget_ms
+            self.stdout.write(f"{path.name:50.50} full {full_ms:8.1f} ms  budgeted {budget_ms:8.1f} ms  ({full_ms / max(budget_ms, 1e-6):.1f}x)")
+
+        self.stdout.write(f"TOTAL {len(files)} file(s): full {total_full:.1f} ms, budgeted {total_budget:.1f} ms")
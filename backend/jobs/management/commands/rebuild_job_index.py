@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from jobs.job_search import rebuild
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = "Rebuild the job title / skill token index used to match chat messages to jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hr-id", type=int, help="Only re-index this HR user's jobs.")
+
+    def handle(self, *args, **options):
+        jobs = Job.objects.all()
+        if options["hr_id"]:
+            jobs = jobs.filter(hr_id=options["hr_id"])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {rebuild(jobs)} job(s)."))
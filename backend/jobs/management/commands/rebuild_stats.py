@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.hr_stats import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the materialized HR / job dashboard counters from the source tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hr-id", type=int, action="append", dest="hr_ids", help="Only this HR user (repeatable).")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rows = rebuild(options["hr_ids"])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {rows} stats row(s) in {time.perf_counter() - started:.2f}s"))
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.llm import get_provider
+from jobs.models import Job
+from jobs.rescoring import rescore_job
+
+
+class Command(BaseCommand):
+    help = "Refresh candidate scores for jobs whose requirements changed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("job_ids", nargs="+", type=int)
+        parser.add_argument("--no-llm", action="store_true", help="Only apply local re-scoring.")
+        parser.add_argument("--max-llm", type=int, default=None, help="Cap on model calls per job.")
+
+    def handle(self, *args, **options):
+        use_llm = not options["no_llm"]
+        provider = get_provider() if use_llm else None
+        for job_id in options["job_ids"]:
+            try:
+                job = Job.objects.get(id=job_id)
+            except Job.DoesNotExist:
+                raise CommandError(f"Job {job_id} does not exist.")
+            started = time.perf_counter()
+            summary = rescore_job(job, provider, use_llm=use_llm, max_llm=options["max_llm"])
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"Job {job.id} '{job.title}': {summary} in {elapsed:.2f}s")
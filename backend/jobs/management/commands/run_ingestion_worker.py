@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs import evaluation_cache
+from jobs.ingestion import claim_next_batch, process_batch, requeue_stale_batches
+from jobs.llm import get_provider
+
+
+class Command(BaseCommand):
+    help = "Evaluate queued resume ingestion batches (run alongside the web workers)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain the queue and exit instead of polling.")
+        parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument("--max-workers", type=int, default=None, help="Concurrent model calls per batch.")
+        parser.add_argument("--requeue-stale", action="store_true", help="Requeue batches left running by a crashed worker (no heartbeat for INGESTION_CLAIM_TIMEOUT) first.")
+
+    def handle(self, *args, **options):
+        provider = get_provider()
+
+        if options["requeue_stale"]:
+            n = requeue_stale_batches()
+            self.stdout.write(f"Requeued {n} stale batch(es).")
+
+        while True:
+            batch = claim_next_batch()
+            if batch is None:
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+                continue
+
+            started = time.perf_counter()
+            before = evaluation_cache.stats()
+            process_batch(batch, provider, max_workers=options["max_workers"])
+            elapsed = time.perf_counter() - started
+            after = evaluation_cache.stats()
+            self.stdout.write(
+                f"Batch {batch.id} (job {batch.job_id}) done in {elapsed:.1f}s "
+                f"(cache hits {after['hits'] - before['hits']}, misses {after['misses'] - before['misses']})"
+            )
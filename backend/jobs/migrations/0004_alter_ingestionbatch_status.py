@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_evaluationcacheentry'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ingestionbatch',
+            name='status',
+            field=models.CharField(choices=[('uploading', 'Uploading'), ('pending', 'Pending'), ('running', 'Running'), ('done', 'Done')], default='pending', max_length=20),
+        ),
+    ]
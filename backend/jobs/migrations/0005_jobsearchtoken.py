@@ -0,0 +1,48 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def index_existing_jobs(apps, schema_editor):
+    from jobs.job_search import job_tokens
+
+    Job = apps.get_model("jobs", "Job")
+    JobSearchToken = apps.get_model("jobs", "JobSearchToken")
+    rows = []
+    for job in Job.objects.only("id", "hr_id", "title", "skills").iterator(chunk_size=1000):
+        rows.extend(
+            JobSearchToken(job_id=job.id, hr_id=job.hr_id, token=token, field=field, weight=weight)
+            for (token, field), weight in job_tokens(job).items()
+        )
+        if len(rows) >= 1000:
+            JobSearchToken.objects.bulk_create(rows)
+            rows = []
+    JobSearchToken.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_alter_ingestionbatch_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64)),
+                ('field', models.CharField(choices=[('title', 'Title'), ('skill', 'Skill')], max_length=10)),
+                ('weight', models.PositiveSmallIntegerField(default=1)),
+                ('hr', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='jobs.job')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hr', 'token'], name='jobs_token_hr_token_idx')],
+            },
+        ),
+        migrations.RunPython(index_existing_jobs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def build_stats(apps, schema_editor):
+    Job = apps.get_model("jobs", "Job")
+    JobStats = apps.get_model("jobs", "JobStats")
+    HRStats = apps.get_model("jobs", "HRStats")
+    CandidateResume = apps.get_model("candidates", "CandidateResume")
+
+    counts = {
+        row["job_id"]: row
+        for row in CandidateResume.objects.values("job_id").annotate(
+            candidates=models.Count("id"), shortlisted=models.Count("id", filter=models.Q(shortlisted=True))
+        )
+    }
+    job_rows, hr_rows = [], {}
+    for job_id, hr_id in Job.objects.values_list("id", "hr_id"):
+        row = counts.get(job_id, {})
+        job_rows.append(JobStats(job_id=job_id, hr_id=hr_id, candidates=row.get("candidates", 0), shortlisted=row.get("shortlisted", 0)))
+        hr = hr_rows.setdefault(hr_id, {"jobs": 0, "candidates": 0, "shortlisted": 0})
+        hr["jobs"] += 1
+        hr["candidates"] += row.get("candidates", 0)
+        hr["shortlisted"] += row.get("shortlisted", 0)
+    JobStats.objects.bulk_create(job_rows, batch_size=1000)
+    HRStats.objects.bulk_create([HRStats(hr_id=hr_id, **values) for hr_id, values in hr_rows.items()], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidates', '0006_candidateresume_cand_job_score_page_idx'),
+        ('jobs', '0005_jobsearchtoken'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HRStats',
+            fields=[
+                ('hr', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('jobs', models.IntegerField(default=0)),
+                ('candidates', models.IntegerField(default=0)),
+                ('shortlisted', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='JobStats',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='jobs.job')),
+                ('candidates', models.IntegerField(default=0)),
+                ('shortlisted', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('hr', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(build_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_job_job_hr_recent_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestionbatch',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
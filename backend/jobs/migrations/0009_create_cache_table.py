@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:05
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_table(apps, schema_editor):
+    # table for the DatabaseCache in settings.CACHES (no-op for other backends)
+    call_command("createcachetable", database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_ingestionbatch_heartbeat_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_table, migrations.RunPython.noop),
+    ]
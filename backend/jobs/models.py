@@ -11,6 +11,121 @@ class Job(models.Model):
     skills = models.JSONField(default=list, blank=True)
     description = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [
+            # an HR user's jobs, newest first (job lists, "latest job" fallbacks)
+            models.Index(fields=["hr", "-id"], name="job_hr_recent_idx"),
+        ]
+
     def __str__(self):
         return f"{self.title} - {self.hr.full_name}"
 
+
+class IngestionBatch(models.Model):
+    """A group of resumes uploaded together and evaluated by the ingestion worker."""
+    UPLOADING = "uploading"   # items still being added (archive imports)
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    STATUS_CHOICES = [(UPLOADING, "Uploading"), (PENDING, "Pending"), (RUNNING, "Running"), (DONE, "Done")]
+
+    hr = models.ForeignKey(HRUser, on_delete=models.CASCADE, related_name="ingestion_batches")
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="ingestion_batches")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # set when a worker claims the batch and after every finished item
+    heartbeat_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"Batch {self.id} - Job {self.job_id} ({self.status})"
+
+
+def ingestion_upload_path(instance, filename):
+    return f"ingestion/batch_{instance.batch_id}/{filename}"
+
+class IngestionItem(models.Model):
+    QUEUED = "queued"
+    PROCESSING = "processing"
+    DONE = "done"
+    ERROR = "error"
+    STATUS_CHOICES = [(QUEUED, "Queued"), (PROCESSING, "Processing"), (DONE, "Done"), (ERROR, "Error")]
+
+    batch = models.ForeignKey(IngestionBatch, on_delete=models.CASCADE, related_name="items")
+    filename = models.CharField(max_length=255)
+    upload = models.FileField(upload_to=ingestion_upload_path, blank=True, null=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    score = models.IntegerField(blank=True, null=True)
+    error = models.CharField(max_length=255, blank=True)
+    latency_ms = models.FloatField(blank=True, null=True)
+    candidate = models.ForeignKey("candidates.CandidateResume", on_delete=models.SET_NULL, blank=True, null=True, related_name="+")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.status})"
+
+
+class EvaluationCacheEntry(models.Model):
+    """
+    Cached LLM evaluation for (resume text, job requirements).
+    resume_hash: sha256 of the text sent to the model
+    job_signature: sha256 of title/skills/experience_level + prompt version
+    """
+    resume_hash = models.CharField(max_length=64)
+    job_signature = models.CharField(max_length=64)
+    fields = models.JSONField(default=dict)
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        unique_together = [("resume_hash", "job_signature")]
+
+    def __str__(self):
+        return f"{self.resume_hash[:12]}/{self.job_signature[:12]} ({self.hits} hits)"
+
+
+class JobSearchToken(models.Model):
+    """
+    Normalized title / skill token of a job (jobs/job_search.py), so a chat
+    message can be matched against an HR user's jobs with one indexed query.
+    """
+    TITLE = "title"
+    SKILL = "skill"
+    FIELD_CHOICES = [(TITLE, "Title"), (SKILL, "Skill")]
+
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="search_tokens")
+    hr = models.ForeignKey(HRUser, on_delete=models.CASCADE, related_name="+")
+    token = models.CharField(max_length=64)
+    field = models.CharField(max_length=10, choices=FIELD_CHOICES)
+    weight = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        indexes = [models.Index(fields=["hr", "token"], name="jobs_token_hr_token_idx")]
+
+    def __str__(self):
+        return f"{self.token} ({self.field}) - Job {self.job_id}"
+
+
+class HRStats(models.Model):
+    """Dashboard counters per HR user, maintained incrementally by jobs/hr_stats.py."""
+    hr = models.OneToOneField(HRUser, on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    jobs = models.IntegerField(default=0)
+    candidates = models.IntegerField(default=0)
+    shortlisted = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Stats for HR {self.hr_id}"
+
+
+class JobStats(models.Model):
+    """Candidate counters per job, maintained incrementally by jobs/hr_stats.py."""
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    hr = models.ForeignKey(HRUser, on_delete=models.CASCADE, related_name="+")
+    candidates = models.IntegerField(default=0)
+    shortlisted = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Stats for Job {self.job_id}"
@@ -0,0 +1,66 @@
+# jobs/pagination.py
+"""
+Keyset (cursor) pagination for candidate lists ordered by
+(-ai_score, -created_at, -id).
+
+The cursor is the sort key of the last row of the previous page, so every
+page is an index range scan on (job, -ai_score, -created_at, -id) no matter
+how deep it is, and rows inserted meanwhile never shift or repeat a page.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+
+CANDIDATE_ORDERING = ("-ai_score", "-created_at", "-id")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(candidate):
+    key = [candidate.ai_score, candidate.created_at.isoformat(), candidate.id]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        score, created_at, pk = json.loads(raw)
+        return int(score), datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor.")
+
+def page_size(value):
+    """Requested page size clamped to [1, CANDIDATES_MAX_PAGE_SIZE]."""
+    try:
+        size = int(value) if value not in (None, "") else settings.CANDIDATES_PAGE_SIZE
+    except (TypeError, ValueError):
+        size = settings.CANDIDATES_PAGE_SIZE
+    return max(1, min(settings.CANDIDATES_MAX_PAGE_SIZE, size))
+
+def candidate_page(qs, cursor=None, size=None):
+    """
+    Returns (rows, next_cursor) for one page of `qs`; next_cursor is None on
+    the last page. Raises InvalidCursor.
+    """
+    size = size or settings.CANDIDATES_PAGE_SIZE
+    qs = qs.order_by(*CANDIDATE_ORDERING)
+    if cursor:
+        score, created_at, pk = decode_cursor(cursor)
+        # ai_score <= score is redundant but gives the planner a range on the
+        # index instead of an OR it may split into separate scans
+        qs = qs.filter(
+            Q(ai_score__lte=score),
+            Q(ai_score__lt=score)
+            | Q(created_at__lt=created_at)
+            | Q(created_at=created_at, id__lt=pk),
+        )
+    rows = list(qs[:size + 1])
+    if len(rows) > size:
+        rows = rows[:size]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
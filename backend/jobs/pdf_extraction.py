@@ -0,0 +1,298 @@
+# jobs/pdf_extraction.py
+"""
+PDF text extraction off the request thread.
+
+PyPDF2 is pure Python and CPU bound, so parsing in a thread holds the GIL
+and stalls everything else on the worker. Extraction runs in a process pool
+shared by all requests of a worker process, and extracted text is memoized
+in Django's cache by the file's SHA-256 so an identical file is only parsed
+once (per cache backend, i.e. across workers with a shared cache).
+
+The pool processes double as a sandbox for malformed / hostile PDFs: each
+one runs under an address-space cap (PDF_PARSE_MEMORY_MB) and every file
+gets a wall-clock budget (PDF_PARSE_TIMEOUT) and a page cap (PDF_MAX_PAGES).
+A file that hits a limit raises PdfLimitError instead of tying up the worker.
+The budget starts when a pool process picks the file up (each process stamps
+its current task in shared memory), so time spent queued behind other files
+never counts against it.
+
+Uploads are spooled to disk by TemporaryFileUploadHandler, so the pool gets
+the spooled file's path rather than a pickled copy of its bytes, and the
+SHA-256 is computed over a read-only memory map.
+"""
+import hashlib
+import io
+import itertools
+import mmap
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import CancelledError, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import PyPDF2
+from django.conf import settings
+from django.core.cache import cache
+
+from .helpers import pdf_to_text, pdf_to_text_budgeted
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, timeouts still apply
+    resource = None
+
+PdfExtraction = namedtuple("PdfExtraction", ["text", "sha256", "elapsed_ms", "cached"])
+
+CACHE_PREFIX = "pdf_text:"
+
+# extra seconds the parent waits past PDF_PARSE_TIMEOUT before killing the pool
+KILL_GRACE_SECONDS = 5
+# how often a waiting request checks whether its file has been picked up
+POLL_SECONDS = 0.25
+
+_pool = None
+_pool_lock = threading.Lock()
+_task_ids = itertools.count(1)
+
+# pool process side: this process's slot in the shared (task id, start time) table
+_slot = None
+_started = None
+
+
+class PdfLimitError(Exception):
+    """A PDF exceeded a sandbox limit; the message is safe to show to the client."""
+
+
+# -----------------------------
+# Pool process side
+# -----------------------------
+def _init_worker(memory_mb, started=None, counter=None):
+    global _slot, _started
+    if resource is not None and memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if started is not None:
+        with counter.get_lock():
+            _slot = counter.value % (len(started) // 2)
+            counter.value += 1
+        _started = started
+
+def _mark_started(task_id):
+    if _started is None or task_id is None:
+        return
+    with _started.get_lock():
+        _started[2 * _slot] = task_id
+        _started[2 * _slot + 1] = time.time()
+
+class _Alarm:
+    """
+    SIGALRM wall-clock budget. Once expired it keeps firing every 100ms, so
+    the catch-all in pdf_to_text (or its fallback path) can't swallow it for
+    good; `fired` tells the caller the text is incomplete.
+    """
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.fired = False
+        self.enabled = bool(seconds) and hasattr(signal, "SIGALRM")
+
+    def _handler(self, signum, frame):
+        self.fired = True
+        raise PdfLimitError(f"PDF took longer than {self.seconds}s to parse.")
+
+    def __enter__(self):
+        if self.enabled:
+            signal.signal(signal.SIGALRM, self._handler)
+            signal.setitimer(signal.ITIMER_REAL, self.seconds, 0.1)
+        return self
+
+    def __exit__(self, *exc):
+        if self.enabled:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        return False
+
+def _open_source(source):
+    # bytes for in-memory uploads, a filesystem path for spooled ones
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    return open(source, "rb")
+
+def _extract(source, budgeted=False, timeout=None, max_pages=None, task_id=None):
+    # runs inside a pool process: only plain values in, plain str out
+    _mark_started(task_id)
+    alarm = _Alarm(timeout)
+    try:
+        with alarm:
+            if max_pages:
+                with _open_source(source) as fh:
+                    pages = len(PyPDF2.PdfReader(fh).pages)
+                if pages > max_pages:
+                    raise PdfLimitError(f"PDF has {pages} pages (limit {max_pages}).")
+            with _open_source(source) as fh:
+                if budgeted:
+                    text = pdf_to_text_budgeted(fh)
+                else:
+                    text = pdf_to_text(fh)
+    except PdfLimitError:
+        raise
+    except MemoryError:
+        raise PdfLimitError("PDF needs too much memory to parse.")
+    except Exception:
+        # unreadable structure: same as pdf_to_text's behaviour, no text
+        return ""
+    if alarm.fired:
+        raise PdfLimitError(f"PDF took longer than {timeout}s to parse.")
+    return text
+
+
+# -----------------------------
+# Web worker side
+# -----------------------------
+def get_pool():
+    """Lazily create the per-process extraction pool (None when disabled)."""
+    global _pool
+    workers = settings.PDF_EXTRACT_WORKERS
+    if workers <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the web worker already runs evaluation threads
+            context = multiprocessing.get_context("spawn")
+            started = context.Array("d", 2 * workers)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(settings.PDF_PARSE_MEMORY_MB, started, context.Value("i", 0)),
+            )
+            _pool.started = started
+        return _pool
+
+def shutdown_pool(pool=None, kill=False):
+    """Drop the shared pool (only if it is still `pool`, when given)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or (pool is not None and _pool is not pool):
+            return
+        if kill:
+            # a process stuck in C code never sees SIGALRM; nothing else stops it
+            for proc in list((_pool._processes or {}).values()):
+                proc.kill()
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+def _started_at(pool, task_id):
+    """When a pool process picked up `task_id` (time.time()), or None while it is queued."""
+    with pool.started.get_lock():
+        for i in range(0, len(pool.started), 2):
+            if pool.started[i] == task_id:
+                return pool.started[i + 1]
+    return None
+
+def _wait(pool, future, task_id, timeout):
+    """
+    Result of `future`. The pool is killed only when the file itself has run
+    for PDF_PARSE_TIMEOUT + KILL_GRACE_SECONDS (e.g. stuck in C code where
+    SIGALRM can't reach it), never because it sat in the queue.
+    """
+    if not timeout:
+        return future.result()
+    while True:
+        try:
+            return future.result(timeout=POLL_SECONDS)
+        except FutureTimeoutError:
+            started = _started_at(pool, task_id)
+            if started is not None and time.time() - started > timeout + KILL_GRACE_SECONDS:
+                shutdown_pool(pool, kill=True)
+                raise PdfLimitError(f"PDF took longer than {timeout}s to parse.")
+
+def _run_in_pool(source, budgeted):
+    timeout = settings.PDF_PARSE_TIMEOUT
+    # one retry: the pool may have been torn down because of *another* file
+    for attempt in range(2):
+        pool = get_pool()
+        task_id = next(_task_ids)
+        future = pool.submit(_extract, source, budgeted, timeout, settings.PDF_MAX_PAGES, task_id)
+        try:
+            return _wait(pool, future, task_id, timeout)
+        except (BrokenProcessPool, CancelledError):
+            # killed / cancelled along with another file's stuck parse
+            shutdown_pool(pool)
+    raise PdfLimitError("PDF parser crashed on this file.")
+
+def local_path(f):
+    """Filesystem path backing `f`, if any (spooled upload or FileSystemStorage file)."""
+    if hasattr(f, "temporary_file_path"):
+        return f.temporary_file_path()
+    name = getattr(getattr(f, "file", None), "name", None)
+    if isinstance(name, str) and os.path.isfile(name):
+        return name
+    return None
+
+def _sha256_path(path):
+    if os.path.getsize(path) == 0:
+        return hashlib.sha256(b"").hexdigest()
+    with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return hashlib.sha256(mm).hexdigest()
+
+def _source(f):
+    """Path of a disk-backed upload, else its bytes (read once)."""
+    source = local_path(f)
+    if source is not None:
+        return source
+    f.seek(0)
+    data = f.read()
+    f.seek(0)
+    return data
+
+def _digest(source):
+    return _sha256_path(source) if isinstance(source, str) else hashlib.sha256(source).hexdigest()
+
+def _cache_key(digest, budgeted):
+    return CACHE_PREFIX + ("budget:" if budgeted else "") + digest
+
+def _parse(source, budgeted):
+    if settings.PDF_EXTRACT_WORKERS <= 0:
+        # no isolation in-process: only the page cap applies
+        return _extract(source, budgeted, None, settings.PDF_MAX_PAGES)
+    return _run_in_pool(source, budgeted)
+
+def lookup_pdf_text(f, budgeted=False):
+    """
+    Cache half of extract_pdf_text(): (cache key, memoized text or None).
+    Thread-pool callers run this and store_pdf_text() on their own thread and
+    only parse_pdf() on the pool, so the (database) cache is never hit from
+    pool threads.
+    """
+    key = _cache_key(_digest(_source(f)), budgeted)
+    return key, cache.get(key)
+
+def parse_pdf(f, budgeted=False):
+    """Text of upload `f` without touching the cache. Raises PdfLimitError."""
+    return _parse(_source(f), budgeted)
+
+def store_pdf_text(key, text):
+    cache.set(key, text, settings.PDF_TEXT_CACHE_TIMEOUT)
+
+def extract_pdf_text(f, budgeted=False):
+    """
+    Return a PdfExtraction (text + sha256 + timing) for upload `f`.
+    Disk-backed files are hashed via mmap and parsed from their path; only
+    in-memory uploads are read into a bytes object.
+    budgeted=True returns truncate()'d text and skips the pages truncate()
+    would drop (see helpers.pdf_to_text_budgeted).
+    Raises PdfLimitError when the file hits a sandbox limit.
+    """
+    started = time.perf_counter()
+    source = _source(f)
+    digest = _digest(source)
+    key = _cache_key(digest, budgeted)
+    text = cache.get(key)
+    if text is not None:
+        return PdfExtraction(text, digest, round((time.perf_counter() - started) * 1000, 1), True)
+
+    text = _parse(source, budgeted)
+    store_pdf_text(key, text)
+    return PdfExtraction(text, digest, round((time.perf_counter() - started) * 1000, 1), False)
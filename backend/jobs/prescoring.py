@@ -0,0 +1,130 @@
+# jobs/prescoring.py
+"""
+Local pre-scoring of a resume batch before any LLM call.
+
+Each resume gets a 0-100 score from
+  - skill overlap: share of Job.skills whose tokens all appear in the resume
+  - TF-IDF cosine similarity between the resume and title + skills + description
+computed for the whole batch in one vectorized NumPy pass over a sparse
+(doc, term, count) layout, so memory grows with the text size, not docs x vocab.
+
+Only the top PRESCORE_TOP_K and/or resumes scoring >= PRESCORE_MIN_SCORE go to
+the LLM; the rest are stored with the provisional score (llm_evaluated=False).
+"""
+import re
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+
+SKILL_WEIGHT = 0.6
+SIMILARITY_WEIGHT = 0.4
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or "").lower())
+
+def job_document(job):
+    skills = " ".join(str(s) for s in (job.skills or []))
+    return f"{job.title} {skills} {job.description or ''}"
+
+def enabled():
+    return settings.PRESCORE_TOP_K > 0 or settings.PRESCORE_MIN_SCORE > 0
+
+def score_batch(job, texts):
+    """
+    Return (scores, matched_skills): an int array with one 0-100 score per
+    text, and for each text the list of Job.skills found in it.
+    """
+    n = len(texts)
+    if n == 0:
+        return np.zeros(0, dtype=int), []
+
+    vocab = {}
+    rows, cols, counts = [], [], []
+    # row n is the job document itself
+    for row, text in enumerate(list(texts) + [job_document(job)]):
+        for term, count in Counter(tokenize(text)).items():
+            rows.append(row)
+            cols.append(vocab.setdefault(term, len(vocab)))
+            counts.append(count)
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    counts = np.asarray(counts, dtype=np.float64)
+    n_terms = len(vocab)
+
+    # smoothed idf over resumes + job doc, sublinear tf
+    df = np.bincount(cols, minlength=n_terms)
+    idf = np.log((n + 2) / (df + 1)) + 1.0
+    weights = (1.0 + np.log(counts)) * idf[cols]
+
+    is_job = rows == n
+    job_vec = np.zeros(n_terms)
+    job_vec[cols[is_job]] = weights[is_job]
+    job_norm = np.sqrt((job_vec ** 2).sum()) or 1.0
+
+    doc_rows, doc_cols, doc_w = rows[~is_job], cols[~is_job], weights[~is_job]
+    norms = np.sqrt(np.bincount(doc_rows, weights=doc_w ** 2, minlength=n))
+    dots = np.bincount(doc_rows, weights=doc_w * job_vec[doc_cols], minlength=n)
+    similarity = dots / (np.where(norms > 0, norms, 1.0) * job_norm)
+
+    # skill overlap: a skill matches when every one of its tokens is present
+    present = np.sort(doc_rows * n_terms + doc_cols)
+    doc_ids = np.arange(n, dtype=np.int64)
+    skills = [s for s in (job.skills or []) if tokenize(str(s))]
+    matched = np.zeros((len(skills), n), dtype=bool)
+    for i, skill in enumerate(skills):
+        hit = np.ones(n, dtype=bool)
+        for term in tokenize(str(skill)):
+            term_id = vocab.get(term)
+            if term_id is None or len(present) == 0:
+                hit[:] = False
+                break
+            codes = doc_ids * n_terms + term_id
+            pos = np.searchsorted(present, codes)
+            hit &= (pos < len(present)) & (present[np.minimum(pos, len(present) - 1)] == codes)
+        matched[i] = hit
+
+    if skills:
+        overlap = matched.mean(axis=0)
+        combined = SKILL_WEIGHT * overlap + SIMILARITY_WEIGHT * similarity
+    else:
+        combined = similarity
+    scores = np.clip(np.rint(combined * 100), 0, 100).astype(int)
+    matched_skills = [[skills[i] for i in np.flatnonzero(matched[:, d])] for d in range(n)]
+    return scores, matched_skills
+
+def select_for_llm(scores):
+    """Boolean mask of resumes that should still get a full LLM evaluation."""
+    top_k = settings.PRESCORE_TOP_K
+    min_score = settings.PRESCORE_MIN_SCORE
+    if top_k <= 0 and min_score <= 0:
+        return np.ones(len(scores), dtype=bool)
+
+    selected = np.zeros(len(scores), dtype=bool)
+    if top_k > 0:
+        # stable sort keeps upload order among equal scores
+        selected[np.argsort(-scores, kind="stable")[:top_k]] = True
+    if min_score > 0:
+        selected |= scores >= min_score
+    return selected
+
+def provisional_fields(text, score, matched_skills):
+    """CandidateResume fields for a resume that was not sent to the LLM."""
+    email = EMAIL_RE.search(text)
+    name = next((line.strip() for line in text.splitlines() if line.strip()), "")
+    return {
+        "candidate_name": name[:255] or "Unknown",
+        "candidate_email": email.group() if email else "",
+        "extracted_skills": list(matched_skills),
+        "projects_found": [],
+        "education": "",
+        "ai_score": int(score),
+        "strengths": [],
+        "weaknesses": [],
+        "llm_evaluated": False,
+        "prescore": int(score),
+    }
@@ -0,0 +1,161 @@
+# jobs/rescoring.py
+"""
+Incremental re-scoring of a job's existing candidates after its requirements
+change (title / skills / experience level / description).
+
+Every candidate stores its parsed resume text (resume_text; the full text
+when RESUME_CONDENSE is on, condensed again for the new requirements when
+re-prompting) and the requirements snapshot it was scored against
+(evaluated_for). Rescoring:
+  1. skips candidates whose snapshot already matches the job
+  2. pre-scores all stale candidates locally against the old and the new
+     requirements in one vectorized pass per snapshot (jobs/prescoring.py)
+  3. shifts LLM scores by the local delta, and only sends candidates whose
+     local score moved by >= RESCORE_LLM_DELTA (or provisional candidates the
+     pre-scorer would now send to the LLM) back to the model
+  4. writes everything with bulk_update
+"""
+import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from types import SimpleNamespace
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from . import analytics, evaluation_cache, prescoring
+from .evaluation import PROMPT_VERSION, EvaluationError, evaluate_text, job_requirements, resume_for_prompt
+
+LOCAL_FIELDS = ["ai_score", "prescore", "evaluated_for", "extracted_skills"]
+LLM_FIELDS = LOCAL_FIELDS + [
+    "candidate_name", "candidate_email", "projects_found", "education",
+    "strengths", "weaknesses", "llm_evaluated",
+]
+
+
+def _old_prescores(stale, texts, new_scores):
+    """Pre-score each candidate against the requirements it was last scored on."""
+    old_scores = new_scores.copy()
+    groups = {}
+    for i, c in enumerate(stale):
+        groups.setdefault(json.dumps(c.evaluated_for, sort_keys=True), []).append(i)
+    for key, idxs in groups.items():
+        snapshot = json.loads(key)
+        if not snapshot:
+            continue  # no baseline: treat as unchanged (delta 0)
+        old_job = SimpleNamespace(
+            title=snapshot.get("title", ""),
+            skills=snapshot.get("skills", []),
+            description=snapshot.get("description", ""),
+        )
+        scores, _ = prescoring.score_batch(old_job, [texts[i] for i in idxs])
+        old_scores[idxs] = scores
+    return old_scores
+
+def rescore_job(job, provider=None, use_llm=True, max_llm=None, max_workers=None):
+    """Refresh ai_score for every candidate of `job`; returns a summary dict."""
+    requirements = job_requirements(job)
+    candidates = list(
+        job.candidates.only("id", "job_id", "resume_text", "ai_score", "llm_evaluated", "prescore", "evaluated_for", "extracted_skills")
+        .order_by("id")
+    )
+    summary = {"total": len(candidates), "unchanged": 0, "no_text": 0, "local": 0, "llm": 0, "llm_failed": 0}
+
+    stale = []
+    for c in candidates:
+        if c.evaluated_for == requirements:
+            summary["unchanged"] += 1
+        elif not c.resume_text:
+            summary["no_text"] += 1
+        else:
+            stale.append(c)
+    if not stale:
+        return summary
+
+    texts = [c.resume_text for c in stale]
+    new_scores, matched = prescoring.score_batch(job, texts)
+    old_scores = _old_prescores(stale, texts, new_scores)
+    delta = new_scores - old_scores
+
+    ai_scores = np.array([c.ai_score for c in stale])
+    llm_flags = np.array([c.llm_evaluated for c in stale], dtype=bool)
+    estimates = np.where(llm_flags, np.clip(ai_scores + delta, 0, 100), new_scores)
+
+    needs_llm = np.zeros(len(stale), dtype=bool)
+    if use_llm and provider is not None:
+        needs_llm = (llm_flags & (np.abs(delta) >= settings.RESCORE_LLM_DELTA)) | (~llm_flags & prescoring.select_for_llm(new_scores))
+        if max_llm is not None and needs_llm.sum() > max_llm:
+            # of the candidates that need the model, keep those whose local score moved the most
+            wanted = np.flatnonzero(needs_llm)
+            keep = wanted[np.argsort(-np.abs(delta[wanted]), kind="stable")[:max_llm]]
+            needs_llm[:] = False
+            needs_llm[keep] = True
+
+    for i, c in enumerate(stale):
+        c.ai_score = int(estimates[i])
+        c.prescore = int(new_scores[i])
+        c.evaluated_for = requirements
+        if not c.llm_evaluated:
+            c.extracted_skills = matched[i]
+
+    local = [c for i, c in enumerate(stale) if not needs_llm[i]]
+    summary["local"] = len(local)
+    refreshed = []
+    if needs_llm.any():
+        refreshed, failed = _rescore_with_llm(job, provider, [stale[i] for i in np.flatnonzero(needs_llm)], max_workers)
+        # failed candidates keep their local estimate
+        local.extend(failed)
+        summary["llm"] = len(refreshed)
+        summary["llm_failed"] = len(failed)
+
+    from candidates.models import CandidateResume
+    with transaction.atomic():
+        if local:
+            CandidateResume.objects.bulk_update(local, LOCAL_FIELDS, batch_size=500)
+        if refreshed:
+            CandidateResume.objects.bulk_update(refreshed, LLM_FIELDS, batch_size=500)
+    analytics.invalidate(job.id, job.hr_id)
+    return summary
+
+def _rescore_with_llm(job, provider, candidates, max_workers=None):
+    """Full evaluation of stored texts; cache lookups stay on the calling thread."""
+    signature = evaluation_cache.job_signature(job, PROMPT_VERSION)
+    refreshed, failed = [], []
+
+    def apply(c, fields):
+        prescore, requirements = c.prescore, c.evaluated_for
+        for name, value in fields.items():
+            setattr(c, name, value)
+        c.llm_evaluated = True
+        c.prescore, c.evaluated_for = prescore, requirements
+        refreshed.append(c)
+
+    max_workers = max(1, min(max_workers or settings.RESUME_EVAL_MAX_WORKERS, len(candidates)))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="resume-rescore") as pool:
+        pending = {}
+        for c in candidates:
+            # condensed against the current requirements, not the upload-time ones
+            prompt_text = resume_for_prompt(job, c.resume_text)
+            text_hash = evaluation_cache.resume_hash(prompt_text)
+            fields = evaluation_cache.get(text_hash, signature)
+            if fields is not None:
+                apply(c, fields)
+            else:
+                pending[pool.submit(evaluate_text, job, prompt_text, provider, f"candidate {c.id}")] = (c, text_hash)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                c, text_hash = pending.pop(future)
+                try:
+                    fields = future.result()
+                except EvaluationError:
+                    failed.append(c)
+                    continue
+                except Exception as e:
+                    print("Unexpected error rescoring candidate", c.id, e)
+                    failed.append(c)
+                    continue
+                evaluation_cache.put(text_hash, signature, fields)
+                apply(c, fields)
+    return refreshed, failed
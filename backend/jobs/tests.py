@@ -1,3 +1,1288 @@
-from django.test import TestCase
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock, skipIf
 
-# Create your tests here.
+import numpy as np
+from django.core.cache import cache, caches
+from django.core.cache.backends.db import DatabaseCache
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PyPDF2 import PageObject
+from rest_framework.test import APIClient
+
+from accounts.models import HRUser
+from candidates.models import CandidateResume
+
+from . import analytics, conversations, evaluation_cache, hr_stats, ingestion, intents, job_search, pdf_extraction, prescoring
+from .archive_import import import_archive
+from .pdf_extraction import resource
+from .condenser import CHARS_PER_TOKEN, condense
+from .evaluation import evaluate_resumes, evaluate_text, job_requirements, save_candidate
+from .helpers import pdf_to_text, pdf_to_text_budgeted, truncate
+from .intents import route as route_intent
+from .job_generation import complete_job_fields
+from .job_search import find_job
+from .llm import (
+    CircuitOpenError, LLMError, LLMProvider, LLMThrottled, LLMTransientError, LocalProvider,
+    ResilientProvider, TokenBucket, _classify_gemini_error, build_provider,
+)
+from .models import EvaluationCacheEntry, HRStats, IngestionBatch, IngestionItem, Job, JobStats
+from .pagination import CANDIDATE_ORDERING, InvalidCursor, decode_cursor, encode_cursor
+from .rescoring import rescore_job
+
+# Query-plan regression suite: seed a large dataset, call the hot endpoints,
+# then EXPLAIN every statement they ran against the job / candidate tables and
+# fail on full table scans or sorts the indexes should have avoided.
+
+HOT_TABLES = ("candidates_candidateresume", "jobs_job", "jobs_hrstats")
+
+SQLITE_BAD = [
+    # "SCAN t" is a full table (or full index) scan; "SEARCH t" is an index lookup
+    (re.compile(r"\bSCAN (\w+)"), "full scan"),
+    (re.compile(r"USE TEMP B-TREE FOR ORDER BY"), "temp B-tree sort"),
+]
+POSTGRES_BAD = [
+    (re.compile(r"Seq Scan on (\w+)"), "full scan"),
+    (re.compile(r"(?:^|->\s*)(?:Incremental )?Sort\b", re.MULTILINE), "sort"),
+]
+
+
+def make_pdf(pages):
+    """Minimal valid PDF with one line of Helvetica text per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        stream = f"BT /F1 10 Tf 20 800 Td ({escaped}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for i, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+class QueryPlanTests(TestCase):
+    JOBS_PER_HR = 40
+    CANDIDATES = 25000
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(0)
+        cls.hr = HRUser.objects.create_user("plans@example.com", "Plan HR", "x")
+        other = HRUser.objects.create_user("other@example.com", "Other HR", "x")
+        # bulk_create skips the post_save signals; stats are rebuilt below
+        Job.objects.bulk_create([
+            Job(hr=hr, title=f"Role {i}", salary_range="6 LPA", experience_level="Fresher", job_type="Full-time", skills=["Python"])
+            for hr in (cls.hr, other) for i in range(cls.JOBS_PER_HR)
+        ])
+        job_ids = list(Job.objects.values_list("id", flat=True))
+        now = timezone.now()
+        CandidateResume.objects.bulk_create(
+            [
+                CandidateResume(
+                    job_id=rng.choice(job_ids),
+                    candidate_name=f"Candidate {i}",
+                    candidate_email=f"c{i}@example.com",
+                    ai_score=rng.randint(0, 100),
+                    shortlisted=rng.random() < 0.1,
+                    extracted_skills=["Python"],
+                    created_at=now - timedelta(minutes=i),
+                )
+                for i in range(cls.CANDIDATES)
+            ],
+            batch_size=2000,
+        )
+        hr_stats.rebuild()
+        cls.job = Job.objects.filter(hr=cls.hr).order_by("-id").first()
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def setUp(self):
+        if connection.vendor not in ("sqlite", "postgresql"):
+            self.skipTest(f"No plan checks for {connection.vendor}")
+        self.client = APIClient()
+        self.client.force_authenticate(self.hr)
+        if connection.vendor == "postgresql":
+            # with these off the planner only scans / sorts when no index can help
+            with connection.cursor() as cursor:
+                cursor.execute("SET enable_seqscan = off")
+                cursor.execute("SET enable_sort = off")
+
+    # -----------------------------
+    # Helpers
+    # -----------------------------
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                cursor.execute("EXPLAIN QUERY PLAN " + sql)
+                return "\n".join(row[-1] for row in cursor.fetchall())
+            cursor.execute("EXPLAIN " + sql)
+            return "\n".join(row[0] for row in cursor.fetchall())
+
+    def assertIndexedPlans(self, method, url, data=None, **query):
+        with CaptureQueriesContext(connection) as ctx:
+            if method == "post":
+                response = self.client.post(url, data, format="json")
+            else:
+                response = self.client.get(url, query)
+        self.assertLess(response.status_code, 400, response.content)
+
+        bad_patterns = SQLITE_BAD if connection.vendor == "sqlite" else POSTGRES_BAD
+        checked = 0
+        for query_info in ctx.captured_queries:
+            sql = query_info["sql"]
+            if not sql.lstrip().upper().startswith(("SELECT", "UPDATE")) or not any(t in sql for t in HOT_TABLES):
+                continue
+            checked += 1
+            plan = self.explain(sql)
+            for pattern, label in bad_patterns:
+                m = pattern.search(plan)
+                # scans of tables outside the hot set (e.g. auth) are not our concern
+                if m and (not m.groups() or m.group(1) in HOT_TABLES):
+                    self.fail(f"{label} in plan for {method.upper()} {url}:\n{sql}\n---\n{plan}")
+        self.assertGreater(checked, 0, f"no hot-table queries captured for {url}")
+        return response
+
+    def chat(self, message):
+        return self.assertIndexedPlans("post", "/api/jobs/chat/", {"message": message, "job_id": self.job.id})
+
+    # -----------------------------
+    # Endpoints
+    # -----------------------------
+    def test_job_candidates_pages(self):
+        url = f"/api/jobs/{self.job.id}/candidates/"
+        first = self.assertIndexedPlans("get", url, page_size=50)
+        cursor = first.data["next_cursor"]
+        self.assertIsNotNone(cursor)
+        self.assertIndexedPlans("get", url, page_size=50, cursor=cursor)
+
+    def test_candidate_list(self):
+        url = f"/api/candidates/job/{self.job.id}/"
+        self.assertIndexedPlans("get", url, fields="name,email,score,shortlisted")
+        self.assertIndexedPlans("get", url)
+
+    def test_count_commands(self):
+        self.chat("how many candidates")
+        self.chat("how many candidates above 70")
+
+    def test_shortlist_commands(self):
+        self.chat("shortlist above 90")
+        self.chat("mark shortlist above 95")
+
+    def test_intents(self):
+        self.chat("top 5 candidates")
+        self.chat("who is shortlisted")
+        self.chat("how many candidates are shortlisted")
+        self.chat("average score")
+
+    def test_jobs_list_and_stats(self):
+        self.assertIndexedPlans("get", "/api/jobs/list/")
+        response = self.assertIndexedPlans("get", "/api/jobs/stats/")
+        self.assertEqual(response.data["jobs"], self.JOBS_PER_HR)
+
+
+class IngestionRequeueTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.hr = HRUser.objects.create_user("ingest@example.com", "Ingest HR", "x")
+        cls.job = Job.objects.create(hr=cls.hr, title="Backend Developer", skills=["Python"])
+
+    def running_batch(self, heartbeat_age):
+        batch = IngestionBatch.objects.create(
+            hr=self.hr, job=self.job, status=IngestionBatch.RUNNING,
+            heartbeat_at=timezone.now() - heartbeat_age,
+        )
+        IngestionItem.objects.create(batch=batch, filename="cv.pdf", status=IngestionItem.PROCESSING)
+        return batch
+
+    def test_claim_sets_heartbeat(self):
+        batch = IngestionBatch.objects.create(hr=self.hr, job=self.job)
+        claimed = ingestion.claim_next_batch()
+        self.assertEqual(claimed.id, batch.id)
+        self.assertIsNotNone(IngestionBatch.objects.get(id=batch.id).heartbeat_at)
+        self.assertIsNone(ingestion.claim_next_batch())
+
+    def test_requeue_only_touches_stale_batches(self):
+        live = self.running_batch(timedelta(seconds=5))
+        dead = self.running_batch(timedelta(hours=1))
+
+        self.assertEqual(ingestion.requeue_stale_batches(older_than=timedelta(minutes=10)), 1)
+
+        live.refresh_from_db()
+        dead.refresh_from_db()
+        self.assertEqual(live.status, IngestionBatch.RUNNING)
+        self.assertEqual(live.items.get().status, IngestionItem.PROCESSING)
+        self.assertEqual(dead.status, IngestionBatch.PENDING)
+        self.assertEqual(dead.items.get().status, IngestionItem.QUEUED)
+
+    @override_settings(RESUME_CONDENSE=False, PRESCORE_TOP_K=0, PRESCORE_MIN_SCORE=0)
+    def test_upload_to_worker_to_status(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        client = APIClient()
+        client.force_authenticate(self.hr)
+
+        response = client.post("/api/jobs/chat/", {
+            "job_id": self.job.id, "async": "true",
+            "resume": [
+                SimpleUploadedFile("ada.txt", b"Ada\nada@example.com\nPython developer\n"),
+                SimpleUploadedFile("cv.doc", b"binary"),
+            ],
+        }, format="multipart")
+        self.assertEqual(response.status_code, 202)
+        url = response.data["status_url"]
+        self.assertEqual(client.get(url).data["batch"]["status"], IngestionBatch.PENDING)
+
+        # run one worker iteration synchronously
+        ingestion.process_batch(ingestion.claim_next_batch(), LocalProvider(), max_workers=2)
+
+        data = client.get(url).data
+        self.assertEqual(data["batch"]["status"], IngestionBatch.DONE)
+        self.assertEqual(data["batch"]["counts"][IngestionItem.DONE], 1)
+        self.assertEqual(data["batch"]["counts"][IngestionItem.ERROR], 1)
+        done, failed = data["items"]
+        candidate = CandidateResume.objects.get(id=done["candidate_id"])
+        self.assertEqual((candidate.candidate_email, candidate.job_id), ("ada@example.com", self.job.id))
+        self.assertEqual(done["score"], candidate.ai_score)
+        self.assertEqual(failed["error"], "Unsupported file type")
+        # spooled uploads are dropped once the candidate keeps its own copy
+        self.assertFalse(any(i.upload for i in IngestionItem.objects.filter(batch_id=data["batch"]["id"])))
+
+        other = APIClient()
+        other.force_authenticate(HRUser.objects.create_user("nosy@example.com", "Nosy", "x"))
+        self.assertEqual(other.get(url).status_code, 404)
+
+
+class EvaluationCacheTests(TestCase):
+    FIELDS = {"candidate_name": "Ada", "ai_score": 80}
+
+    def test_hit_and_miss_counters(self):
+        before = evaluation_cache.stats()
+        self.assertIsNone(evaluation_cache.get("a" * 64, "sig"))
+        evaluation_cache.put("a" * 64, "sig", self.FIELDS)
+        self.assertEqual(evaluation_cache.get("a" * 64, "sig"), self.FIELDS)
+        # another job signature is another entry
+        self.assertIsNone(evaluation_cache.get("a" * 64, "other"))
+
+        after = evaluation_cache.stats()
+        self.assertEqual(after["hits"] - before["hits"], 1)
+        self.assertEqual(after["misses"] - before["misses"], 2)
+        self.assertEqual(EvaluationCacheEntry.objects.get().hits, 1)
+        summary = evaluation_cache.summary()
+        self.assertEqual((summary["entries"], summary["entry_hits"]), (1, 1))
+
+    def test_expired_entries_are_not_served(self):
+        evaluation_cache.put("b" * 64, "sig", self.FIELDS)
+        EvaluationCacheEntry.objects.update(created_at=timezone.now() - timedelta(days=365))
+        self.assertIsNone(evaluation_cache.get("b" * 64, "sig"))
+
+    def test_storing_over_an_expired_entry_renews_it(self):
+        evaluation_cache.put("b" * 64, "sig", self.FIELDS)
+        EvaluationCacheEntry.objects.update(created_at=timezone.now() - timedelta(days=365))
+        self.assertIsNone(evaluation_cache.get("b" * 64, "sig"))
+
+        fresh = {**self.FIELDS, "ai_score": 85}
+        evaluation_cache.put("b" * 64, "sig", fresh)
+        self.assertEqual(evaluation_cache.get("b" * 64, "sig"), fresh)
+        self.assertEqual(EvaluationCacheEntry.objects.count(), 1)
+
+    @override_settings(EVAL_CACHE_MAX_ENTRIES=2)
+    def test_prune_drops_expired_then_least_recently_used(self):
+        now = timezone.now()
+        for i, name in enumerate("cdef"):
+            evaluation_cache.put(name * 64, "sig", self.FIELDS)
+            EvaluationCacheEntry.objects.filter(resume_hash=name * 64).update(last_used_at=now - timedelta(hours=10 - i))
+        EvaluationCacheEntry.objects.filter(resume_hash="c" * 64).update(created_at=now - timedelta(days=365))
+
+        self.assertEqual(evaluation_cache.prune(), 2)
+        # "c" expired, "d" was the least recently used of the rest
+        self.assertEqual(
+            sorted(EvaluationCacheEntry.objects.values_list("resume_hash", flat=True)), ["e" * 64, "f" * 64]
+        )
+
+    def test_llm_stats_exposes_cache_counters(self):
+        admin = HRUser.objects.create_user("admin@example.com", "Admin", "x", is_staff=True)
+        client = APIClient()
+        client.force_authenticate(admin)
+        response = client.get("/api/jobs/llm-stats/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("hits", response.data["evaluation_cache"])
+        self.assertIn("entries", response.data["evaluation_cache"])
+
+
+class PdfExtractionTests(TestCase):
+    PAGES = ["Ada Lovelace ada@example.com", "Skills: Python, Django", "Projects: analytical engine"]
+
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        pdf_extraction.shutdown_pool()
+
+    def upload(self, name="cv.pdf", pages=None):
+        return SimpleUploadedFile(name, make_pdf(pages or self.PAGES), content_type="application/pdf")
+
+    @override_settings(PDF_EXTRACT_WORKERS=0)
+    def test_text_is_cached_by_content_hash(self):
+        first = pdf_extraction.extract_pdf_text(self.upload("a.pdf"))
+        second = pdf_extraction.extract_pdf_text(self.upload("renamed.pdf"))
+        self.assertFalse(first.cached)
+        self.assertTrue(second.cached)
+        self.assertEqual(first.sha256, second.sha256)
+        self.assertEqual(first.text, second.text)
+        self.assertIn("Skills: Python, Django", first.text)
+
+        other = pdf_extraction.extract_pdf_text(self.upload(pages=["Someone else"]))
+        self.assertFalse(other.cached)
+        self.assertNotEqual(other.sha256, first.sha256)
+
+    @override_settings(PDF_EXTRACT_WORKERS=1)
+    def test_pool_matches_in_process_parsing(self):
+        pooled = pdf_extraction.extract_pdf_text(self.upload())
+        with override_settings(PDF_EXTRACT_WORKERS=0):
+            cache.clear()
+            local = pdf_extraction.extract_pdf_text(self.upload())
+        self.assertEqual(pooled.text, local.text)
+        self.assertFalse(pooled.cached)
+
+
+class BudgetedPdfTextTests(SimpleTestCase):
+    def assertSameAsTruncate(self, pages):
+        data = make_pdf(pages)
+        expected = truncate(pdf_to_text(io.BytesIO(data)))
+        self.assertEqual(pdf_to_text_budgeted(io.BytesIO(data)), expected)
+
+    def test_matches_truncate_of_full_text(self):
+        cases = [
+            ["short resume"],
+            ["a" * 100] * 5,
+            ["x" * 4000 for _ in range(10)],               # long: middle pages dropped
+            ["head " * 2000, "mid" * 10, "tail " * 2000],   # one huge page at each end
+            ["p%d " % i * 300 for i in range(40)],
+            ["", "only page with text " * 50, ""],
+            ["y" * 15000],                                   # exactly at the limit
+            ["z" * 7500, "w" * 7501],                        # just over, split across pages
+        ]
+        for pages in cases:
+            with self.subTest(pages=len(pages), chars=sum(map(len, pages))):
+                self.assertSameAsTruncate(pages)
+
+    def test_skips_middle_pages(self):
+        data = make_pdf(["x" * 4000 for _ in range(30)])
+        calls = []
+        original = PageObject.extract_text
+
+        def counting(page, *args, **kwargs):
+            calls.append(page)
+            return original(page, *args, **kwargs)
+
+        with mock.patch.object(PageObject, "extract_text", counting):
+            pdf_to_text_budgeted(io.BytesIO(data))
+        # 7000 head chars = 2 pages, 6000 tail chars = 2 pages
+        self.assertEqual(len(calls), 4)
+
+
+class PdfSandboxTests(SimpleTestCase):
+    def tearDown(self):
+        pdf_extraction.shutdown_pool()
+
+    def test_timeout_survives_swallowing_handlers(self):
+        def swallowing_parse(fh):
+            # like pdf_to_text's catch-all around each page
+            deadline = time.monotonic() + 2
+            while time.monotonic() < deadline:
+                try:
+                    time.sleep(0.05)
+                except Exception:
+                    pass
+            return "partial"
+
+        with mock.patch.object(pdf_extraction, "pdf_to_text", swallowing_parse):
+            with self.assertRaisesMessage(pdf_extraction.PdfLimitError, "longer than 0.2s"):
+                pdf_extraction._extract(make_pdf(["page"]), timeout=0.2)
+
+    def test_page_cap(self):
+        data = make_pdf(["page"] * 5)
+        with self.assertRaisesMessage(pdf_extraction.PdfLimitError, "5 pages (limit 3)"):
+            pdf_extraction._extract(data, max_pages=3)
+        self.assertEqual(pdf_extraction._extract(data, max_pages=5), "page" * 5)
+
+    def test_memory_error_is_a_limit_error(self):
+        with mock.patch.object(pdf_extraction, "pdf_to_text", side_effect=MemoryError):
+            with self.assertRaisesMessage(pdf_extraction.PdfLimitError, "too much memory"):
+                pdf_extraction._extract(make_pdf(["page"]))
+
+    @skipIf(pdf_extraction.resource is None, "no rlimits on this platform")
+    @override_settings(PDF_EXTRACT_WORKERS=1, PDF_PARSE_MEMORY_MB=1024)
+    def test_pool_processes_run_under_memory_cap(self):
+        pool = pdf_extraction.get_pool()
+        soft, hard = pool.submit(resource.getrlimit, resource.RLIMIT_AS).result(timeout=60)
+        self.assertEqual(soft, 1024 * 1024 * 1024)
+
+    @override_settings(PDF_EXTRACT_WORKERS=1, PDF_PARSE_TIMEOUT=1)
+    def test_queue_wait_does_not_count_against_timeout(self):
+        pool = pdf_extraction.get_pool()
+        busy = pool.submit(time.sleep, 2.5)  # the only process is taken for longer than the budget
+        with mock.patch.object(pdf_extraction, "KILL_GRACE_SECONDS", 0):
+            text = pdf_extraction._run_in_pool(make_pdf(["queued resume"]), False)
+        self.assertEqual(text, "queued resume")
+        self.assertIsNone(busy.result())
+        self.assertIs(pdf_extraction.get_pool(), pool)
+
+    @override_settings(PDF_EXTRACT_WORKERS=1)
+    def test_stuck_parse_kills_the_pool(self):
+        pool = pdf_extraction.get_pool()
+        # time.sleep outside _extract never sees SIGALRM, like a parse stuck in C code
+        future = pool.submit(time.sleep, 30)
+        with pool.started.get_lock():
+            pool.started[0], pool.started[1] = 999, time.time()
+        with mock.patch.object(pdf_extraction, "KILL_GRACE_SECONDS", 0):
+            with self.assertRaises(pdf_extraction.PdfLimitError):
+                pdf_extraction._wait(pool, future, 999, timeout=1)
+        self.assertIsNot(pdf_extraction.get_pool(), pool)
+
+
+class SpooledUploadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name, PDF_EXTRACT_WORKERS=0))
+        self.hr = HRUser.objects.create_user("spool@example.com", "Spool HR", "x")
+        self.job = Job.objects.create(hr=self.hr, title="Data Engineer", skills=["SQL"])
+
+    def spooled(self, data):
+        f = TemporaryUploadedFile("cv.pdf", "application/pdf", len(data), None)
+        f.write(data)
+        f.seek(0)
+        self.addCleanup(f.close)
+        return f
+
+    def test_spooled_file_is_hashed_and_parsed_from_its_path(self):
+        data = make_pdf(["Grace Hopper", "COBOL"])
+        f = self.spooled(data)
+        self.assertEqual(pdf_extraction.local_path(f), f.temporary_file_path())
+
+        with mock.patch.object(pdf_extraction, "_sha256_path", wraps=pdf_extraction._sha256_path) as hashed:
+            result = pdf_extraction.extract_pdf_text(f)
+        hashed.assert_called_once_with(f.temporary_file_path())
+        self.assertEqual(result.sha256, hashlib.sha256(data).hexdigest())
+        self.assertEqual(result.text, "Grace HopperCOBOL")
+
+    def test_save_moves_the_spooled_file_with_one_insert(self):
+        data = make_pdf(["Grace Hopper"])
+        f = self.spooled(data)
+        spooled_path = f.temporary_file_path()
+
+        with CaptureQueriesContext(connection) as ctx:
+            candidate = save_candidate(self.job, f, {"candidate_name": "Grace Hopper", "ai_score": 70})
+
+        writes = [q["sql"] for q in ctx.captured_queries
+                  if "candidates_candidateresume" in q["sql"] and not q["sql"].startswith("SELECT")]
+        self.assertEqual(len(writes), 1)
+        self.assertTrue(writes[0].startswith("INSERT"))
+        self.assertFalse(os.path.exists(spooled_path))
+        with candidate.resume.open("rb") as fh:
+            self.assertEqual(fh.read(), data)
+
+
+class ArchiveImportTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.hr = HRUser.objects.create_user("archive@example.com", "Archive HR", "x")
+        self.job = Job.objects.create(hr=self.hr, title="QA Engineer", skills=["Selenium"])
+        self.client = APIClient()
+        self.client.force_authenticate(self.hr)
+        self.url = f"/api/jobs/{self.job.id}/import-archive/"
+
+    def post(self, name, data, **extra):
+        return self.client.post(self.url, {"archive": SimpleUploadedFile(name, data), **extra}, format="multipart")
+
+    def test_corrupt_archive_is_rejected_sync_and_async(self):
+        for extra in ({}, {"async": "true"}):
+            with self.subTest(**extra):
+                response = self.post("resumes.tar.gz", b"not an archive at all", **extra)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.data)
+        self.assertFalse(IngestionBatch.objects.exists())
+
+    def test_async_import_queues_members(self):
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as zf:
+            zf.writestr("a.pdf", make_pdf(["Alice"]))
+            zf.writestr("notes.docx", b"skip me")
+        response = self.post("resumes.zip", buf.getvalue(), **{"async": "true"})
+
+        self.assertEqual(response.status_code, 202)
+        batch = IngestionBatch.objects.get(id=response.data["batch_id"])
+        self.assertEqual(batch.status, IngestionBatch.PENDING)
+        self.assertEqual(list(batch.items.values_list("filename", flat=True)), ["a.pdf"])
+        self.assertEqual(response.data["results"][1]["error"], "Unsupported file type")
+
+    def test_async_import_failure_discards_the_partial_batch(self):
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as zf:
+            zf.writestr("a.txt", b"Alice")
+            zf.writestr("b.txt", b"Bob")
+        stored = []
+
+        def add_then_fail(batch, f):
+            if stored:
+                raise OSError("disk full")
+            stored.append(ingestion.add_item(batch, f))
+            return stored[-1]
+
+        with mock.patch("jobs.archive_import.add_item", side_effect=add_then_fail), self.assertRaises(OSError):
+            self.post("resumes.zip", buf.getvalue(), **{"async": "true"})
+
+        self.assertFalse(IngestionBatch.objects.exists())
+        self.assertFalse(IngestionItem.objects.exists())
+        self.assertFalse(os.path.exists(stored[0].upload.path))
+
+
+class LLMProviderTests(SimpleTestCase):
+    JOB = SimpleNamespace(title="Backend Developer", skills=["Python", "Django", "Kubernetes"], experience_level="Fresher")
+    RESUME = "Ada Lovelace\nada@example.com\nBuilt APIs with Python and Django."
+
+    def test_local_provider_is_deterministic_and_schema_valid(self):
+        provider = LocalProvider()
+        first = evaluate_text(self.JOB, self.RESUME, provider)
+        self.assertEqual(first, evaluate_text(self.JOB, self.RESUME, LocalProvider()))
+        self.assertEqual(first["candidate_name"], "Ada Lovelace")
+        self.assertEqual(first["candidate_email"], "ada@example.com")
+        self.assertEqual(first["extracted_skills"], ["Python", "Django"])
+        self.assertTrue(0 <= first["ai_score"] <= 100)
+
+    def test_local_provider_answers_every_prompt_kind(self):
+        provider = LocalProvider()
+        extracted = json.loads(provider.generate("Conversation:\nI need a job for a Data Analyst.", kind="job_extraction"))
+        self.assertEqual(extracted["job_title"], "Data Analyst")
+        self.assertEqual(len(json.loads(provider.generate("", kind="skill_suggestions"))), 8)
+        self.assertIn("Data Analyst", provider.generate("description for: Data Analyst.\n", kind="job_description"))
+        self.assertEqual(provider.generate("anything", kind="unknown"), "")
+
+    def test_injected_failures_are_transient(self):
+        with self.assertRaises(LLMTransientError):
+            LocalProvider(failure_rate=1.0).generate(self.RESUME, kind="resume_evaluation")
+
+    @override_settings(LOCAL_LLM_LATENCY_MS=0, LOCAL_LLM_FAILURE_RATE=0, LOCAL_LLM_SEED=0)
+    def test_build_provider(self):
+        self.assertIsInstance(build_provider("local"), LocalProvider)
+        with self.assertRaises(ValueError):
+            build_provider("nope")
+
+    def test_gemini_errors_are_classified(self):
+        ResourceExhausted = type("ResourceExhausted", (Exception,), {})
+        ServiceUnavailable = type("ServiceUnavailable", (Exception,), {})
+        self.assertIsInstance(_classify_gemini_error(ResourceExhausted("quota")), LLMThrottled)
+        self.assertIsInstance(_classify_gemini_error(ServiceUnavailable("down")), LLMTransientError)
+        self.assertIsInstance(_classify_gemini_error(TimeoutError()), LLMTransientError)
+        error = _classify_gemini_error(ValueError("blocked prompt"))
+        self.assertIs(type(error), LLMError)
+
+
+class CountingProvider(LocalProvider):
+    def __init__(self):
+        super().__init__()
+        self.prompts = []
+        self._calls_lock = threading.Lock()
+
+    @property
+    def calls(self):
+        return len(self.prompts)
+
+    def generate(self, prompt, kind=None):
+        with self._calls_lock:
+            self.prompts.append(prompt)
+        return super().generate(prompt, kind=kind)
+
+
+class SlowProvider(LocalProvider):
+    """LocalProvider whose latency depends on the resume, tracking calls in flight."""
+    def __init__(self, delays, failing=()):
+        super().__init__()
+        self.delays = delays  # resume marker -> seconds
+        self.failing = failing  # resume markers that raise
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, kind=None):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(next((d for marker, d in self.delays.items() if marker in prompt), 0))
+            if any(marker in prompt for marker in self.failing):
+                raise LLMError("boom")
+            return super().generate(prompt, kind=kind)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+@override_settings(RESUME_CONDENSE=False, PRESCORE_TOP_K=0, PRESCORE_MIN_SCORE=0)
+class EvaluateResumesTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.hr = HRUser.objects.create_user("pipeline@example.com", "Pipeline HR", "x")
+        self.job = Job.objects.create(hr=self.hr, title="Go Developer", skills=["Go", "gRPC"])
+
+    def files(self, n):
+        return [
+            SimpleUploadedFile(f"cv{i}.txt", f"Candidate {i}\nc{i}@example.com\nmarker-{i} Go gRPC\n".encode())
+            for i in range(n)
+        ]
+
+    def test_results_keep_upload_order_when_calls_finish_out_of_order(self):
+        # earlier files take longest, so completions arrive in reverse
+        provider = SlowProvider({f"marker-{i}": 0.05 * (4 - i) for i in range(4)})
+        seen = []
+        results = evaluate_resumes(self.job, self.files(4), provider, max_workers=4, on_result=lambda idx, *_: seen.append(idx))
+
+        self.assertEqual([r["filename"] for r in results], [f"cv{i}.txt" for i in range(4)])
+        self.assertEqual([r["email"] for r in results], [f"c{i}@example.com" for i in range(4)])
+        self.assertNotEqual(seen, sorted(seen))
+        self.assertEqual(CandidateResume.objects.filter(job=self.job).count(), 4)
+
+    def test_in_flight_calls_never_exceed_max_workers(self):
+        provider = SlowProvider({"marker-": 0.02})
+        results = evaluate_resumes(self.job, self.files(10), provider, max_workers=3)
+        self.assertTrue(all("error" not in r for r in results))
+        self.assertGreater(provider.max_in_flight, 1)
+        self.assertLessEqual(provider.max_in_flight, 3)
+
+    def test_failing_file_gets_its_own_error_entry(self):
+        files = self.files(3)
+        files[1] = SimpleUploadedFile("cv1.docx", b"binary")
+        provider = SlowProvider({"marker-0": 0.01}, failing=["marker-2"])
+        results = evaluate_resumes(self.job, files, provider, max_workers=2)
+
+        self.assertEqual(results[1]["error"], "Unsupported file type")
+        self.assertEqual(results[2]["error"], "AI service error")
+        self.assertNotIn("error", results[0])
+        self.assertEqual(list(CandidateResume.objects.values_list("candidate_email", flat=True)), ["c0@example.com"])
+
+    @override_settings(PDF_EXTRACT_WORKERS=0)
+    def test_pdf_text_cache_is_only_used_from_the_calling_thread(self):
+        cache.clear()
+        caller = threading.current_thread()
+        threads = []
+        real_get, real_set = pdf_extraction.cache.get, pdf_extraction.cache.set
+
+        def record(fn):
+            def wrapper(*args, **kwargs):
+                threads.append(threading.current_thread())
+                return fn(*args, **kwargs)
+            return wrapper
+
+        def pdfs():
+            return [SimpleUploadedFile(f"cv{i}.pdf", make_pdf([f"Candidate {i}", "Go gRPC"])) for i in range(3)]
+
+        with mock.patch.object(pdf_extraction.cache, "get", record(real_get)), \
+                mock.patch.object(pdf_extraction.cache, "set", record(real_set)):
+            first = evaluate_resumes(self.job, pdfs(), LocalProvider(), max_workers=3)
+            with mock.patch.object(pdf_extraction, "_parse", side_effect=AssertionError("parsed again")):
+                second = evaluate_resumes(self.job, pdfs(), LocalProvider(), max_workers=3)
+
+        self.assertEqual(len(threads), 9)  # 3 misses + 3 stores, then 3 hits
+        self.assertTrue(all(t is caller for t in threads))
+        self.assertTrue(all("error" not in r for r in first + second))
+
+    def test_latency_fields(self):
+        provider = SlowProvider({"marker-": 0.03})
+        results = evaluate_resumes(self.job, self.files(2) + [SimpleUploadedFile("x.doc", b"")], provider, max_workers=2)
+        for entry in results[:2]:
+            self.assertGreaterEqual(entry["parse_ms"], 0)
+            self.assertGreaterEqual(entry["latency_ms"], 30)
+            self.assertGreaterEqual(entry["latency_ms"], entry["parse_ms"])
+            self.assertFalse(entry["cached"])
+            self.assertTrue(entry["llm_evaluated"])
+        self.assertNotIn("parse_ms", results[2])
+        self.assertIn("latency_ms", results[2])
+
+
+class PrescoringTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name, RESUME_CONDENSE=False))
+        self.hr = HRUser.objects.create_user("prescore@example.com", "Prescore HR", "x")
+        self.job = Job.objects.create(
+            hr=self.hr, title="Python Developer", skills=["Python", "Django", "PostgreSQL"],
+            description="Build Django REST APIs on PostgreSQL",
+        )
+
+    def test_score_batch_ranks_skill_matches_first(self):
+        scores, matched = prescoring.score_batch(self.job, [
+            "Python Django PostgreSQL REST APIs",
+            "Python scripting",
+            "Watercolour painting and pottery",
+        ])
+        self.assertGreater(scores[0], scores[1])
+        self.assertGreater(scores[1], scores[2])
+        self.assertEqual(matched[0], ["Python", "Django", "PostgreSQL"])
+        self.assertEqual(matched[2], [])
+
+    @override_settings(PRESCORE_TOP_K=2, PRESCORE_MIN_SCORE=90)
+    def test_select_for_llm(self):
+        selected = prescoring.select_for_llm(np.array([50, 70, 70, 95, 10]))
+        # top 2 (ties keep upload order) plus everything >= 90
+        self.assertEqual(selected.tolist(), [False, True, False, True, False])
+
+    @override_settings(PRESCORE_TOP_K=3, RESUME_EVAL_MAX_WORKERS=4, PDF_EXTRACT_WORKERS=0)
+    def test_archive_top_k_applies_to_the_whole_archive(self):
+        buf = io.BytesIO()
+        strong = {2, 7, 11}
+        with zipfile.ZipFile(buf, "w") as zf:
+            for i in range(12):
+                body = "Python Django PostgreSQL REST APIs" if i in strong else "Retail sales and customer service"
+                zf.writestr(f"cv{i}.txt", f"Candidate {i}\nc{i}@example.com\n{body}\n")
+        provider = CountingProvider()
+
+        results, error = import_archive(self.job, SimpleUploadedFile("cvs.zip", buf.getvalue()), provider)
+
+        self.assertIsNone(error)
+        self.assertEqual(provider.calls, 3)
+        self.assertEqual({i for i, r in enumerate(results) if r["llm_evaluated"]}, strong)
+        self.assertEqual(CandidateResume.objects.filter(job=self.job).count(), 12)
+
+
+@override_settings(PRESCORE_TOP_K=0, PRESCORE_MIN_SCORE=0, RESCORE_LLM_DELTA=15, RESUME_CONDENSE=False)
+class RescoringTests(TestCase):
+    def setUp(self):
+        self.hr = HRUser.objects.create_user("rescore@example.com", "Rescore HR", "x")
+        self.job = Job.objects.create(hr=self.hr, title="Python Developer", skills=["Python", "Django"])
+
+    def candidate(self, text, llm_evaluated=True, ai_score=60, evaluated_for=None):
+        return CandidateResume.objects.create(
+            job=self.job, candidate_name=text.split()[0], resume_text=text, ai_score=ai_score,
+            llm_evaluated=llm_evaluated, evaluated_for=evaluated_for or {},
+        )
+
+    def test_rescore_endpoint_rejects_bad_max_llm(self):
+        client = APIClient()
+        client.force_authenticate(self.hr)
+        url = f"/api/jobs/{self.job.id}/rescore/"
+        for bad in ("-1", "x"):
+            with self.subTest(bad):
+                response = client.post(url, {"max_llm": bad}, format="json")
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(client.post(url, {"max_llm": 0, "llm": False}, format="json").status_code, 200)
+
+    def test_unchanged_candidates_are_skipped(self):
+        current = self.candidate("Ada Python Django", evaluated_for=job_requirements(self.job))
+        summary = rescore_job(self.job, CountingProvider())
+        self.assertEqual(summary["unchanged"], 1)
+        current.refresh_from_db()
+        self.assertEqual(current.ai_score, 60)
+
+    def test_llm_scores_shift_by_the_local_delta(self):
+        old = {**job_requirements(self.job), "skills": ["Cobol"]}
+        c = self.candidate("Ada Python Django web apps", ai_score=40, evaluated_for=old)
+        provider = CountingProvider()
+
+        summary = rescore_job(self.job, provider, use_llm=False)
+
+        c.refresh_from_db()
+        texts = [c.resume_text]
+        delta = prescoring.score_batch(self.job, texts)[0][0] - prescoring.score_batch(
+            SimpleNamespace(title=old["title"], skills=old["skills"], description=old["description"]), texts
+        )[0][0]
+        self.assertEqual(c.ai_score, max(0, min(100, 40 + delta)))
+        self.assertEqual(c.evaluated_for, job_requirements(self.job))
+        self.assertEqual((summary["local"], provider.calls), (1, 0))
+
+    def test_llm_budget_only_goes_to_candidates_that_need_it(self):
+        # LLM-scored with no baseline: delta 0, stays local
+        settled = self.candidate("Settled Python Django")
+        # provisional candidates the pre-scorer now sends to the model, also delta 0
+        first = self.candidate("First Python", llm_evaluated=False)
+        second = self.candidate("Second Django", llm_evaluated=False)
+        provider = CountingProvider()
+
+        summary = rescore_job(self.job, provider, max_llm=2)
+
+        self.assertEqual(summary["llm"], 2)
+        self.assertFalse(any(settled.resume_text in p for p in provider.prompts))
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertTrue(first.llm_evaluated and second.llm_evaluated)
+
+
+@override_settings(RESUME_CONDENSE=True, RESUME_PROMPT_TOKEN_BUDGET=30, PRESCORE_TOP_K=0, PRESCORE_MIN_SCORE=0, RESCORE_LLM_DELTA=0)
+class CondenserTests(TestCase):
+    RESUME = "\n".join([
+        "Ada Lovelace", "ada@example.com",
+        "Skills", "Python, Django, PostgreSQL",
+        "Experience", "Kubernetes operator work at Analytical Engines Ltd",
+        "Hobbies", "Chess, long walks, " + "collecting stamps, " * 10,
+        "Ada Lovelace",  # page footer repeated
+    ])
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.hr = HRUser.objects.create_user("condense@example.com", "Condense HR", "x")
+        self.job = Job.objects.create(hr=self.hr, title="Python Developer", skills=["Python", "Django"])
+
+    def test_condense_keeps_relevant_sections_in_order_within_budget(self):
+        condensed = condense(self.RESUME, self.job)
+        self.assertLessEqual(len(condensed), 30 * CHARS_PER_TOKEN)
+        self.assertTrue(condensed.startswith("Ada Lovelace\nada@example.com\nSkills\nPython, Django"))
+        self.assertNotIn("stamps", condensed)
+        self.assertEqual(condensed.count("Ada Lovelace"), 1)
+
+    def test_full_text_is_stored_and_condensed_per_prompt(self):
+        provider = CountingProvider()
+        f = SimpleUploadedFile("ada.txt", self.RESUME.encode())
+        evaluate_resumes(self.job, [f], provider)
+
+        candidate = CandidateResume.objects.get(job=self.job)
+        self.assertEqual(candidate.resume_text, self.RESUME)
+        self.assertIn(condense(self.RESUME, self.job), provider.prompts[0])
+        self.assertNotIn("Kubernetes", provider.prompts[0])
+
+        # rescoring after a skills edit condenses against the new requirements
+        self.job.title = "Platform Engineer"
+        self.job.skills = ["Kubernetes", "Operator"]
+        self.job.save()
+        rescore_job(self.job, provider)
+        self.assertEqual(provider.calls, 2)
+        self.assertIn("Kubernetes operator work", provider.prompts[1])
+
+
+class ScriptedProvider(LLMProvider):
+    """Raises / returns the scripted outcomes in order."""
+    name = "scripted"
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+
+    def generate(self, prompt, kind=None):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+class ResilientProviderTests(SimpleTestCase):
+    def wrap(self, *outcomes, **options):
+        config = dict(rate=0, burst=1, min_concurrency=1, max_concurrency=4, max_retries=2,
+                      base_delay=0, max_delay=0, breaker_threshold=2, breaker_cooldown=0.05)
+        config.update(options)
+        return ResilientProvider(ScriptedProvider(*outcomes), **config)
+
+    def test_retries_transient_errors(self):
+        provider = self.wrap(LLMTransientError("reset"), LLMThrottled("429"), "ok", breaker_threshold=5)
+        self.assertEqual(provider.generate("p"), "ok")
+        stats = provider.stats()
+        self.assertEqual((stats["retries"], stats["throttles"], stats["successes"]), (2, 1, 1))
+        self.assertEqual(provider.concurrency.in_flight, 0)
+        self.assertLess(provider.concurrency.limit, 4)  # halved on the 429, not fully recovered
+
+    def test_unexpected_exceptions_release_the_slot(self):
+        provider = self.wrap(ValueError("bad SDK response"), KeyError("text"))
+        for error in (ValueError, KeyError):
+            with self.assertRaises(error):
+                provider.generate("p")
+        self.assertEqual(provider.concurrency.in_flight, 0)
+        self.assertEqual(provider.stats()["failures"], 2)
+        # two provider failures reach the threshold
+        self.assertTrue(provider.stats()["circuit_open"])
+
+    def test_half_open_trial_is_settled_by_any_outcome(self):
+        provider = self.wrap(LLMTransientError("down"), LLMTransientError("down"), max_retries=0)
+        for _ in range(2):
+            with self.assertRaises(LLMTransientError):
+                provider.generate("p")
+        with self.assertRaises(CircuitOpenError):
+            provider.generate("p")
+
+        time.sleep(0.06)
+        provider.inner.outcomes = [ValueError("boom")]
+        with self.assertRaises(ValueError):
+            provider.generate("p")  # failed trial: open for another cooldown
+        self.assertFalse(provider.breaker.trial_in_flight)
+
+        time.sleep(0.06)
+        provider.inner.outcomes = [LLMError("blocked prompt")]
+        with self.assertRaises(LLMError):
+            provider.generate("p")  # says nothing about health: still open, trial released
+        self.assertTrue(provider.stats()["circuit_open"])
+        self.assertFalse(provider.breaker.trial_in_flight)
+
+        provider.inner.outcomes = ["ok"]
+        self.assertEqual(provider.generate("p"), "ok")
+        self.assertFalse(provider.stats()["circuit_open"])
+        self.assertEqual(provider.concurrency.in_flight, 0)
+
+    def test_token_bucket_limits_rate_after_burst(self):
+        bucket = TokenBucket(rate=20, burst=2)
+        started = time.monotonic()
+        for _ in range(4):
+            bucket.acquire()
+        # 2 from the burst, then 2 more at 20/s
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+
+
+class JobGenerationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_generations_are_memoized_per_normalized_title(self):
+        provider = CountingProvider()
+        first = complete_job_fields(provider, {"job_title": "Full-Stack Developer", "experience_level": "Fresher"})
+        self.assertEqual(provider.calls, 2)  # skills + description
+        self.assertEqual(len(first["skills"]), 8)
+        self.assertTrue(first["description"])
+
+        again = complete_job_fields(provider, {"job_title": "  full stack   developer ", "experience_level": "fresher"})
+        self.assertEqual(provider.calls, 2)
+        self.assertEqual((again["skills"], again["description"]), (first["skills"], first["description"]))
+
+        complete_job_fields(provider, {"job_title": "Full-Stack Developer", "experience_level": "Senior"})
+        self.assertEqual(provider.calls, 4)
+
+    def test_given_fields_are_kept_and_failures_not_cached(self):
+        provider = ScriptedProvider(LLMError("blocked"))
+        data = complete_job_fields(provider, {
+            "job_title": "Data Analyst", "experience_level": "Fresher",
+            "skills": ["SQL", "Excel", "Python", "Tableau"],
+        })
+        self.assertEqual(data["skills"], ["SQL", "Excel", "Python", "Tableau"])
+        self.assertEqual(data["description"], "")
+
+        provider = CountingProvider()
+        data = complete_job_fields(provider, {"job_title": "Data Analyst", "experience_level": "Fresher", "skills": ["SQL"]})
+        self.assertEqual(provider.calls, 2)
+        self.assertIn("Data Analyst", data["description"])
+
+
+@override_settings(CHAT_HISTORY_MESSAGES=3, CHAT_MESSAGE_MAX_CHARS=10)
+class ConversationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.hr = HRUser.objects.create_user("chat@example.com", "Chat HR", "x")
+        self.other = HRUser.objects.create_user("chat2@example.com", "Other HR", "x")
+
+    def test_history_is_bounded_per_user(self):
+        for i in range(5):
+            conversations.append(self.hr, "user", f"message {i} with a long tail")
+        conversations.append(self.other, "user", "hello")
+
+        history = conversations.history(self.hr)
+        self.assertEqual([m["content"] for m in history], ["message 2 ", "message 3 ", "message 4 "])
+        self.assertEqual(conversations.render(conversations.history(self.other)), "user: hello")
+
+        conversations.clear(self.hr)
+        self.assertEqual(conversations.history(self.hr), [])
+        self.assertEqual(len(conversations.history(self.other)), 1)
+
+    def test_sessions_live_in_a_cache_shared_across_processes(self):
+        self.assertIsInstance(caches["default"], DatabaseCache)
+        conversations.append(self.hr, "user", "hi")
+        # a fresh handle (as another worker process would open) sees the same session
+        self.assertEqual(caches.create_connection("default").get(conversations._key(self.hr)), [{"role": "user", "content": "hi"}])
+
+
+class IntentRouterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.hr = HRUser.objects.create_user("intents@example.com", "Intent HR", "x")
+        cls.job = Job.objects.create(hr=cls.hr, title="Frontend Developer", skills=["React"])
+        CandidateResume.objects.bulk_create([
+            CandidateResume(job=cls.job, candidate_name=name, ai_score=score, shortlisted=shortlisted)
+            for name, score, shortlisted in [("Ann", 90, True), ("Ben", 70, False), ("Cal", 50, True), ("Dee", 30, False)]
+        ])
+
+    def test_routing(self):
+        cases = {
+            "show me the top 3 candidates": ("top_candidates", {"n": 3}),
+            "best candidates please": ("top_candidates", {"n": 5}),
+            "top 500 resumes": ("top_candidates", {"n": intents.MAX_LISTED}),
+            "what is the average score": ("score_summary", {}),
+            "how many candidates are shortlisted?": ("shortlisted_count", {}),
+            "who is short-listed": ("shortlisted_list", {}),
+            "how many candidates do we have": ("candidate_count", {}),
+            "how many resumes above 75?": ("candidates_above", {"threshold": 75}),
+            "how many are above 150": ("candidates_above", {"threshold": 100}),
+            "shortlist above 70": ("shortlist_preview", {"threshold": 70}),
+            "shortlist >= 65": ("shortlist_preview", {"threshold": 65}),
+            "mark shortlist above 70": ("shortlist_apply", {"threshold": 70}),
+            "shortlist all over 60": ("shortlist_apply", {"threshold": 60}),
+            "please shortlist 80": ("shortlist_apply", {"threshold": 80}),
+        }
+        for message, (name, params) in cases.items():
+            with self.subTest(message):
+                intent, kwargs = route_intent(message)
+                self.assertEqual((intent.name, kwargs), (name, params))
+        self.assertIsNone(route_intent("create a job for a data analyst"))
+
+    def test_handlers(self):
+        top = intents.top_candidates(self.job, 2)
+        self.assertEqual([c["candidate_name"] for c in top["candidates"]], ["Ann", "Ben"])
+        summary = intents.score_summary(self.job)
+        self.assertEqual((summary["count"], summary["average"], summary["highest"], summary["lowest"]), (4, 60.0, 90, 30))
+        self.assertEqual((intents.shortlisted_count(self.job)["shortlisted"]), 2)
+        self.assertEqual([c["candidate_name"] for c in intents.shortlisted_list(self.job)["candidates"]], ["Ann", "Cal"])
+        self.assertEqual(intents.candidate_count(self.job)["count"], 4)
+        self.assertEqual(intents.candidates_above(self.job, 60)["count"], 2)
+        self.assertEqual(len(intents.shortlist_preview(self.job, 50)["shortlist_ids"]), 3)
+
+    def test_chat_answers_from_the_database(self):
+        client = APIClient()
+        client.force_authenticate(self.hr)
+        response = client.post("/api/jobs/chat/", {"message": "top 1 candidate", "job_id": self.job.id}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["candidates"][0]["candidate_name"], "Ann")
+
+
+class JobSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.hr = HRUser.objects.create_user("search@example.com", "Search HR", "x")
+        cls.other = HRUser.objects.create_user("search2@example.com", "Other HR", "x")
+        cls.backend = Job.objects.create(hr=cls.hr, title="Backend Developer", skills=["Python", "Django"])
+        cls.frontend = Job.objects.create(hr=cls.hr, title="Frontend Developer", skills=["React"])
+        cls.foreign = Job.objects.create(hr=cls.other, title="Backend Developer", skills=["Go"])
+
+    def test_tokenize(self):
+        self.assertEqual(job_search.tokenize("The Python Developers job, C++ & C#"), ["python", "developer", "c++"])
+
+    def test_find_job_ranks_users_jobs(self):
+        self.assertEqual(find_job(self.hr, "the backend developers job I created before"), self.backend)
+        self.assertEqual(find_job(self.hr, "developer with react"), self.frontend)
+        self.assertEqual(find_job(self.other, "backend developer"), self.foreign)
+        # skills alone are not enough: a title token must match
+        self.assertIsNone(find_job(self.hr, "python django"))
+        self.assertIsNone(find_job(self.hr, "hello"))
+
+    def test_index_follows_job_edits(self):
+        self.frontend.title = "Mobile Engineer"
+        self.frontend.save()
+        self.assertEqual(find_job(self.hr, "mobile engineer"), self.frontend)
+        self.assertIsNone(find_job(self.hr, "frontend"))
+
+
+class CandidatePaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.hr = HRUser.objects.create_user("pages@example.com", "Pages HR", "x")
+        cls.job = Job.objects.create(hr=cls.hr, title="Support Engineer", skills=["Linux"])
+        now = timezone.now()
+        # many score ties and identical timestamps, so every ordering key matters
+        CandidateResume.objects.bulk_create([
+            CandidateResume(job=cls.job, candidate_name=f"C{i}", ai_score=i % 4, created_at=now - timedelta(seconds=i % 3))
+            for i in range(23)
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.hr)
+        self.url = f"/api/jobs/{self.job.id}/candidates/"
+
+    def test_cursor_round_trip(self):
+        c = CandidateResume.objects.first()
+        self.assertEqual(decode_cursor(encode_cursor(c)), (c.ai_score, c.created_at, c.id))
+        for bad in ("", "%%%", "bm90IGpzb24", encode_cursor(c)[:-4]):
+            with self.subTest(bad), self.assertRaises(InvalidCursor):
+                decode_cursor(bad)
+
+    def test_pages_cover_every_candidate_once_in_order(self):
+        seen, cursor, pages = [], None, 0
+        while True:
+            params = {"page_size": 5, **({"cursor": cursor} if cursor else {})}
+            data = self.client.get(self.url, params).data
+            seen.extend(c["id"] for c in data["candidates"])
+            pages += 1
+            if not data["has_more"]:
+                self.assertIsNone(data["next_cursor"])
+                break
+            cursor = data["next_cursor"]
+
+        expected = list(CandidateResume.objects.filter(job=self.job).order_by(*CANDIDATE_ORDERING).values_list("id", flat=True))
+        self.assertEqual(seen, expected)
+        self.assertEqual(pages, 5)
+
+    @override_settings(CANDIDATES_PAGE_SIZE=10, CANDIDATES_MAX_PAGE_SIZE=20)
+    def test_page_size_defaults_and_bounds(self):
+        self.assertEqual(len(self.client.get(self.url).data["candidates"]), 10)
+        self.assertEqual(len(self.client.get(self.url, {"page_size": 1000}).data["candidates"]), 20)
+        self.assertEqual(len(self.client.get(self.url, {"page_size": "x"}).data["candidates"]), 10)
+
+    def test_invalid_cursor_is_a_400(self):
+        self.assertEqual(self.client.get(self.url, {"cursor": "garbage"}).status_code, 400)
+
+
+class HRStatsTests(TestCase):
+    def setUp(self):
+        self.hr = HRUser.objects.create_user("stats@example.com", "Stats HR", "x")
+        self.job = Job.objects.create(hr=self.hr, title="Data Engineer", skills=["Spark"])
+
+    def counts(self):
+        hr = HRStats.objects.values("jobs", "candidates", "shortlisted").get(pk=self.hr.pk)
+        job = JobStats.objects.values("candidates", "shortlisted").get(pk=self.job.pk)
+        return hr, job
+
+    def test_signals_keep_counters_in_step(self):
+        a = CandidateResume.objects.create(job=self.job, candidate_name="A", shortlisted=True)
+        CandidateResume.objects.create(job=self.job, candidate_name="B")
+        self.assertEqual(self.counts(), (
+            {"jobs": 1, "candidates": 2, "shortlisted": 1}, {"candidates": 2, "shortlisted": 1},
+        ))
+
+        a.delete()
+        self.assertEqual(self.counts(), (
+            {"jobs": 1, "candidates": 1, "shortlisted": 0}, {"candidates": 1, "shortlisted": 0},
+        ))
+
+    def test_bulk_shortlist_applies_deltas(self):
+        from candidates.shortlisting import bulk_shortlist
+
+        CandidateResume.objects.bulk_create([CandidateResume(job=self.job, ai_score=s) for s in (10, 60, 90)])
+        hr_stats.rebuild([self.hr.pk])
+        bulk_shortlist(self.hr, job_id=self.job.id, min_score=50)
+        self.assertEqual(self.counts()[0]["shortlisted"], 2)
+        bulk_shortlist(self.hr, shortlisted=False, job_id=self.job.id, min_score=80)
+        self.assertEqual(self.counts(), (
+            {"jobs": 1, "candidates": 3, "shortlisted": 1}, {"candidates": 3, "shortlisted": 1},
+        ))
+
+    def test_missing_job_row_is_rebuilt_without_double_counting(self):
+        CandidateResume.objects.create(job=self.job, candidate_name="A")
+        JobStats.objects.filter(pk=self.job.pk).delete()
+
+        CandidateResume.objects.create(job=self.job, candidate_name="B", shortlisted=True)
+        self.assertEqual(self.counts(), (
+            {"jobs": 1, "candidates": 2, "shortlisted": 1}, {"candidates": 2, "shortlisted": 1},
+        ))
+
+    def test_missing_job_row_on_shortlist_deltas(self):
+        c = CandidateResume.objects.create(job=self.job, candidate_name="A")
+        JobStats.objects.filter(pk=self.job.pk).delete()
+        CandidateResume.objects.filter(pk=c.pk).update(shortlisted=True)
+
+        hr_stats.apply_shortlist_deltas(self.hr.pk, {self.job.pk: 1})
+        self.assertEqual(self.counts(), (
+            {"jobs": 1, "candidates": 1, "shortlisted": 1}, {"candidates": 1, "shortlisted": 1},
+        ))
+
+    def test_missing_hr_row_is_rebuilt(self):
+        HRStats.objects.filter(pk=self.hr.pk).delete()
+        CandidateResume.objects.create(job=self.job, candidate_name="A")
+        self.assertEqual(self.counts()[0], {"jobs": 1, "candidates": 1, "shortlisted": 0})
+        self.assertEqual(hr_stats.get_hr_stats(self.hr), {"jobs": 1, "candidates": 1, "shortlisted": 0})
+
+
+class AnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.hr = HRUser.objects.create_user("analytics@example.com", "Analytics HR", "x")
+        self.job = Job.objects.create(hr=self.hr, title="Backend Engineer", skills=["Python"])
+        other = Job.objects.create(hr=self.hr, title="Frontend Engineer", skills=["React"])
+        CandidateResume.objects.bulk_create([
+            CandidateResume(job=self.job, ai_score=95, shortlisted=True, extracted_skills=["Python", "python ", "SQL"]),
+            CandidateResume(job=self.job, ai_score=40, llm_evaluated=False, extracted_skills=["SQL"]),
+            CandidateResume(job=other, ai_score=100, extracted_skills=["React"]),
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(self.hr)
+
+    def test_compute(self):
+        data = analytics.job_analytics(self.job)
+        self.assertEqual((data["count"], data["shortlisted"], data["llm_evaluated"]), (2, 1, 1))
+        self.assertEqual(data["shortlist_rate"], 0.5)
+        self.assertEqual(data["average"], 67.5)
+        self.assertEqual([b["count"] for b in data["histogram"] if b["count"]], [1, 1])
+        self.assertEqual(data["histogram"][-1], {"from": 90, "to": 100, "count": 1})
+        self.assertEqual(data["percentiles"]["p50"], 67.5)
+        self.assertEqual(data["top_skills"], [{"skill": "SQL", "count": 2}, {"skill": "Python", "count": 1}])
+
+        self.assertEqual(analytics.hr_analytics(self.hr)["count"], 3)
+        empty = analytics.compute(CandidateResume.objects.none())
+        self.assertEqual((empty["count"], empty["average"], empty["percentiles"]["p90"]), (0, None, None))
+
+    def test_results_are_cached_until_a_candidate_changes(self):
+        url = f"/api/jobs/{self.job.id}/analytics/"
+        self.assertEqual(self.client.get(url).data["count"], 2)
+        # a single cache-table read, no aggregate queries
+        with self.assertNumQueries(1):
+            self.assertEqual(analytics.job_analytics(self.job)["count"], 2)
+
+        CandidateResume.objects.create(job=self.job, ai_score=70)
+        self.assertEqual(self.client.get(url).data["count"], 3)
+        self.assertEqual(self.client.get("/api/jobs/analytics/").data["count"], 4)
+
+    def test_invalidation_reaches_other_processes(self):
+        analytics.hr_analytics(self.hr)
+        # a separate connection to the same backend stands in for another worker
+        other = caches.create_connection("default")
+        self.assertIsNotNone(other.get(analytics._key("hr", self.hr.pk)))
+
+        analytics.invalidate_many([self.job.id], self.hr.pk)
+        self.assertIsNone(other.get(analytics._key("hr", self.hr.pk)))
+
+
+class ChatShortlistTests(TestCase):
+    def setUp(self):
+        self.hr = HRUser.objects.create_user("chatlist@example.com", "Chatlist HR", "x")
+        self.job = Job.objects.create(hr=self.hr, title="SRE", skills=["Go"])
+        self.low, self.mid, self.high = CandidateResume.objects.bulk_create([
+            CandidateResume(job=self.job, ai_score=30),
+            CandidateResume(job=self.job, ai_score=70),
+            CandidateResume(job=self.job, ai_score=90, shortlisted=True),
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(self.hr)
+
+    def chat(self, message):
+        response = self.client.post("/api/jobs/chat/", {"message": message, "job_id": self.job.id}, format="json")
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_preview_does_not_write(self):
+        data = self.chat("shortlist above 60")
+        self.assertEqual(data["shortlist_ids"], [self.high.id, self.mid.id])
+        self.assertFalse(CandidateResume.objects.get(pk=self.mid.pk).shortlisted)
+
+    def test_apply_returns_every_match_and_the_changed_ones(self):
+        data = self.chat("mark shortlist above 60")
+        self.assertEqual(data["shortlist_ids"], [self.high.id, self.mid.id])
+        self.assertEqual(data["changed_ids"], [self.mid.id])
+
+        again = self.chat("mark shortlist above 60")
+        self.assertEqual(again["shortlist_ids"], [self.high.id, self.mid.id])
+        self.assertEqual(again["changed_ids"], [])
+        self.assertIn("Marked 2", again["reply"])
@@ -1,10 +1,16 @@
 # jobs/urls.py
 from django.urls import path
-from .views import JobChatAPIView, JobsListAPIView, JobCandidatesAPIView,HRStatsView
+from .views import JobChatAPIView, JobsListAPIView, JobCandidatesAPIView,HRStatsView,IngestionBatchStatusView,ArchiveImportAPIView,JobRescoreAPIView,LLMStatsView,AnalyticsView
 
 urlpatterns = [
     path("chat/", JobChatAPIView.as_view(), name="chat_with_ai"),
     path("list/", JobsListAPIView.as_view(), name="jobs_list"),
     path("<int:job_id>/candidates/", JobCandidatesAPIView.as_view(), name="job_candidates"),
     path("stats/", HRStatsView.as_view(), name="hr-stats"),
+    path("<int:job_id>/import-archive/", ArchiveImportAPIView.as_view(), name="import_archive"),
+    path("<int:job_id>/rescore/", JobRescoreAPIView.as_view(), name="job_rescore"),
+    path("ingest/<int:batch_id>/", IngestionBatchStatusView.as_view(), name="ingestion_status"),
+    path("llm-stats/", LLMStatsView.as_view(), name="llm_stats"),
+    path("analytics/", AnalyticsView.as_view(), name="hr_analytics"),
+    path("<int:job_id>/analytics/", AnalyticsView.as_view(), name="job_analytics"),
 ]
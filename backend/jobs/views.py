@@ -1,99 +1,23 @@
 # jobs/views.py
-import json
 import re
-import PyPDF2
-import uuid
-from django.conf import settings
+import time
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
-from .models import Job
-import google.generativeai as genai
-
-genai.configure(api_key=settings.GEMINI_API_KEY)
-
-# helpers
-def extract_json(text):
-    match = re.search(r"\{.*\}", text, re.DOTALL)
-    if not match:
-        cleaned = text.replace("```json", "").replace("```", "").strip()
-        match = re.search(r"\{.*\}", cleaned, re.DOTALL)
-    return json.loads(match.group()) if match else None
-
-def extract_array(text):
-    match = re.search(r"\[.*\]", text, re.DOTALL)
-    return json.loads(match.group()) if match else []
-
-def pdf_to_text(file):
-    text = ""
-    try:
-        reader = PyPDF2.PdfReader(file)
-        for page in reader.pages:
-            text += page.extract_text() or ""
-    except Exception:
-        pass
-    return text
-
-def truncate(text, max_chars=15000):
-    if len(text) <= max_chars:
-        return text
-    return text[:7000] + "\n...\n" + text[-6000:]
-
-
-# Main API view kept (chat & resume processing)
-# jobs/views.py  (only the updated JobChatAPIView + helpers shown here)
-import json
-import re
-import PyPDF2
-import uuid
-from django.conf import settings
-from rest_framework.views import APIView
-from rest_framework.response import Response
-from rest_framework import status, permissions
-from .models import Job
-import google.generativeai as genai
-
-genai.configure(api_key=settings.GEMINI_API_KEY)
-
-# -----------------------------
-# Helpers
-# -----------------------------
-def extract_json(text):
-    """Safely extract a JSON object from model output."""
-    if not text:
-        return None
-    match = re.search(r"\{.*\}", text, re.DOTALL)
-    if not match:
-        cleaned = text.replace("```json", "").replace("```", "").strip()
-        match = re.search(r"\{.*\}", cleaned, re.DOTALL)
-    try:
-        return json.loads(match.group()) if match else None
-    except Exception:
-        return None
-
-def extract_array(text):
-    match = re.search(r"\[.*\]", text, re.DOTALL)
-    if not match:
-        return []
-    try:
-        return json.loads(match.group())
-    except Exception:
-        return []
-
-def pdf_to_text(file):
-    text = ""
-    try:
-        reader = PyPDF2.PdfReader(file)
-        for page in reader.pages:
-            text += page.extract_text() or ""
-    except Exception:
-        pass
-    return text
-
-def truncate(text, max_chars=15000):
-    if len(text) <= max_chars:
-        return text
-    return text[:7000] + "\n...\n" + text[-6000:]
+from .models import Job, IngestionBatch
+from .helpers import extract_json
+from .evaluation import evaluate_resumes
+from .ingestion import enqueue_batch, batch_status, discard_batch, open_batch, release_batch
+from .archive_import import import_archive
+from .rescoring import rescore_job
+from .llm import get_provider
+from .job_generation import complete_job_fields
+from . import conversations, evaluation_cache
+from .intents import route as route_intent
+from .job_search import find_job
+from .pagination import InvalidCursor, candidate_page, page_size
+from .hr_stats import get_hr_stats
+from .analytics import hr_analytics, job_analytics
 
 # -----------------------------
 # Main view
@@ -102,96 +26,24 @@ class JobChatAPIView(APIView):
     """
     POST /api/jobs/chat/
     - If `resume` files present -> evaluate and save candidates (expected job_id in form or fallback to latest job)
+       * with `async=true` the files are queued instead and 202 + batch_id is returned
+         (progress: GET /api/jobs/ingest/<batch_id>/, processed by `manage.py run_ingestion_worker`)
     - Else -> chat flow for:
        * friendly greetings
        * find previously created job by user message
        * create job from conversation (LLM)
-       * simple commands: count resumes, count above X, shortlist above X (either preview or apply)
+       * DB-answered questions and commands (jobs/intents.py): top N candidates, average score,
+         shortlisted count / list, count resumes, count above X, shortlist above X (preview or apply)
     """
     permission_classes = [permissions.IsAuthenticated]
-    conversation = []
     REQUIRED_FIELDS = ["job_title", "salary_range", "experience_level", "job_type"]
 
-    def clean_json_array(self, text):
-        match = re.search(r"\[.*?\]", text, re.DOTALL)
-        if match:
-            try:
-                return json.loads(match.group())
-            except Exception:
-                return []
-        return []
-
-    def parse_shortlist_command(self, text):
-        """
-        Detect phrases like:
-          - 'shortlist above 65'
-          - 'shortlist >= 65'
-          - 'shortlist all above 65'
-          - 'mark shortlist above 65'
-        Returns (threshold:int or None, apply:bool)
-        apply True means user likely asked to apply/save shortlist (verbs: mark/set/shortlist all)
-        """
-        if not text:
-            return None, False
-        # threshold
-        m = re.search(r"shortlist(?:\s+all)?(?:\s+above|\s+>=|\s+>|\s+greater than|\s+over)?\s*(\d{1,3})", text, re.IGNORECASE)
-        if not m:
-            return None, False
-        try:
-            threshold = int(m.group(1))
-            threshold = max(0, min(100, threshold))
-        except:
-            return None, False
-
-        # apply if verbs like 'mark', 'set', 'shortlist all', 'shortlist and mark', 'please shortlist' with 'all' etc.
-        verbs_apply = bool(re.search(r"\b(mark|set|apply|save|shortlist\s+all|please\s+shortlist|shortlist\s+and)\b", text, re.IGNORECASE))
-        return threshold, verbs_apply
-
-    def parse_count_command(self, text):
-        """
-        Detect count queries:
-          - how many candidates
-          - how many resumes
-          - how many above 75
-        Returns dict: {"type": "total"|"above", "threshold": int|None}
-        """
-        lowered = (text or "").lower()
-        if re.search(r"how many (resumes|candidates|applications|applicants)", lowered):
-            m = re.search(r"above\s*(\d{1,3})", lowered)
-            if m:
-                try:
-                    t = int(m.group(1))
-                    return {"type": "above", "threshold": max(0, min(100, t))}
-                except:
-                    return {"type": "total", "threshold": None}
-            return {"type": "total", "threshold": None}
-        # direct "how many above 75"
-        m = re.search(r"how many .*above\s*(\d{1,3})", lowered)
-        if m:
-            try:
-                t = int(m.group(1))
-                return {"type": "above", "threshold": max(0, min(100, t))}
-            except:
-                return None
-        return None
-
     def find_matching_job_for_user(self, user, message):
         """
-        Try to find a job the current HR already created which matches tokens in message.
-        Simple token matching — good enough for 'I created a job hr trainee before' cases.
+        Find the job the current HR already created that best matches the message
+        ('I created a job hr trainee before'), via the title/skill token index.
         """
-        jobs_qs = Job.objects.filter(hr=user)
-        message_lower = (message or "").lower()
-        for job in jobs_qs.order_by("-id"):
-            title_lower = (job.title or "").lower()
-            # tokens length >2 to avoid tiny words
-            title_tokens = [t for t in re.split(r"\W+", title_lower) if len(t) > 2]
-            if not title_tokens:
-                continue
-            matches = sum(1 for tk in title_tokens if tk in message_lower)
-            if matches >= 1:
-                return job
-        return None
+        return find_job(user, message)
 
     def post(self, request):
         # --- PART A: resume uploads & evaluation ---
@@ -213,110 +65,21 @@ class JobChatAPIView(APIView):
             if not job:
                 return Response({"reply": "⚠️ Create a job first."}, status=status.HTTP_404_NOT_FOUND)
 
-            model = genai.GenerativeModel("gemini-2.5-flash")
-            results = []
-            # import here to avoid circular imports at module top
-            from candidates.models import CandidateResume
-            from django.core.files.base import ContentFile
-
-            for f in resumes:
-                fname = f.name
-                try:
-                    if fname.lower().endswith(".pdf"):
-                        text = pdf_to_text(f)
-                    elif fname.lower().endswith(".txt"):
-                        text = f.read().decode("utf-8", errors="ignore")
-                    else:
-                        results.append({"filename": fname, "error": "Unsupported file type"})
-                        continue
-
-                    if not text.strip():
-                        results.append({"filename": fname, "error": "No readable text (scanned PDF maybe)."})
-                        continue
-
-                    text = truncate(text)
-
-                    prompt = f"""
-You are an expert HR evaluator. Compare the resume with this job and return ONLY JSON.
+            if str(request.data.get("async", "")).lower() in ("1", "true", "yes"):
+                batch = enqueue_batch(request.user, job, resumes)
+                return Response({
+                    "reply": f"Queued {len(resumes)} resume(s) for evaluation.",
+                    "batch_id": batch.id,
+                    "status_url": f"/api/jobs/ingest/{batch.id}/",
+                }, status=status.HTTP_202_ACCEPTED)
 
-Job:
-Title: {job.title}
-Skills: {job.skills}
-Experience: {job.experience_level}
+            started = time.perf_counter()
+            results = evaluate_resumes(job, resumes, get_provider())
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
 
-Resume:
-{text}
+            cache_hits = sum(1 for r in results if r.get("cached"))
 
-Return strictly this JSON:
-{{
-  "name": "",
-  "email": "",
-  "skills_found": [],
-  "projects_found": [],
-  "education": "",
-  "score": 0,
-  "strengths": [],
-  "weaknesses": []
-}}
-"""
-                    try:
-                        response = model.generate_content(prompt)
-                        ai_text = response.text if hasattr(response, "text") else str(response)
-                    except Exception as e:
-                        print("Gemini call error for", fname, e)
-                        results.append({"filename": fname, "error": "AI service error"})
-                        continue
-
-                    data = extract_json(ai_text)
-                    if not data:
-                        results.append({"filename": fname, "error": "Invalid AI JSON"})
-                        continue
-
-                    # normalize score
-                    score = data.get("score", 0)
-                    try:
-                        score = int(float(score))
-                    except Exception:
-                        score = 0
-                    score = max(0, min(100, score))
-
-                    strengths = data.get("strengths", [])
-                    weaknesses = data.get("weaknesses", [])
-                    if isinstance(strengths, str):
-                        strengths = [s.strip() for s in re.split(r"\n|;|\.", strengths) if s.strip()]
-                    if isinstance(weaknesses, str):
-                        weaknesses = [s.strip() for s in re.split(r"\n|;|\.", weaknesses) if s.strip()]
-
-                    unique_name = f"{uuid.uuid4()}_{fname}"
-                    candidate = CandidateResume.objects.create(
-                        job=job,
-                        candidate_name=data.get("name") or "Unknown",
-                        candidate_email=data.get("email") or "",
-                        extracted_skills=data.get("skills_found", []),
-                        projects_found=data.get("projects_found", []),
-                        education=data.get("education", "") or "",
-                        ai_score=score,
-                        strengths=strengths,
-                        weaknesses=weaknesses
-                    )
-
-                    # save file
-                    f.seek(0)
-                    candidate.resume.save(unique_name, ContentFile(f.read()))
-                    candidate.save()
-
-                    results.append({
-                        "filename": fname,
-                        "name": candidate.candidate_name,
-                        "email": candidate.candidate_email,
-                        "score": candidate.ai_score,
-                    })
-
-                except Exception as e:
-                    print("Unexpected error processing", fname, e)
-                    results.append({"filename": fname, "error": "Server error processing file."})
-
-            return Response({"reply": f"Processed {len(results)} resume(s).", "results": results}, status=status.HTTP_200_OK)
+            return Response({"reply": f"Processed {len(results)} resume(s).", "results": results, "elapsed_ms": elapsed_ms, "cache_hits": cache_hits}, status=status.HTTP_200_OK)
 
         # --- PART B: chat / commands ---
         user_msg = (request.data.get("message") or "").strip()
@@ -348,69 +111,25 @@ Return strictly this JSON:
                 }, status=status.HTTP_200_OK)
             # else continue to normal flow
 
-        # Detect count queries like "how many candidates" or "how many above 75"
-        count_q = self.parse_count_command(user_msg)
-        if count_q is not None:
-            # choose job (from request.job_id or latest)
+        # Questions and commands answered from the DB (top N, counts, shortlist above X ...) — see jobs/intents.py
+        routed = route_intent(user_msg)
+        if routed is not None:
+            intent, params = routed
             job_id = request.data.get("job_id")
-            job = None
             if job_id:
-                try:
-                    job = Job.objects.get(id=job_id, hr=request.user)
-                except Job.DoesNotExist:
+                job = Job.objects.filter(id=job_id, hr=request.user).first()
+                if not job:
                     return Response({"reply": "I couldn't find that job (or it's not yours)."}, status=404)
             else:
                 job = Job.objects.filter(hr=request.user).order_by("-id").first()
             if not job:
                 return Response({"reply": "No job found. Create or specify a job first."}, status=404)
+            payload = intent.handler(job, **params)
+            return Response({**payload, "intent": intent.name, "job_id": job.id}, status=200)
 
-            from candidates.models import CandidateResume
-            if count_q["type"] == "total":
-                total = CandidateResume.objects.filter(job=job).count()
-                return Response({"reply": f"There are {total} candidate(s) for '{job.title}'.", "count": total, "job_id": job.id}, status=200)
-            elif count_q["type"] == "above":
-                t = count_q["threshold"]
-                total = CandidateResume.objects.filter(job=job, ai_score__gte=t).count()
-                return Response({"reply": f"There are {total} candidate(s) with score ≥ {t} for '{job.title}'.", "count": total, "threshold": t, "job_id": job.id}, status=200)
-
-        # Detect shortlist command (may be preview or apply)
-        threshold, apply_shortlist = self.parse_shortlist_command(user_msg)
-        if threshold is not None:
-            job_id = request.data.get("job_id")
-            job = None
-            if job_id:
-                try:
-                    job = Job.objects.get(id=job_id, hr=request.user)
-                except Job.DoesNotExist:
-                    return Response({"reply": "I couldn't find that job (or you don't own it)."}, status=404)
-            else:
-                job = Job.objects.filter(hr=request.user).order_by("-id").first()
-            if not job:
-                return Response({"reply": "No job found to shortlist candidates for. Create or specify a job first."}, status=404)
-
-            from candidates.models import CandidateResume
-            qs = CandidateResume.objects.filter(job=job, ai_score__gte=threshold).order_by("-ai_score")
-            shortlist_ids = [c.id for c in qs]
-
-            # if user explicitly asked to apply (verbs like mark/set), update DB
-            if apply_shortlist:
-                updated = qs.update(shortlisted=True)
-                return Response({
-                    "reply": f"Marked {updated} candidate(s) as shortlisted for job '{job.title}' (score ≥ {threshold}).",
-                    "shortlist_ids": shortlist_ids,
-                    "job_id": job.id
-                }, status=200)
-
-            # else just preview / return ids
-            return Response({
-                "reply": f"I found {len(shortlist_ids)} candidate(s) with score ≥ {threshold} for job '{job.title}'. If you want I can mark them shortlisted — say 'mark shortlist above {threshold}'.",
-                "shortlist_ids": shortlist_ids,
-                "job_id": job.id
-            }, status=200)
-
-        # Normal job creation flow: append to conversation and ask model to extract fields
-        self.conversation.append({"role": "user", "content": user_msg})
-        model = genai.GenerativeModel("gemini-2.5-flash")
+        # Normal job creation flow: append to this user's conversation and ask model to extract fields
+        history = conversations.append(request.user, "user", user_msg)
+        provider = get_provider()
         prompt = f"""
 You extract job details from chat. Return ONLY JSON.
 
@@ -425,13 +144,12 @@ Return ONLY JSON in this format:
 }}
 
 Conversation:
-{self.conversation}
+{conversations.render(history)}
 """
         try:
-            response = model.generate_content(prompt)
-            ai_text = response.text if hasattr(response, "text") else str(response)
+            ai_text = provider.generate(prompt, kind="job_extraction")
         except Exception as e:
-            print("Gemini Error:", e)
+            print("LLM Error:", e)
             return Response({"reply": "Sorry — I couldn't reach the AI service right now. Try again."}, status=status.HTTP_200_OK)
 
         data = extract_json(ai_text)
@@ -447,28 +165,8 @@ Conversation:
             human = f"Thanks — I have partial details. Could you please provide the missing info: {pretty}? (e.g. salary_range: '7 LPA', experience_level: 'Fresher', job_type: 'Full-time')"
             return Response({"reply": human, "need": missing}, status=status.HTTP_200_OK)
 
-        # generate skills if too short
-        if not data.get("skills") or len(data.get("skills", [])) < 4:
-            skill_prompt = f"Suggest 8 skills for the job title: \"{data.get('job_title')}\". Return only a JSON array."
-            try:
-                sres = model.generate_content(skill_prompt)
-                data["skills"] = self.clean_json_array(sres.text)
-            except Exception:
-                data["skills"] = []
-
-        # generate single-paragraph description if missing
-        if not data.get("description"):
-            desc_prompt = f"""
-Write a single natural 2–3 line description for: {data.get('job_title')}.
-Do NOT include lists, options or numbering — only one short paragraph.
-"""
-            try:
-                dres = model.generate_content(desc_prompt)
-                desc_text = dres.text.strip().strip("```").strip()
-                desc_text = " ".join(p.strip() for p in desc_text.splitlines() if p.strip())
-                data["description"] = desc_text
-            except Exception:
-                data["description"] = ""
+        # fill in skills / description (memoized per title + level, misses generated in parallel)
+        complete_job_fields(provider, data)
 
         # save job
         try:
@@ -481,7 +179,7 @@ Do NOT include lists, options or numbering — only one short paragraph.
                 skills=data.get("skills", []),
                 description=data.get("description", "")
             )
-            self.conversation.clear()
+            conversations.clear(request.user)
             return Response({
                 "reply": f"✅ Job '{job.title}' created! You can now upload resumes for this job.",
                 "data": data,
@@ -511,10 +209,152 @@ class JobsListAPIView(APIView):
         return Response({"jobs": data}, status=status.HTTP_200_OK)
 
 
+# Bulk import: ZIP / tar.gz of resumes for one job
+class ArchiveImportAPIView(APIView):
+    """
+    POST /api/jobs/<job_id>/import-archive/  (multipart field `archive`)
+    Streams members through the resume evaluation pipeline and returns one
+    result per member. With `async=true` members are queued on an ingestion
+    batch instead (poll GET /api/jobs/ingest/<batch_id>/).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, job_id):
+        try:
+            job = Job.objects.get(id=job_id, hr=request.user)
+        except Job.DoesNotExist:
+            return Response({"reply": "⚠️ Job not found or you are not authorized for this job."}, status=status.HTTP_404_NOT_FOUND)
+
+        archive = request.FILES.get("archive")
+        if not archive:
+            return Response({"reply": "Upload a .zip or .tar.gz file in the `archive` field."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if str(request.data.get("async", "")).lower() in ("1", "true", "yes"):
+            batch = open_batch(request.user, job)
+            try:
+                results, error = import_archive(job, archive, batch=batch)
+            except Exception:
+                # the client never gets a batch_id: don't let the worker run a partial batch
+                discard_batch(batch)
+                raise
+            if error and not results:
+                # same answer as the sync path; nothing was queued
+                discard_batch(batch)
+                return Response({"reply": f"⚠️ {error}", "error": error}, status=status.HTTP_400_BAD_REQUEST)
+            release_batch(batch)
+            payload = {
+                "reply": f"Queued {sum(1 for r in results if 'item_id' in r)} resume(s) from {archive.name}.",
+                "batch_id": batch.id,
+                "status_url": f"/api/jobs/ingest/{batch.id}/",
+                "results": results,
+            }
+            if error:
+                payload["error"] = error
+            return Response(payload, status=status.HTTP_202_ACCEPTED)
+
+        started = time.perf_counter()
+        results, error = import_archive(job, archive, get_provider())
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        if error and not results:
+            return Response({"reply": f"⚠️ {error}", "error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        payload = {
+            "reply": f"Processed {len(results)} file(s) from {archive.name}.",
+            "results": results,
+            "elapsed_ms": elapsed_ms,
+        }
+        if error:
+            payload["error"] = error
+        return Response(payload, status=status.HTTP_200_OK)
+
+
+# Refresh candidate scores after a job's requirements changed
+class JobRescoreAPIView(APIView):
+    """
+    POST /api/jobs/<job_id>/rescore/
+    Optional: `llm` (default true) - allow model calls for candidates whose
+    outcome may change; `max_llm` - cap on those calls.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, job_id):
+        try:
+            job = Job.objects.get(id=job_id, hr=request.user)
+        except Job.DoesNotExist:
+            return Response({"reply": "⚠️ Job not found or not yours."}, status=status.HTTP_404_NOT_FOUND)
+
+        use_llm = str(request.data.get("llm", "true")).lower() not in ("0", "false", "no")
+        max_llm = request.data.get("max_llm")
+        try:
+            max_llm = int(max_llm) if max_llm not in (None, "") else None
+        except (TypeError, ValueError):
+            return Response({"reply": "max_llm must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        if max_llm is not None and max_llm < 0:
+            return Response({"reply": "max_llm must not be negative."}, status=status.HTTP_400_BAD_REQUEST)
+
+        started = time.perf_counter()
+        summary = rescore_job(job, get_provider() if use_llm else None, use_llm=use_llm, max_llm=max_llm)
+        summary["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return Response({
+            "reply": f"Rescored {summary['local'] + summary['llm']} of {summary['total']} candidate(s) for '{job.title}'.",
+            "summary": summary,
+        }, status=status.HTTP_200_OK)
+
+
+# Progress of an async resume ingestion batch
+class IngestionBatchStatusView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, batch_id):
+        try:
+            batch = IngestionBatch.objects.get(id=batch_id, hr=request.user)
+        except IngestionBatch.DoesNotExist:
+            return Response({"reply": "⚠️ Batch not found or not yours."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(batch_status(batch), status=status.HTTP_200_OK)
+
+
+# LLM client counters (retries, throttles, circuit breaker) and evaluation-cache hits for staff
+class LLMStatsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        provider = get_provider()
+        stats = provider.stats() if hasattr(provider, "stats") else {}
+        return Response(
+            {"provider": provider.name, **stats, "evaluation_cache": evaluation_cache.summary()},
+            status=status.HTTP_200_OK,
+        )
+
+
+# Score distribution / skill analytics for one job (or all jobs when no job_id)
+class AnalyticsView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, job_id=None):
+        if job_id is None:
+            return Response({"scope": "hr", **hr_analytics(request.user)}, status=status.HTTP_200_OK)
+        try:
+            job = Job.objects.get(id=job_id, hr=request.user)
+        except Job.DoesNotExist:
+            return Response({"reply": "⚠️ Job not found or not yours."}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"scope": "job", "job_id": job.id, **job_analytics(job)}, status=status.HTTP_200_OK)
+
+
 # New endpoint: get candidates for a job (ordered desc by score)
 class JobCandidatesAPIView(APIView):
+    """
+    GET /api/jobs/<job_id>/candidates/?page_size=50&cursor=<next_cursor>
+    Candidates ordered by score (then newest), one keyset page at a time.
+    """
     permission_classes = [permissions.IsAuthenticated]
 
+    # everything the response needs; resume_text / evaluated_for stay in the DB
+    FIELDS = [
+        "id", "candidate_name", "candidate_email", "extracted_skills", "projects_found", "education",
+        "ai_score", "llm_evaluated", "strengths", "weaknesses", "resume", "created_at",
+    ]
+
     def get(self, request, job_id):
         try:
             job = Job.objects.get(id=job_id, hr=request.user)
@@ -522,10 +362,16 @@ class JobCandidatesAPIView(APIView):
             return Response({"reply": "⚠️ Job not found or not yours."}, status=status.HTTP_404_NOT_FOUND)
 
         from candidates.models import CandidateResume
-        qs = CandidateResume.objects.filter(job=job).order_by("-ai_score", "-created_at")
+        qs = CandidateResume.objects.filter(job=job).only(*self.FIELDS)
+        try:
+            page, next_cursor = candidate_page(qs, request.query_params.get("cursor"), page_size(request.query_params.get("page_size")))
+        except InvalidCursor as e:
+            return Response({"reply": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        experience_level = job.experience_level or "N/A"
         results = []
 
-        for c in qs:
+        for c in page:
             resume_url = c.resume.url if c.resume else ""
             try:
                 if resume_url:
@@ -545,16 +391,19 @@ class JobCandidatesAPIView(APIView):
                 "projects_found": c.projects_found or [],
                 "education": c.education or "N/A",
                 "score": c.ai_score or 0,
+                "llm_evaluated": c.llm_evaluated,
                 "strengths": strengths,
                 "weaknesses": weaknesses,
-                "experience_level": c.job.experience_level or "N/A",
+                "experience_level": experience_level,
                 "resume_url": resume_url,
                 "created_at": c.created_at.isoformat(),
             })
 
         return Response({
             "job": {"id": job.id, "title": job.title, "experience_level": job.experience_level},
-            "candidates": results
+            "candidates": results,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
         }, status=status.HTTP_200_OK)
 
 
@@ -571,21 +420,10 @@ class HRStatsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        hr = request.user  # logged-in HR user
-
-        # Jobs created by this HR
-        jobs = Job.objects.filter(hr=hr)
-        job_count = jobs.count()
-
-        # Candidates of HR's jobs
-        candidates = CandidateResume.objects.filter(job__hr=hr)
-        total_candidates = candidates.count()
-
-        # Shortlisted candidates
-        shortlisted = candidates.filter(shortlisted=True).count()
-
+        # materialized counters (jobs/hr_stats.py): one primary-key read
+        stats = get_hr_stats(request.user)
         return Response({
-            "jobs": job_count,
-            "candidates": total_candidates,
-            "shortlisted": shortlisted,
-        })
\ No newline at end of file
+            "jobs": stats["jobs"],
+            "candidates": stats["candidates"],
+            "shortlisted": stats["shortlisted"],
+        })
@@ -19,3 +19,18 @@ api.interceptors.request.use(
 );
 
 export default api;
+
+// GET /jobs/<id>/candidates/ is keyset-paginated: follow next_cursor until
+// every page is loaded (page_size is capped server-side)
+export const fetchAllCandidates = async (jobId, pageSize = 500) => {
+  const candidates = [];
+  let cursor = null;
+  do {
+    const params = { page_size: pageSize };
+    if (cursor) params.cursor = cursor;
+    const res = await api.get(`/jobs/${jobId}/candidates/`, { params });
+    candidates.push(...(res.data.candidates || []));
+    cursor = res.data.has_more ? res.data.next_cursor : null;
+  } while (cursor);
+  return candidates;
+};
@@ -1,7 +1,7 @@
 // src/pages/JobsTab.jsx
 import React, { useState, useEffect } from "react";
 import { FaFileAlt, FaCheckCircle, FaUpload, FaStar } from "react-icons/fa";
-import api from "../api";
+import api, { fetchAllCandidates } from "../api";
 
 export default function JobsTab() {
   const [jobs, setJobs] = useState([]);
@@ -120,8 +120,7 @@ export default function JobsTab() {
       const res = await api.post("/jobs/chat/", formData, {
         headers: { "Content-Type": "multipart/form-data" },
       });
-      const candRes = await api.get(`/jobs/${selectedJob.id}/candidates/`);
-      const cands = (candRes.data.candidates || []).sort((a, b) => b.score - a.score);
+      const cands = (await fetchAllCandidates(selectedJob.id)).sort((a, b) => b.score - a.score);
       setCandidates(cands);
       setUploadedFiles([]);
       alert(res.data.reply || "Evaluation completed");
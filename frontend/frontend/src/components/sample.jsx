@@ -1,7 +1,7 @@
 // src/pages/JobsTab.jsx
 import React, { useState, useEffect } from "react";
 import { FaFileAlt, FaCheckCircle, FaUpload, FaStar } from "react-icons/fa";
-import api from "../api";
+import api, { fetchAllCandidates } from "../api";
 
 export default function JobsTab() {
   const [jobs, setJobs] = useState([]);
@@ -37,8 +37,7 @@ export default function JobsTab() {
     setShortlisted({});
 
     try {
-      const res = await api.get(`/jobs/${job.id}/candidates/`);
-      const cands = (res.data.candidates || []).sort((a, b) => b.score - a.score);
+      const cands = (await fetchAllCandidates(job.id)).sort((a, b) => b.score - a.score);
       setCandidates(cands);
 
       // FIX 1 — load DB shortlist state
@@ -67,8 +66,7 @@ export default function JobsTab() {
       }
 
       // FIX 2 — Re-fetch updated candidates
-      const candRes = await api.get(`/jobs/${selectedJob.id}/candidates/`);
-      const cands = (candRes.data.candidates || []).sort((a, b) => b.score - a.score);
+      const cands = (await fetchAllCandidates(selectedJob.id)).sort((a, b) => b.score - a.score);
       setCandidates(cands);
 
       // Rebuild shortlist map